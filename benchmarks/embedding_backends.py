@@ -0,0 +1,125 @@
+"""Compare embedding backends: encode throughput and retrieval agreement with PyTorch.
+
+Usage:
+    uv run python benchmarks/embedding_backends.py [--memories 2000] [--k 5] [--max-seq-length 128]
+
+The ONNX backends need the optional extra: `uv sync --extra onnx`. For each backend the
+script reports single-text latency, batched encodes/sec, the mean cosine similarity of
+its vectors to the PyTorch vectors, and recall@k of its top-k search results against
+the PyTorch top-k over a synthetic memory corpus.
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+import numpy as np
+
+from ai_companion.modules.memory.long_term.embeddings import EMBEDDING_MODEL, _load_model
+from ai_companion.settings import EmbeddingBackend, settings
+
+SUBJECTS = ["User", "User's sister", "User's partner", "User's best friend", "User's manager"]
+FACTS = [
+    "lives in {city}",
+    "works as a {job}",
+    "has a dog named {name}",
+    "is learning to play the {instrument}",
+    "moved to {city} last year",
+    "was born in {city}",
+    "is allergic to {food}",
+    "loves eating {food}",
+    "studied {subject} at university",
+    "is planning a trip to {city}",
+]
+FILLERS = {
+    "city": ["Madrid", "Tokyo", "Berlin", "Lisbon", "Toronto", "Nairobi", "Lima", "Oslo"],
+    "job": ["software engineer", "nurse", "teacher", "chef", "architect", "pilot"],
+    "name": ["Max", "Luna", "Rocky", "Bella", "Coco", "Milo"],
+    "instrument": ["piano", "guitar", "violin", "drums", "cello"],
+    "food": ["peanuts", "shellfish", "sushi", "lasagna", "strawberries", "tacos"],
+    "subject": ["physics", "history", "economics", "biology", "literature"],
+}
+QUERIES = [
+    "Where does the user live?",
+    "What does the user do for work?",
+    "Does the user have any pets?",
+    "What instrument does the user play?",
+    "Is the user allergic to anything?",
+    "What food does the user like?",
+    "What did the user study?",
+    "Where is the user travelling?",
+    "Tell me about the user's family",
+    "Where was the user born?",
+]
+
+
+def make_corpus(size: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        fact = rng.choice(FACTS)
+        fillers = {key: rng.choice(values) for key, values in FILLERS.items()}
+        corpus.append(f"{rng.choice(SUBJECTS)} {fact.format(**fillers)}")
+    return corpus
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def top_k(corpus_vectors: np.ndarray, query_vectors: np.ndarray, k: int) -> np.ndarray:
+    scores = normalize(query_vectors) @ normalize(corpus_vectors).T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--memories", type=int, default=2000)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--max-seq-length", type=int, default=None)
+    backends = [backend.value for backend in EmbeddingBackend]
+    parser.add_argument("--backends", nargs="+", default=backends, choices=backends)
+    args = parser.parse_args()
+
+    settings.EMBEDDING_MAX_SEQ_LENGTH = args.max_seq_length
+    corpus = make_corpus(args.memories)
+    results = {}
+
+    for name in dict.fromkeys([EmbeddingBackend.TORCH.value, *args.backends]):
+        backend = EmbeddingBackend(name)
+        try:
+            model = _load_model(EMBEDDING_MODEL, backend)
+        except Exception as e:
+            print(f"{name:<10} unavailable: {e}")
+            continue
+        model.encode(corpus[: args.batch_size], batch_size=args.batch_size)  # warm up
+
+        single = []
+        for query in QUERIES * 5:
+            start = time.perf_counter()
+            model.encode(query)
+            single.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        corpus_vectors = model.encode(corpus, batch_size=args.batch_size)
+        throughput = len(corpus) / (time.perf_counter() - start)
+        results[name] = (corpus_vectors, model.encode(QUERIES), statistics.median(single), throughput)
+
+    if EmbeddingBackend.TORCH.value not in results:
+        return
+    reference_corpus, reference_queries, _, _ = results[EmbeddingBackend.TORCH.value]
+    reference_top = top_k(reference_corpus, reference_queries, args.k)
+
+    print(f"\n{args.memories} memories, batch size {args.batch_size}, max_seq_length {args.max_seq_length or 'default'}")
+    print(f"{'backend':<10} {'single p50':>11} {'encodes/s':>10} {'cosine':>8} {'recall@' + str(args.k):>9}")
+    for name, (corpus_vectors, query_vectors, single_p50, throughput) in results.items():
+        cosine = float(np.mean(np.sum(normalize(corpus_vectors) * normalize(reference_corpus), axis=1)))
+        found = top_k(corpus_vectors, query_vectors, args.k)
+        recall = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(found, reference_top)])
+        print(f"{name:<10} {single_p50:8.2f} ms {throughput:10.0f} {cosine:8.4f} {recall:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Benchmark the embedding service under concurrent load.
+
+Usage:
+    uv run python benchmarks/embedding_service.py [--mode local|socket] [--concurrency 16] [--requests 512]
+
+Fires encode requests from many threads at once (as concurrent graph nodes and
+workers would) and reports throughput, the batch sizes the micro-batcher formed,
+encode latency per batch and the RSS of this worker. In socket mode, start the
+sidecar first with `python -m ai_companion.modules.memory.long_term.embedding_server`.
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_companion.modules.memory.long_term.embeddings import (
+    LocalEmbeddingService,
+    SocketEmbeddingService,
+    current_rss_mb,
+)
+from ai_companion.settings import settings
+
+TEXTS = [
+    "User loves hiking in the mountains",
+    "User works as a nurse in Lisbon",
+    "What did I tell you about my sister?",
+    "User has a cat called Miso",
+    "User is learning to play the cello",
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["local", "socket"], default="local")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=512)
+    args = parser.parse_args()
+
+    if args.mode == "socket":
+        service = SocketEmbeddingService(settings.EMBEDDING_SOCKET_PATH)
+    else:
+        service = LocalEmbeddingService()
+    service.encode(TEXTS[0])  # warm up
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(lambda i: service.encode(TEXTS[i % len(TEXTS)]), range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.requests} requests with {args.concurrency} concurrent callers: {args.requests / elapsed:.1f} req/s")
+    stats = service.server_stats() if args.mode == "socket" else service.stats.summary()
+    print(f"batching: {stats}")
+    print(f"worker RSS: {current_rss_mb():.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
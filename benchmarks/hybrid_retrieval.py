@@ -0,0 +1,93 @@
+"""Recall and latency of dense vs hybrid (dense + BM25, reciprocal rank fusion) memory retrieval.
+
+Usage:
+    uv run python benchmarks/hybrid_retrieval.py [--memories 2000] [--candidates 10]
+
+Builds a synthetic memory corpus in which each memory mentions one unique entity (a pet,
+a friend, a city...), then asks short, entity-heavy questions such as "How is Biscuit?"
+whose answer is that memory. Dense search runs in memory with the local embedding model,
+so no vector database is needed; the hybrid side uses the same BM25Index and fusion as
+BaseVectorStore.hybrid_search_memories.
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+import numpy as np
+
+from ai_companion.modules.memory.long_term.base_vector_store import BaseVectorStore, Memory
+from ai_companion.modules.memory.long_term.embeddings import get_embedding_model
+from ai_companion.modules.memory.long_term.lexical_index import BM25Index
+
+SYLLABLES = ["ka", "lo", "mi", "ra", "zu", "be", "to", "ni", "sha", "vo", "del", "mar", "quin", "fe", "gor"]
+TEMPLATES = [
+    ("User has a pet named {entity}", "How is {entity} doing?"),
+    ("User's best friend is called {entity}", "Have you heard from {entity}?"),
+    ("User grew up in a small town called {entity}", "What was {entity} like?"),
+    ("User's favourite restaurant is {entity}", "Shall we go to {entity}?"),
+    ("User is reading a novel by {entity}", "Any thoughts on {entity}?"),
+    ("User's manager at work is {entity}", "{entity} again..."),
+]
+
+
+def make_corpus(size: int, seed: int = 0) -> tuple[list[str], list[tuple[str, int]]]:
+    rng = random.Random(seed)
+    memories, queries, seen = [], [], set()
+    while len(memories) < size:
+        entity = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+        if entity in seen:
+            continue
+        seen.add(entity)
+        memory, question = rng.choice(TEMPLATES)
+        queries.append((question.format(entity=entity), len(memories)))
+        memories.append(memory.format(entity=entity))
+    return memories, queries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--memories", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--candidates", type=int, default=10)
+    args = parser.parse_args()
+
+    memories, queries = make_corpus(args.memories)
+    queries = queries[: args.queries]
+    model = get_embedding_model()
+    corpus = model.encode(memories, batch_size=128, normalize_embeddings=True)
+
+    start = time.perf_counter()
+    index = BM25Index()
+    index.add_many((str(i), text) for i, text in enumerate(memories))
+    print(f"Indexed {len(index)} memories in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    ks = [1, 2, 3, 5]
+    dense_hits = {k: 0 for k in ks}
+    hybrid_hits = {k: 0 for k in ks}
+    dense_ms, lexical_ms = [], []
+    for question, target in queries:
+        start = time.perf_counter()
+        scores = corpus @ model.encode(question, normalize_embeddings=True)
+        ranked = np.argsort(-scores)[: max(args.candidates, max(ks))]
+        dense_ms.append((time.perf_counter() - start) * 1000)
+        dense = [Memory(text=memories[i], metadata={"id": str(i)}, score=float(scores[i])) for i in ranked]
+
+        start = time.perf_counter()
+        fused = BaseVectorStore.fuse(dense, index.search(question, args.candidates), index, max(ks))
+        lexical_ms.append((time.perf_counter() - start) * 1000)
+
+        for k in ks:
+            dense_hits[k] += str(target) in {m.id for m in dense[:k]}
+            hybrid_hits[k] += str(target) in {m.id for m in fused[:k]}
+
+    print(f"{len(queries)} queries over {len(memories)} memories, {args.candidates} candidates per side")
+    for k in ks:
+        print(f"recall@{k}: dense {dense_hits[k] / len(queries):6.1%}   hybrid {hybrid_hits[k] / len(queries):6.1%}")
+    print(f"dense search (encode + scan) p50 {statistics.median(dense_ms):.2f} ms")
+    print(f"BM25 search + fusion         p50 {statistics.median(lexical_ms):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
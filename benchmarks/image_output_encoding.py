@@ -0,0 +1,68 @@
+"""Upload bytes and latency of generated images per output encoding.
+
+Usage:
+    uv run python benchmarks/image_output_encoding.py generated1.png ... [--max-dimension 768] [--upload]
+
+Each image (e.g. a PNG saved from the text-to-image provider) is re-encoded as PNG,
+JPEG and WebP at a few qualities, reporting size and encode time. With --upload, every
+variant WhatsApp accepts is also uploaded to the media endpoint (needs WHATSAPP_TOKEN
+and WHATSAPP_PHONE_NUMBER_ID) and the upload latency reported.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from io import BytesIO
+from pathlib import Path
+
+from ai_companion.modules.image.image_processing import encode_image
+from ai_companion.settings import ImageFormat
+
+VARIANTS = [
+    (ImageFormat.PNG, 100),
+    (ImageFormat.JPEG, 90),
+    (ImageFormat.JPEG, 85),
+    (ImageFormat.JPEG, 75),
+    (ImageFormat.WEBP, 85),
+    (ImageFormat.WEBP, 75),
+]
+WHATSAPP_FORMATS = {ImageFormat.PNG, ImageFormat.JPEG}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("images", nargs="+", type=Path)
+    parser.add_argument("--max-dimension", type=int, default=None)
+    parser.add_argument("--upload", action="store_true")
+    args = parser.parse_args()
+
+    upload_media = None
+    if args.upload:
+        from ai_companion.interfaces.whatsapp.whatsapp_response import upload_media
+
+    originals = [path.read_bytes() for path in args.images]
+    print(f"{len(originals)} images, original mean {statistics.mean(map(len, originals)) / 1024:.1f} KB")
+    for image_format, quality in VARIANTS:
+        sizes, encode_ms, upload_ms = [], [], []
+        for original in originals:
+            start = time.perf_counter()
+            encoded, mime_type = encode_image(original, image_format, quality, args.max_dimension)
+            encode_ms.append((time.perf_counter() - start) * 1000)
+            sizes.append(len(encoded))
+            if upload_media is not None and image_format in WHATSAPP_FORMATS:
+                start = time.perf_counter()
+                await upload_media(BytesIO(encoded), mime_type)
+                upload_ms.append((time.perf_counter() - start) * 1000)
+
+        line = (
+            f"{image_format.value:<5} q={quality:<3} mean {statistics.mean(sizes) / 1024:8.1f} KB, "
+            f"encode {statistics.median(encode_ms):6.1f} ms"
+        )
+        if upload_ms:
+            line += f", upload p50 {statistics.median(upload_ms):6.0f} ms"
+        print(line)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
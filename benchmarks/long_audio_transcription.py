@@ -0,0 +1,62 @@
+"""Wall-clock transcription time against clip length: one request vs parallel segments.
+
+Usage:
+    uv run python benchmarks/long_audio_transcription.py note1.ogg note2.ogg ... [--segment-seconds 60]
+
+Needs ffmpeg on PATH and the configured STT_PROVIDER's API key. For each clip, the
+whole file is sent as one request (clips over the provider's size limit report the
+error) and then split on silence and transcribed with SpeechToText.transcribe_long.
+The report shows both times, their real-time factors and how much the transcripts
+differ in word count.
+"""
+
+import argparse
+import asyncio
+import time
+from pathlib import Path
+
+from ai_companion.modules.speech import SpeechToText
+from ai_companion.modules.speech.audio_processing import PCM_BYTES_PER_SECOND, decode_pcm, plan_segments
+from ai_companion.settings import settings
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("clips", nargs="+", type=Path)
+    parser.add_argument("--segment-seconds", type=float, default=settings.STT_SEGMENT_SECONDS)
+    parser.add_argument("--overlap-seconds", type=float, default=settings.STT_SEGMENT_OVERLAP_SECONDS)
+    parser.add_argument("--concurrency", type=int, default=settings.STT_MAX_CONCURRENCY)
+    args = parser.parse_args()
+
+    settings.STT_LONG_AUDIO_SECONDS = None  # transcribe() below is the single-request baseline
+    settings.STT_SEGMENT_SECONDS = args.segment_seconds
+    settings.STT_SEGMENT_OVERLAP_SECONDS = args.overlap_seconds
+    settings.STT_MAX_CONCURRENCY = args.concurrency
+    stt = SpeechToText()
+
+    for clip in args.clips:
+        raw = clip.read_bytes()
+        pcm = await decode_pcm(raw)
+        duration = len(pcm) / PCM_BYTES_PER_SECOND
+        segments = len(plan_segments(pcm, args.segment_seconds, args.overlap_seconds))
+        print(f"{clip.name}: {duration:.0f}s of audio, {segments} segments")
+
+        start = time.perf_counter()
+        try:
+            single = await stt.transcribe(raw)
+            single_s = time.perf_counter() - start
+            print(f"  single request     {single_s:7.2f}s  ({single_s / duration:.3f}x real time)")
+        except Exception as e:
+            single = None
+            print(f"  single request     failed: {e}")
+
+        start = time.perf_counter()
+        parallel = await stt.transcribe_long(pcm)
+        parallel_s = time.perf_counter() - start
+        print(f"  parallel segments  {parallel_s:7.2f}s  ({parallel_s / duration:.3f}x real time)")
+        if single is not None:
+            print(f"  words: single {len(single.split())}, parallel {len(parallel.split())}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
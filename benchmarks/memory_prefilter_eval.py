@@ -0,0 +1,51 @@
+"""Evaluate the memory pre-filter against the LLM's `is_important` labels.
+
+Usage:
+    uv run python benchmarks/memory_prefilter_eval.py messages.jsonl [--thresholds 0.1 0.2 0.3 0.4]
+
+Each input line is a JSON object with a "message" field and, optionally, an
+"is_important" label. Missing labels are produced by calling the memory analysis
+LLM, exactly as `MemoryManager` would without the filter.
+"""
+
+import argparse
+import asyncio
+import json
+
+from ai_companion.modules.memory.long_term.memory_filter import MemoryPreFilter
+
+
+async def load_samples(path: str) -> list[tuple[str, bool]]:
+    with open(path) as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+
+    if any("is_important" not in row for row in rows):
+        from ai_companion.core.prompts import MEMORY_ANALYSIS_PROMPT
+        from ai_companion.modules.memory.long_term.memory_manager import get_memory_manager
+
+        llm = get_memory_manager().llm
+        for row in rows:
+            if "is_important" not in row:
+                analysis = await llm.ainvoke(MEMORY_ANALYSIS_PROMPT.format(message=row["message"]))
+                row["is_important"] = bool(analysis.is_important and analysis.formatted_memory)
+
+    return [(row["message"], row["is_important"]) for row in rows]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="JSONL file with messages to evaluate")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.1, 0.2, 0.3, 0.4, 0.5, 0.6])
+    args = parser.parse_args()
+
+    samples = asyncio.run(load_samples(args.path))
+    important = sum(1 for _, label in samples if label)
+    print(f"{len(samples)} messages, {important} labelled important by the LLM\n")
+    print(f"{'threshold':>9}  {'recall':>7}  {'skipped':>7}")
+    for threshold in args.thresholds:
+        report = MemoryPreFilter(threshold).evaluate(samples)
+        print(f"{threshold:>9.2f}  {report.recall:>7.2%}  {report.skip_rate:>7.2%}")
+
+
+if __name__ == "__main__":
+    main()
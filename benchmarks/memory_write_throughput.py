@@ -0,0 +1,60 @@
+"""Benchmark memories/sec ingested by per-call writes versus the write-behind queue.
+
+Usage:
+    uv run python benchmarks/memory_write_throughput.py [--count 200] [--batch-size 32]
+
+Writes synthetic memories to the configured vector store (VECTOR_DB_PROVIDER), so
+point it at a scratch database.
+"""
+
+import argparse
+import time
+import uuid
+from datetime import datetime
+
+from ai_companion.modules.memory.long_term.memory_writer import MemoryWriteBehindQueue
+from ai_companion.modules.memory.long_term.vector_store import get_vector_store
+
+SUBJECTS = ["dog", "sister", "job", "city", "favourite food", "hobby", "car", "band", "book", "team"]
+
+
+def synthetic_memories(count: int) -> list[tuple[str, dict]]:
+    return [
+        (
+            f"User's {SUBJECTS[i % len(SUBJECTS)]} fact number {i} ({uuid.uuid4().hex[:8]})",
+            {"id": str(uuid.uuid4()), "timestamp": datetime.now().isoformat()},
+        )
+        for i in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    store = get_vector_store()
+
+    memories = synthetic_memories(args.count)
+    start = time.perf_counter()
+    for text, metadata in memories:
+        store.store_memory(text, metadata)
+    direct = time.perf_counter() - start
+    print(f"store_memory per call:  {args.count / direct:8.1f} memories/sec ({direct:.2f}s)")
+
+    writer = MemoryWriteBehindQueue(store, max_batch_size=args.batch_size, flush_interval=3600)
+    memories = synthetic_memories(args.count)
+    start = time.perf_counter()
+    for text, metadata in memories:
+        writer.enqueue(text, metadata)
+        if len(writer.pending()) >= args.batch_size:
+            writer.flush()
+    writer.close()
+    batched = time.perf_counter() - start
+    print(f"write-behind (batch {args.batch_size}): {args.count / batched:8.1f} memories/sec ({batched:.2f}s)")
+    print(f"speedup: {direct / batched:.1f}x over {writer.stats.flushes} flushes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Benchmark end-to-end QdrantStore search latency over REST and gRPC.
+
+Usage:
+    uv run python benchmarks/qdrant_search_latency.py [--queries 200] [--k 3]
+
+Uses the Qdrant instance configured in .env (QDRANT_URL/QDRANT_API_KEY). The gRPC
+port (QDRANT_GRPC_PORT, 6334 by default) must be reachable. Each measurement covers
+the full search_memories/asearch_memories call, including query encoding.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from qdrant_client import AsyncQdrantClient, QdrantClient
+
+from ai_companion.modules.memory.long_term.qdrant_store import QdrantStore
+from ai_companion.settings import settings
+
+QUERIES = [
+    "What is the user's name?",
+    "Where does the user live?",
+    "What does the user do for work?",
+    "Does the user have any pets?",
+    "What music does the user like?",
+]
+
+
+def report(label: str, latencies: list[float]) -> None:
+    latencies = sorted(latencies)
+    print(
+        f"{label:<12} p50={statistics.median(latencies):7.2f} ms  "
+        f"p95={latencies[int(len(latencies) * 0.95) - 1]:7.2f} ms  "
+        f"mean={statistics.mean(latencies):7.2f} ms"
+    )
+
+
+async def run(queries: int, k: int) -> None:
+    store = QdrantStore()
+    store.model.encode(QUERIES[0])  # load model weights before timing
+
+    for prefer_grpc in (False, True):
+        kwargs = {**store._client_kwargs(), "prefer_grpc": prefer_grpc}
+        store.client = QdrantClient(**kwargs)
+        store._async_client = AsyncQdrantClient(**kwargs)
+        transport = "gRPC" if prefer_grpc else "REST"
+
+        store.search_memories(QUERIES[0], k=k)
+        sync_latencies = []
+        for i in range(queries):
+            start = time.perf_counter()
+            store.search_memories(QUERIES[i % len(QUERIES)], k=k)
+            sync_latencies.append((time.perf_counter() - start) * 1000)
+        report(f"{transport} sync", sync_latencies)
+
+        await store.asearch_memories(QUERIES[0], k=k)
+        async_latencies = []
+        for i in range(queries):
+            start = time.perf_counter()
+            await store.asearch_memories(QUERIES[i % len(QUERIES)], k=k)
+            async_latencies.append((time.perf_counter() - start) * 1000)
+        report(f"{transport} async", async_latencies)
+
+    print(f"\nhnsw_ef={settings.QDRANT_HNSW_EF} exact={settings.QDRANT_EXACT_SEARCH}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args.queries, args.k))
+
+
+if __name__ == "__main__":
+    main()
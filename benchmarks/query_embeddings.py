@@ -0,0 +1,114 @@
+"""Compare joined-context and incremental per-message query embeddings for memory retrieval.
+
+Usage:
+    uv run python benchmarks/query_embeddings.py [--turns 200] [--k 3] [--decay 0.5]
+
+Replays a synthetic conversation. On every turn the baseline encodes the last
+MEMORY_CONTEXT_MESSAGES messages joined into one string, as memory_injection_node used
+to, while the incremental path encodes only the new message and combines cached vectors.
+Reports encode time per turn for both and the overlap of their top-k results over a
+synthetic memory corpus searched in memory, so no vector database is needed.
+"""
+
+import argparse
+import itertools
+import statistics
+import time
+
+import numpy as np
+from langchain_core.messages import AIMessage, HumanMessage
+
+from ai_companion.modules.memory.long_term.embeddings import get_embedding_model
+from ai_companion.modules.memory.long_term.query_embeddings import QueryEmbeddingCache
+from ai_companion.settings import settings
+
+MEMORIES = [
+    "User's name is Marco",
+    "User lives in Lisbon",
+    "User works as a nurse at the city hospital",
+    "User has a dog named Luna",
+    "User is learning to play the guitar",
+    "User is allergic to peanuts",
+    "User loves Japanese food, especially ramen",
+    "User's sister is getting married in June",
+    "User studied biology at university",
+    "User is training for a half marathon",
+    "User prefers tea over coffee",
+    "User is planning a trip to Tokyo next spring",
+    "User's favourite band is Radiohead",
+    "User recently moved into a new apartment",
+    "User is afraid of flying",
+]
+USER_TURNS = [
+    "I just got back from a long shift at the hospital",
+    "Luna was so happy to see me, she wouldn't stop jumping",
+    "I think I'll make some ramen tonight",
+    "Do you remember what I told you about my sister?",
+    "The wedding planning is stressing everyone out",
+    "Anyway, I went for a 15km run this morning",
+    "My knees are a bit sore now",
+    "I'm still nervous about the flight to Tokyo",
+    "Maybe I should practice guitar to relax",
+    "What do you think I should cook for the wedding dinner?",
+]
+AI_TURNS = [
+    "That sounds exhausting, how are you feeling?",
+    "Aww, dogs always know how to cheer us up!",
+    "Ramen sounds perfect after a long day.",
+    "Of course, tell me more!",
+    "Weddings can be a lot, hang in there.",
+    "Wow, that's impressive!",
+    "Make sure you stretch and rest a bit.",
+    "It's normal to feel that way, you'll be fine.",
+    "Music is a great way to unwind.",
+    "Something light and fresh could be nice.",
+]
+
+
+def top_k(corpus: np.ndarray, query: np.ndarray, k: int) -> set[int]:
+    return set(np.argsort(-(corpus @ query))[:k].tolist())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--decay", type=float, default=settings.MEMORY_QUERY_RECENCY_DECAY)
+    parser.add_argument("--context", type=int, default=settings.MEMORY_CONTEXT_MESSAGES)
+    args = parser.parse_args()
+
+    model = get_embedding_model()
+    corpus = model.encode(MEMORIES, normalize_embeddings=True)
+    cache = QueryEmbeddingCache(model, decay=args.decay)
+
+    messages = []
+    baseline_ms, incremental_ms, overlaps = [], [], []
+    turns = itertools.cycle(zip(USER_TURNS, AI_TURNS))
+    for turn in range(args.turns):
+        user, ai = next(turns)
+        # Suffix the turn number so every message is new to the cache
+        messages.append(HumanMessage(content=f"{user} ({turn})", id=f"h{turn}"))
+        recent = messages[-args.context :]
+
+        start = time.perf_counter()
+        baseline = model.encode(" ".join(m.content for m in recent), normalize_embeddings=True)
+        baseline_ms.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        incremental = cache.query_vector(recent)
+        incremental_ms.append((time.perf_counter() - start) * 1000)
+
+        overlaps.append(len(top_k(corpus, baseline, args.k) & top_k(corpus, incremental, args.k)) / args.k)
+        messages.append(AIMessage(content=f"{ai} ({turn})", id=f"a{turn}"))
+
+    print(f"{args.turns} turns, last {args.context} messages, decay {args.decay}")
+    print(f"joined context  encode p50={statistics.median(baseline_ms):6.2f} ms  mean={statistics.mean(baseline_ms):6.2f} ms")
+    print(
+        f"incremental     encode p50={statistics.median(incremental_ms):6.2f} ms  "
+        f"mean={statistics.mean(incremental_ms):6.2f} ms  (cache hit rate {cache.stats.hit_rate:.0%})"
+    )
+    print(f"top-{args.k} overlap with joined context: {statistics.mean(overlaps):.1%}")
+
+
+if __name__ == "__main__":
+    main()
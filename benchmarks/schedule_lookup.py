@@ -0,0 +1,58 @@
+"""Microbenchmark: precompiled minute-of-week schedule lookup vs parsing time ranges per call.
+
+Usage:
+    uv run python benchmarks/schedule_lookup.py [--calls 100000]
+
+Also checks that both implementations return the same activity for every minute of the
+week (at hh:mm:30, away from the inclusive range ends of the old implementation).
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from ai_companion.modules.schedules.context_generation import ScheduleContextGenerator
+
+
+def parse_per_call(now: datetime):
+    """The previous implementation: strptime over the day's time ranges on every call."""
+    current_time = now.time()
+    for time_range, activity in ScheduleContextGenerator.SCHEDULES.get(now.weekday(), {}).items():
+        start_time, end_time = ScheduleContextGenerator._parse_time_range(time_range)
+        if start_time > end_time:
+            if current_time >= start_time or current_time <= end_time:
+                return activity
+        elif start_time <= current_time <= end_time:
+            return activity
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100_000)
+    args = parser.parse_args()
+
+    monday = datetime(2025, 1, 6, 0, 0, 30)
+    minutes = [monday + timedelta(minutes=m) for m in range(7 * 24 * 60)]
+    mismatches = sum(parse_per_call(t) != ScheduleContextGenerator.get_current_activity(now=t) for t in minutes)
+    print(f"Checked {len(minutes)} minutes of the week: {mismatches} mismatches")
+
+    samples = [minutes[i % len(minutes)] for i in range(0, args.calls * 37, 37)]
+    for label, lookup in (
+        ("strptime per call", parse_per_call),
+        ("precompiled", lambda t: ScheduleContextGenerator.get_current_activity(now=t)),
+    ):
+        start = time.perf_counter()
+        for t in samples:
+            lookup(t)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<18} {elapsed / len(samples) * 1e6:8.2f} us/call")
+
+    start = time.perf_counter()
+    for _ in range(args.calls // 10):
+        ScheduleContextGenerator.get_current_activity("Europe/Madrid")
+    print(f"{'with timezone':<18} {(time.perf_counter() - start) / (args.calls // 10) * 1e6:8.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Bytes uploaded and transcription latency with and without STT audio preprocessing.
+
+Usage:
+    uv run python benchmarks/stt_preprocessing.py clip1.ogg clip2.wav ... [--no-transcribe]
+
+For each clip, reports the original size, the size after silence trimming, 16 kHz mono
+downmix and Opus re-encoding (needs ffmpeg on PATH), the preprocessing time, and, unless
+--no-transcribe is given, the provider transcription latency for both versions (uses the
+configured STT_PROVIDER and its API key).
+"""
+
+import argparse
+import asyncio
+import time
+from pathlib import Path
+
+from ai_companion.modules.speech import SpeechToText
+from ai_companion.modules.speech.audio_processing import ffmpeg_available, preprocess_for_stt
+from ai_companion.settings import settings
+
+
+async def timed_transcription(stt: SpeechToText, audio: bytes) -> tuple[float, str]:
+    start = time.perf_counter()
+    text = await stt.transcribe(audio)
+    return time.perf_counter() - start, text
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("clips", nargs="+", type=Path)
+    parser.add_argument("--no-transcribe", action="store_true")
+    args = parser.parse_args()
+
+    if not ffmpeg_available():
+        raise SystemExit(f"ffmpeg not found at {settings.FFMPEG_PATH!r}")
+
+    # Preprocessing is applied explicitly below, so transcribe() must not do it again
+    settings.STT_PREPROCESS = False
+    stt = None if args.no_transcribe else SpeechToText()
+    total_raw = total_processed = 0
+    for clip in args.clips:
+        raw = clip.read_bytes()
+        start = time.perf_counter()
+        processed = await preprocess_for_stt(raw) or raw
+        preprocess_ms = (time.perf_counter() - start) * 1000
+        total_raw += len(raw)
+        total_processed += len(processed)
+        print(
+            f"{clip.name:<30} {len(raw) / 1024:9.1f} KB -> {len(processed) / 1024:8.1f} KB "
+            f"({len(processed) / len(raw):6.1%}) preprocessing {preprocess_ms:6.0f} ms"
+        )
+        if stt is not None:
+            raw_s, raw_text = await timed_transcription(stt, raw)
+            processed_s, processed_text = await timed_transcription(stt, processed)
+            print(f"{'':<30} transcription {raw_s:.2f}s -> {processed_s:.2f}s (incl. preprocessing: "
+                  f"{processed_s + preprocess_ms / 1000:.2f}s)")
+            print(f"{'':<30} raw:       {raw_text.strip()[:80]!r}")
+            print(f"{'':<30} processed: {processed_text.strip()[:80]!r}")
+
+    print(f"Total uploaded: {total_raw / 1024:.1f} KB -> {total_processed / 1024:.1f} KB "
+          f"({total_processed / total_raw:.1%})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,70 @@
+"""Bytes per second of speech for each TTS output format.
+
+Usage:
+    uv run python benchmarks/tts_codecs.py [--text "..."] [--transcode]
+
+Synthesizes a few typical voice replies with the configured TTS_PROVIDER in PCM (whose
+length gives the exact speech duration), MP3 and Ogg/Opus, and reports the bytes that
+would be uploaded per second of speech and the synthesis latency. With --transcode
+(needs ffmpeg) Opus is also produced locally from the provider's MP3.
+"""
+
+import argparse
+import asyncio
+import time
+
+from ai_companion.modules.speech import TextToSpeech
+from ai_companion.modules.speech.text_to_speech import PCM_SAMPLE_RATE
+from ai_companion.settings import AudioFormat, TTSProvider, settings
+
+REPLIES = [
+    "Haha, no way! I was literally just thinking about that.",
+    "Oh, that sounds like such a long day. Do you want to tell me about it, or would you rather "
+    "talk about something completely different to take your mind off it?",
+    "So I finally tried that little ramen place near the lab. Honestly? The broth was incredible, "
+    "but the noodles were a bit too soft for me. I think next time I'll ask for them firmer. "
+    "Anyway, what did you end up having for dinner?",
+]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--text", action="append", help="reply to synthesize (repeatable)")
+    parser.add_argument("--transcode", action="store_true")
+    args = parser.parse_args()
+
+    settings.RESULT_CACHE_ENABLED = False  # every synthesis must reach the provider
+    tts = TextToSpeech()
+    variants = [("mp3", AudioFormat.MP3, None), ("opus (provider)", AudioFormat.OPUS, None)]
+    if args.transcode:
+        variants.append(("opus (ffmpeg)", AudioFormat.OPUS, TTSProvider.ELEVENLABS))
+
+    totals = {label: [0, 0.0] for label, _, _ in variants}
+    speech_seconds = 0.0
+    for text in args.text or REPLIES:
+        pcm = await tts.synthesize(text, AudioFormat.PCM)
+        duration = len(pcm) / (PCM_SAMPLE_RATE * 2)
+        speech_seconds += duration
+        print(f"{duration:5.1f}s of speech: {text[:60]!r}")
+        for label, audio_format, transcode_provider in variants:
+            opus_format = settings.TTS_ELEVENLABS_OPUS_FORMAT
+            if transcode_provider is not None:
+                if settings.TTS_PROVIDER != transcode_provider:
+                    continue  # local transcoding is only used for ElevenLabs
+                settings.TTS_ELEVENLABS_OPUS_FORMAT = None
+            start = time.perf_counter()
+            audio = await tts.synthesize(text, audio_format)
+            elapsed = time.perf_counter() - start
+            settings.TTS_ELEVENLABS_OPUS_FORMAT = opus_format
+            totals[label][0] += len(audio)
+            totals[label][1] += elapsed
+            print(f"  {label:<16} {len(audio):8d} bytes  {len(audio) / duration:7.0f} bytes/s  {elapsed:5.2f}s")
+
+    print(f"Total: {speech_seconds:.1f}s of speech")
+    for label, (size, elapsed) in totals.items():
+        if size:
+            print(f"  {label:<16} {size / speech_seconds:7.0f} bytes/s of speech, synthesis {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
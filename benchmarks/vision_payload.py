@@ -0,0 +1,64 @@
+"""Vision request payload size and analysis latency with and without image preprocessing.
+
+Usage:
+    uv run python benchmarks/vision_payload.py photo1.jpg photo2.png ... [--analyze] [--format webp]
+
+For each image, reports the original size, the size after downscaling to
+ITT_MAX_DIMENSION and re-encoding (EXIF stripped), the preprocessing time and the
+base64 payload sent to the provider. With --analyze, both versions are also sent to
+the configured ITT_PROVIDER (needs its API key) and the analysis latencies compared.
+"""
+
+import argparse
+import asyncio
+import base64
+import time
+from pathlib import Path
+
+from ai_companion.modules.image import ImageToText
+from ai_companion.modules.image.image_processing import prepare_image
+from ai_companion.settings import ImageFormat, settings
+
+
+async def timed_analysis(itt: ImageToText, image: bytes) -> float:
+    start = time.perf_counter()
+    await itt.analyze_image(image)
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("images", nargs="+", type=Path)
+    parser.add_argument("--max-dimension", type=int, default=settings.ITT_MAX_DIMENSION)
+    parser.add_argument("--format", type=ImageFormat, default=settings.ITT_IMAGE_FORMAT)
+    parser.add_argument("--quality", type=int, default=settings.ITT_IMAGE_QUALITY)
+    parser.add_argument("--analyze", action="store_true")
+    args = parser.parse_args()
+
+    settings.RESULT_CACHE_ENABLED = False  # every analysis must reach the provider
+    settings.ITT_MAX_DIMENSION = args.max_dimension
+    settings.ITT_IMAGE_FORMAT = args.format
+    settings.ITT_IMAGE_QUALITY = args.quality
+    itt = ImageToText() if args.analyze else None
+    for path in args.images:
+        original = path.read_bytes()
+        start = time.perf_counter()
+        prepared, mime_type = prepare_image(
+            original, args.max_dimension, args.format, args.quality, settings.ITT_MAX_IMAGE_BYTES
+        )
+        prepare_ms = (time.perf_counter() - start) * 1000
+        print(
+            f"{path.name:<30} {len(original) / 1024:8.1f} KB -> {len(prepared) / 1024:7.1f} KB {mime_type:<10} "
+            f"({len(prepared) / len(original):6.1%}) in {prepare_ms:5.0f} ms, "
+            f"base64 payload {len(base64.b64encode(prepared)) / 1024:.1f} KB"
+        )
+        if itt is not None:
+            settings.ITT_PREPROCESS = False
+            raw_s = await timed_analysis(itt, original)
+            settings.ITT_PREPROCESS = True
+            prepared_s = await timed_analysis(itt, original)
+            print(f"{'':<30} analysis {raw_s:.2f}s -> {prepared_s:.2f}s (incl. preprocessing)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
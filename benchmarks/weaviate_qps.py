@@ -0,0 +1,51 @@
+"""Benchmark single-worker query throughput of WeaviateStore.search_memories.
+
+Usage:
+    uv run python benchmarks/weaviate_qps.py [--queries 500] [--k 3]
+
+Runs against the Weaviate instance configured in .env (WEAVIATE_HOST/WEAVIATE_PORT)
+and reports queries per second and latency percentiles from a single thread.
+"""
+
+import argparse
+import statistics
+import time
+
+from ai_companion.modules.memory.long_term.weaviate_store import WeaviateStore
+
+QUERIES = [
+    "What is the user's name?",
+    "Where does the user live?",
+    "What does the user do for work?",
+    "Does the user have any pets?",
+    "What music does the user like?",
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=3)
+    args = parser.parse_args()
+
+    store = WeaviateStore()
+    store.search_memories(QUERIES[0], k=args.k)  # warm up connection and collection handle
+
+    latencies = []
+    start = time.perf_counter()
+    for i in range(args.queries):
+        query_start = time.perf_counter()
+        store.search_memories(QUERIES[i % len(QUERIES)], k=args.k)
+        latencies.append((time.perf_counter() - query_start) * 1000)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"{args.queries} queries in {elapsed:.2f}s: {args.queries / elapsed:.1f} queries/sec")
+    print(
+        f"latency ms: p50={statistics.median(latencies):.2f} "
+        f"p95={latencies[int(len(latencies) * 0.95) - 1]:.2f} max={latencies[-1]:.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -166,3 +166,15 @@ Output: {{
 Message: {message}
 Output:
 """
+
+MEMORY_CONSOLIDATION_PROMPT = """Merge the following memories about the user into a single memory.
+They describe the same fact, possibly with paraphrases or outdated versions.
+
+Rules:
+1. Keep every distinct detail that is still true
+2. When memories conflict, trust the most recent one (they are listed oldest first)
+3. Write one clear, third-person statement, in the same style as the inputs
+
+Memories:
+{memories}
+"""
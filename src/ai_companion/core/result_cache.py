@@ -0,0 +1,311 @@
+import asyncio
+import atexit
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, Tuple, Union
+
+from ai_companion.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_caches: Dict[str, "ResultCache"] = {}
+
+
+@dataclass
+class ResultCacheStats:
+    """Counters for one module's result cache."""
+
+    lookups: int = 0
+    memory_hits: int = 0
+    disk_hits: int = 0
+    expired: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def misses(self) -> int:
+        return self.lookups - self.hits
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+
+class ResultCache:
+    """Two-tier cache for the results of expensive provider calls (transcripts, audio...).
+
+    Keys are content hashes (see `key`) so a forwarded voice note or image hits regardless
+    of where it came from. Values live in an in-memory LRU bounded by total bytes and,
+    when a database path is given, in a SQLite table bounded by bytes per namespace.
+    Entries older than `ttl` seconds are treated as misses in both tiers.
+
+    Async callers use `aget`/`aput`, which answer memory hits inline and run every SQLite
+    statement in a worker thread so the event loop never waits on the disk tier.
+    """
+
+    TABLE_NAME = "result_cache"
+    EVICT_BATCH = 16  # least recently used rows read per eviction query
+
+    def __init__(
+        self,
+        namespace: str,
+        max_memory_bytes: int,
+        db_path: Optional[str] = None,
+        max_disk_bytes: int = 0,
+        ttl: Optional[float] = None,
+    ):
+        self.namespace = namespace
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl = ttl
+        self.stats = ResultCacheStats()
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()  # memory tier
+        self._db_lock = threading.Lock()  # disk tier, held by worker threads during SQLite calls
+        self._db: Optional[sqlite3.Connection] = None
+        self._disk_bytes = 0  # running total of this namespace's rows, so puts never SUM the table
+
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.TABLE_NAME} ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, size INTEGER NOT NULL, "
+                "created REAL NOT NULL, last_used REAL NOT NULL, PRIMARY KEY (namespace, key))"
+            )
+            self._db.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.TABLE_NAME}_lru ON {self.TABLE_NAME} (namespace, last_used)"
+            )
+            self._db.commit()
+            (self._disk_bytes,) = self._db.execute(
+                f"SELECT COALESCE(SUM(size), 0) FROM {self.TABLE_NAME} WHERE namespace = ?", (self.namespace,)
+            ).fetchone()
+
+    @staticmethod
+    def key(content: Union[str, bytes], *params: object) -> str:
+        """Hash the content together with everything else that shapes the result
+        (provider, model, voice, prompt...)."""
+        digest = hashlib.sha256(content.encode() if isinstance(content, str) else content)
+        for param in params:
+            digest.update(b"\0" + str(param).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached value, or None on a miss."""
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is not None or self._db is None:
+            return value
+        return self._get_disk(key, now)
+
+    async def aget(self, key: str) -> Optional[bytes]:
+        """Like `get`, reading the disk tier in a worker thread."""
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is not None or self._db is None:
+            return value
+        return await asyncio.to_thread(self._get_disk, key, now)
+
+    def put(self, key: str, value: bytes) -> None:
+        """Store a value in both tiers, evicting the least recently used entries over the caps."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+        self._put_disk(key, value, now)
+
+    async def aput(self, key: str, value: bytes) -> None:
+        """Like `put`, writing the disk tier in a worker thread."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+        if self._db is not None and len(value) <= self.max_disk_bytes:
+            await asyncio.to_thread(self._put_disk, key, value, now)
+
+    def discard(self, key: str) -> None:
+        """Remove one entry from both tiers (e.g. when the cached value turned out to be stale)."""
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+        self._delete_disk(key)
+
+    async def adiscard(self, key: str) -> None:
+        """Like `discard`, deleting from the disk tier in a worker thread."""
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+        if self._db is not None:
+            await asyncio.to_thread(self._delete_disk, key)
+
+    def get_text(self, key: str) -> Optional[str]:
+        value = self.get(key)
+        return value.decode() if value is not None else None
+
+    def put_text(self, key: str, value: str) -> None:
+        self.put(key, value.encode())
+
+    async def aget_text(self, key: str) -> Optional[str]:
+        value = await self.aget(key)
+        return value.decode() if value is not None else None
+
+    async def aput_text(self, key: str, value: str) -> None:
+        await self.aput(key, value.encode())
+
+    def clear(self) -> None:
+        """Drop every entry of this namespace, including persisted ones."""
+        with self._lock:
+            self._entries.clear()
+            self._memory_bytes = 0
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute(f"DELETE FROM {self.TABLE_NAME} WHERE namespace = ?", (self.namespace,))
+                self._db.commit()
+                self._disk_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl is not None and now - created > self.ttl
+
+    def _get_memory(self, key: str, now: float) -> Optional[bytes]:
+        with self._lock:
+            self.stats.lookups += 1
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, created = entry
+            if not self._expired(created, now):
+                self._entries.move_to_end(key)
+                self.stats.memory_hits += 1
+                return value
+            self._drop(key)
+            self.stats.expired += 1
+            return None
+
+    def _get_disk(self, key: str, now: float) -> Optional[bytes]:
+        with self._db_lock:
+            row = self._db.execute(
+                f"SELECT value, created FROM {self.TABLE_NAME} WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+            if row is None:
+                return None
+            value, created = row
+            if self._expired(created, now):
+                self._db.execute(
+                    f"DELETE FROM {self.TABLE_NAME} WHERE namespace = ? AND key = ?", (self.namespace, key)
+                )
+                self._db.commit()
+                self._disk_bytes -= len(value)
+                self.stats.expired += 1
+                return None
+            self._db.execute(
+                f"UPDATE {self.TABLE_NAME} SET last_used = ? WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key),
+            )
+            self._db.commit()
+        with self._lock:
+            self.stats.disk_hits += 1
+            self._remember(key, value, created)
+        return value
+
+    def _put_disk(self, key: str, value: bytes, now: float) -> None:
+        if self._db is None or len(value) > self.max_disk_bytes:
+            return
+        with self._db_lock:
+            self._disk_bytes -= self._disk_size(key)
+            self._db.execute(
+                f"INSERT OR REPLACE INTO {self.TABLE_NAME} (namespace, key, value, size, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self.namespace, key, value, len(value), now, now),
+            )
+            self._disk_bytes += len(value)
+            self._evict_disk()
+            self._db.commit()
+
+    def _delete_disk(self, key: str) -> None:
+        if self._db is None:
+            return
+        with self._db_lock:
+            self._disk_bytes -= self._disk_size(key)
+            self._db.execute(f"DELETE FROM {self.TABLE_NAME} WHERE namespace = ? AND key = ?", (self.namespace, key))
+            self._db.commit()
+
+    def _disk_size(self, key: str) -> int:
+        """Size of a persisted entry (0 if absent), read through the primary key."""
+        row = self._db.execute(
+            f"SELECT size FROM {self.TABLE_NAME} WHERE namespace = ? AND key = ?", (self.namespace, key)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _remember(self, key: str, value: bytes, created: float) -> None:
+        if len(value) > self.max_memory_bytes:
+            return
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (value, created)
+        self._memory_bytes += len(value)
+        while self._memory_bytes > self.max_memory_bytes:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str) -> None:
+        value, _ = self._entries.pop(key)
+        self._memory_bytes -= len(value)
+
+    def _evict_disk(self) -> None:
+        # Walk the (namespace, last_used) index from the oldest end, a few rows at a time
+        while self._disk_bytes > self.max_disk_bytes:
+            rows = self._db.execute(
+                f"SELECT key, size FROM {self.TABLE_NAME} WHERE namespace = ? ORDER BY last_used LIMIT ?",
+                (self.namespace, self.EVICT_BATCH),
+            ).fetchall()
+            if not rows:
+                self._disk_bytes = 0
+                return
+            evicted = []
+            for key, size in rows:
+                if self._disk_bytes <= self.max_disk_bytes:
+                    break
+                evicted.append((self.namespace, key))
+                self._disk_bytes -= size
+            self._db.executemany(f"DELETE FROM {self.TABLE_NAME} WHERE namespace = ? AND key = ?", evicted)
+
+
+@lru_cache
+def get_result_cache(namespace: str) -> Optional[ResultCache]:
+    """Get the process-wide result cache of a module ("stt", "itt", "tts"), or None if disabled."""
+    if not settings.RESULT_CACHE_ENABLED:
+        return None
+    cache = ResultCache(
+        namespace,
+        max_memory_bytes=int(settings.RESULT_CACHE_MEMORY_MB * 1024 * 1024),
+        db_path=settings.RESULT_CACHE_DB_PATH,
+        max_disk_bytes=int(settings.RESULT_CACHE_DISK_MB * 1024 * 1024),
+        ttl=settings.RESULT_CACHE_TTL,
+    )
+    _caches[namespace] = cache
+    return cache
+
+
+def result_cache_stats() -> Dict[str, ResultCacheStats]:
+    """Stats of every result cache created so far, by module."""
+    return {namespace: cache.stats for namespace, cache in _caches.items()}
+
+
+@atexit.register
+def log_result_cache_stats() -> None:
+    """Log each module's cache effectiveness; runs at interpreter exit."""
+    for namespace, stats in result_cache_stats().items():
+        if stats.lookups:
+            logger.info(
+                f"Result cache '{namespace}': {stats.hits}/{stats.lookups} hits ({stats.hit_rate:.2%}), "
+                f"{stats.memory_hits} from memory, {stats.disk_hits} from disk, {stats.expired} expired"
+            )
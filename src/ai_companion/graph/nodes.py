@@ -1,8 +1,10 @@
-import os
-from uuid import uuid4
+import asyncio
+import logging
+import time
 
 from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage
 from langchain_core.runnables import RunnableConfig
+from langgraph.types import StreamWriter
 
 from ai_companion.graph.state import AICompanionState
 from ai_companion.graph.utils.chains import (
@@ -13,10 +15,14 @@ from ai_companion.graph.utils.helpers import (
     get_chat_model,
     get_text_to_image_module,
     get_text_to_speech_module,
+    remove_asterisk_content,
 )
 from ai_companion.modules.memory.long_term.memory_manager import get_memory_manager
 from ai_companion.modules.schedules.context_generation import ScheduleContextGenerator
-from ai_companion.settings import settings
+from ai_companion.modules.speech.text_to_speech import pcm_to_wav
+from ai_companion.settings import AudioFormat, settings
+
+logger = logging.getLogger(__name__)
 
 
 async def router_node(state: AICompanionState):
@@ -25,8 +31,10 @@ async def router_node(state: AICompanionState):
     return {"workflow": response.response_type}
 
 
-def context_injection_node(state: AICompanionState):
-    schedule_context = ScheduleContextGenerator.get_current_activity()
+def context_injection_node(state: AICompanionState, config: RunnableConfig):
+    # Computed once per turn in the user's timezone; the response nodes read it from state
+    timezone = config.get("configurable", {}).get("timezone") or settings.SCHEDULE_TIMEZONE
+    schedule_context = ScheduleContextGenerator.get_current_activity(timezone)
     if schedule_context != state.get("current_activity", ""):
         apply_activity = True
     else:
@@ -35,7 +43,7 @@ def context_injection_node(state: AICompanionState):
 
 
 async def conversation_node(state: AICompanionState, config: RunnableConfig):
-    current_activity = ScheduleContextGenerator.get_current_activity()
+    current_activity = state.get("current_activity", "")
     memory_context = state.get("memory_context", "")
 
     chain = get_character_response_chain(state.get("summary", ""))
@@ -52,50 +60,105 @@ async def conversation_node(state: AICompanionState, config: RunnableConfig):
 
 
 async def image_node(state: AICompanionState, config: RunnableConfig):
-    current_activity = ScheduleContextGenerator.get_current_activity()
+    current_activity = state.get("current_activity", "")
     memory_context = state.get("memory_context", "")
 
     chain = get_character_response_chain(state.get("summary", ""))
     text_to_image_module = get_text_to_image_module()
 
+    start = time.perf_counter()
     scenario = await text_to_image_module.create_scenario(state["messages"][-5:])
-    os.makedirs("generated_images", exist_ok=True)
-    img_path = f"generated_images/image_{str(uuid4())}.png"
-    await text_to_image_module.generate_image(scenario.image_prompt, img_path)
+    scenario_time = time.perf_counter() - start
 
     # Inject the image prompt information as an AI message
     scenario_message = HumanMessage(content=f"<image attached by Ava generated from prompt: {scenario.image_prompt}>")
     updated_messages = state["messages"] + [scenario_message]
 
-    response = await chain.ainvoke(
-        {
-            "messages": updated_messages,
-            "current_activity": current_activity,
-            "memory_context": memory_context,
-        },
-        config,
+    async def timed(coro):
+        coro_start = time.perf_counter()
+        result = await coro
+        return result, time.perf_counter() - coro_start
+
+    # The caption only needs the image prompt, so it is written while the image is generated
+    (image, generation_time), (response, caption_time) = await asyncio.gather(
+        timed(text_to_image_module.generate_image(scenario.image_prompt)),
+        timed(
+            chain.ainvoke(
+                {
+                    "messages": updated_messages,
+                    "current_activity": current_activity,
+                    "memory_context": memory_context,
+                },
+                config,
+            )
+        ),
+    )
+    logger.info(
+        f"Image turn took {time.perf_counter() - start:.2f}s (scenario {scenario_time:.2f}s, "
+        f"image {generation_time:.2f}s, caption {caption_time:.2f}s; "
+        f"{scenario_time + generation_time + caption_time:.2f}s if run sequentially)"
     )
 
-    return {"messages": AIMessage(content=response), "image_path": img_path}
+    return {"messages": AIMessage(content=response), "image_buffer": image}
 
 
-async def audio_node(state: AICompanionState, config: RunnableConfig):
-    current_activity = ScheduleContextGenerator.get_current_activity()
+async def audio_node(state: AICompanionState, config: RunnableConfig, writer: StreamWriter):
+    # Each interface picks its format; those that play audio progressively ask for PCM and
+    # read each chunk from the "custom" stream
+    audio_format = AudioFormat(config.get("configurable", {}).get("audio_format", AudioFormat.MP3))
+    current_activity = state.get("current_activity", "")
     memory_context = state.get("memory_context", "")
-
-    chain = get_character_response_chain(state.get("summary", ""))
     text_to_speech_module = get_text_to_speech_module()
-
-    response = await chain.ainvoke(
-        {
-            "messages": state["messages"],
-            "current_activity": current_activity,
-            "memory_context": memory_context,
-        },
-        config,
+    inputs = {
+        "messages": state["messages"],
+        "current_activity": current_activity,
+        "memory_context": memory_context,
+    }
+
+    # Opus sentence chunks can only be joined with ffmpeg; without it, synthesize the reply in
+    # one request so it stays a single playable voice note
+    if not settings.TTS_PIPELINED or not text_to_speech_module.can_join(audio_format):
+        chain = get_character_response_chain(state.get("summary", ""))
+        response = await chain.ainvoke(inputs, config)
+        output_audio = await text_to_speech_module.synthesize(response, audio_format)
+        writer({"audio_chunk": output_audio})
+        if audio_format == AudioFormat.PCM:
+            output_audio = pcm_to_wav(output_audio)
+        return {"messages": response, "audio_buffer": output_audio}
+
+    # Stream the response and synthesize each sentence while the rest is generated
+    chain = get_character_response_chain(state.get("summary", ""), remove_asterisks=False)
+    start = time.perf_counter()
+    tokens = []
+
+    async def stream_tokens():
+        async for token in chain.astream(inputs, config):
+            tokens.append(token)
+            yield token
+
+    audio_chunks = []
+    first_audio = None
+    async for audio in text_to_speech_module.synthesize_stream(
+        stream_tokens(),
+        transform=remove_asterisk_content,
+        audio_format=text_to_speech_module.chunk_format(audio_format),
+    ):
+        if first_audio is None:
+            first_audio = time.perf_counter() - start
+        audio_chunks.append(audio)
+        writer({"audio_chunk": audio})
+
+    response = remove_asterisk_content("".join(tokens))
+    if not audio_chunks:
+        raise ValueError("Input text cannot be empty")
+    logger.info(
+        f"Pipelined TTS: first audio byte after {first_audio:.2f}s, "
+        f"{len(audio_chunks)} chunks in {time.perf_counter() - start:.2f}s"
     )
-    output_audio = await text_to_speech_module.synthesize(response)
 
+    output_audio = await text_to_speech_module.join_audio(audio_chunks, audio_format)
+    if audio_format == AudioFormat.PCM:
+        output_audio = pcm_to_wav(output_audio)
     return {"messages": response, "audio_buffer": output_audio}
 
 
@@ -132,15 +195,16 @@ async def memory_extraction_node(state: AICompanionState):
     return {}
 
 
-def memory_injection_node(state: AICompanionState):
+async def memory_injection_node(state: AICompanionState, config: RunnableConfig):
     """Retrieve and inject relevant memories into the character card."""
     memory_manager = get_memory_manager()
 
-    # Get relevant memories based on recent conversation
-    recent_context = " ".join([m.content for m in state["messages"][-3:]])
-    memories = memory_manager.get_relevant_memories(recent_context)
-
-    # Format memories for the character card
-    memory_context = memory_manager.format_memories_for_prompt(memories)
+    # Get relevant memories based on recent conversation, formatted for the character card.
+    # The thread's previous context is reused while the topic and stored memories are unchanged.
+    recent_messages = state["messages"][-settings.MEMORY_CONTEXT_MESSAGES :]
+    thread_id = config.get("configurable", {}).get("thread_id")
+    memory_context = await memory_manager.aget_memory_context(
+        recent_messages, str(thread_id) if thread_id is not None else None
+    )
 
     return {"memory_context": memory_context}
@@ -11,6 +11,7 @@ class AICompanionState(MessagesState):
             LangChain message type (HumanMessage, AIMessage, etc.)
         workflow (str): The current workflow the AI Companion is in. Can be "conversation", "image", or "audio".
         audio_buffer (bytes): The audio buffer to be used for speech-to-text conversion.
+        image_buffer (bytes): The image generated in the image workflow.
         current_activity (str): The current activity of Ava based on the schedule.
         memory_context (str): The context of the memories to be injected into the character card.
     """
@@ -18,7 +19,7 @@ class AICompanionState(MessagesState):
     summary: str
     workflow: str
     audio_buffer: bytes
-    image_path: str
+    image_buffer: bytes
     current_activity: str
     apply_activity: bool
     memory_context: str
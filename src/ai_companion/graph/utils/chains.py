@@ -1,3 +1,4 @@
+from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from pydantic import BaseModel, Field
 
@@ -21,7 +22,7 @@ def get_router_chain():
     return prompt | model
 
 
-def get_character_response_chain(summary: str = ""):
+def get_character_response_chain(summary: str = "", remove_asterisks: bool = True):
     model = get_chat_model()
     system_message = CHARACTER_CARD_PROMPT
 
@@ -35,4 +36,5 @@ def get_character_response_chain(summary: str = ""):
         ]
     )
 
-    return prompt | model | AsteriskRemovalParser()
+    # Streaming callers strip asterisk content themselves, since actions can span chunks
+    return prompt | model | (AsteriskRemovalParser() if remove_asterisks else StrOutputParser())
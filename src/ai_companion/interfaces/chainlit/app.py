@@ -1,3 +1,5 @@
+import asyncio
+import time
 from io import BytesIO
 
 import chainlit as cl
@@ -5,9 +7,12 @@ from langchain_core.messages import AIMessageChunk, HumanMessage
 from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 
 from ai_companion.graph import graph_builder
+from ai_companion.graph.utils.helpers import remove_asterisk_content
 from ai_companion.modules.image import ImageToText
+from ai_companion.modules.image.image_processing import detect_mime_type
 from ai_companion.modules.speech import SpeechToText, TextToSpeech
-from ai_companion.settings import settings
+from ai_companion.modules.speech.text_to_speech import PCM_SAMPLE_RATE, audio_mime_type, pcm_to_wav
+from ai_companion.settings import AudioFormat, settings
 
 # Global module instances
 speech_to_text = SpeechToText()
@@ -29,23 +34,16 @@ async def on_message(message: cl.Message):
 
     # Process any attached images
     content = message.content
-    if message.elements:
-        for elem in message.elements:
-            if isinstance(elem, cl.Image):
-                # Read image file content
-                with open(elem.path, "rb") as f:
-                    image_bytes = f.read()
-
-                # Analyze image and add to message content
-                try:
-                    # Use global ImageToText instance
-                    description = await image_to_text.analyze_image(
-                        image_bytes,
-                        "Please describe what you see in this image in the context of our conversation.",
-                    )
-                    content += f"\n[Image Analysis: {description}]"
-                except Exception as e:
-                    cl.logger.warning(f"Failed to analyze image: {e}")
+    image_paths = [elem.path for elem in message.elements or [] if isinstance(elem, cl.Image)]
+    if image_paths:
+        # Analyze all images concurrently and add them to the message content in order
+        descriptions = await image_to_text.analyze_images(
+            image_paths,
+            "Please describe what you see in this image in the context of our conversation.",
+        )
+        for description in descriptions:
+            if description is not None:
+                content += f"\n[Image Analysis: {description}]"
 
     # Process through graph with enriched message content
     thread_id = cl.user_session.get("thread_id")
@@ -55,7 +53,7 @@ async def on_message(message: cl.Message):
             graph = graph_builder.compile(checkpointer=short_term_memory)
             async for chunk in graph.astream(
                 {"messages": [HumanMessage(content=content)]},
-                {"configurable": {"thread_id": thread_id}},
+                {"configurable": {"thread_id": thread_id, "audio_format": settings.CHAINLIT_AUDIO_FORMAT}},
                 stream_mode="messages",
             ):
                 if chunk[1]["langgraph_node"] == "conversation_node" and isinstance(chunk[0], AIMessageChunk):
@@ -69,13 +67,14 @@ async def on_message(message: cl.Message):
         output_audio_el = cl.Audio(
             name="Audio",
             auto_play=True,
-            mime="audio/mpeg3",
+            mime=audio_mime_type(audio_buffer),
             content=audio_buffer,
         )
         await cl.Message(content=response, elements=[output_audio_el]).send()
     elif output_state.values.get("workflow") == "image":
         response = output_state.values["messages"][-1].content
-        image = cl.Image(path=output_state.values["image_path"], display="inline")
+        image_buffer = output_state.values["image_buffer"]
+        image = cl.Image(content=image_buffer, mime=detect_mime_type(image_buffer), display="inline")
         await cl.Message(content=response, elements=[image]).send()
     else:
         await msg.send()
@@ -105,6 +104,7 @@ async def on_audio_chunk(chunk: cl.AudioChunk):
 @cl.on_audio_end
 async def on_audio_end(elements):
     """Handle end of audio recording"""
+    speech_end = time.perf_counter()
     audio_buffer = cl.user_session.get("audio_buffer")
     audio_mime_type = cl.user_session.get("audio_mime_type")
     audio_extension = cl.user_session.get("audio_extension")
@@ -118,41 +118,21 @@ async def on_audio_end(elements):
     
     # Log the audio file size for debugging
     print(f"Audio file size: {len(audio_data)} bytes")
-    
+
+    # Create a new BytesIO object with the correct filename for transcription
+    transcription_buffer = BytesIO(audio_data)
+    transcription_buffer.name = f"audio.{audio_extension}"
+
+    # Start transcribing right away, while the recording is echoed back to the user
+    transcription_task = asyncio.create_task(speech_to_text.transcribe(transcription_buffer))
+
     # Show user's audio message
     input_audio_el = cl.Audio(mime=audio_mime_type, content=audio_data)
     await cl.Message(author="You", content="", elements=[input_audio_el, *elements]).send()
     
     try:
-        # Create a new BytesIO object with the correct filename for transcription
-        # identify the correct format
-        transcription_buffer = BytesIO(audio_data)
-        
-        # Ensure correct file extension
-        transcription_buffer.name = f"audio.{audio_extension}"
-        print(f"Created transcription buffer with name: {transcription_buffer.name}")
-        
-        # Passing the buffer object directly to preserve filename
-        transcription = await speech_to_text.transcribe(transcription_buffer)
-        
-        thread_id = cl.user_session.get("thread_id")
-        
-        async with AsyncSqliteSaver.from_conn_string(settings.SHORT_TERM_MEMORY_DB_PATH) as short_term_memory:
-            graph = graph_builder.compile(checkpointer=short_term_memory)
-            output_state = await graph.ainvoke(
-                {"messages": [HumanMessage(content=transcription)]},
-                {"configurable": {"thread_id": thread_id}},
-            )
-        
-        # Use global TextToSpeech instance
-        audio_buffer = await text_to_speech.synthesize(output_state["messages"][-1].content)
-        
-        # Send the response
-        await cl.Message(
-            author="Assistant",
-            content=output_state["messages"][-1].content,
-            elements=[cl.Audio(mime="audio/mpeg", content=audio_buffer)],
-        ).send()
+        transcription = await transcription_task
+        await stream_voice_reply(transcription, speech_end)
     except Exception as e:
         # Log the error for debugging
         print(f"Error processing audio: {str(e)}")
@@ -161,3 +141,81 @@ async def on_audio_end(elements):
             author="Assistant",
             content=f"I'm sorry, I couldn't process your audio message. Error: {str(e)}",
         ).send()
+
+
+async def stream_voice_reply(transcription: str, speech_end: float):
+    """Run the graph on a transcription and play the reply sentence by sentence as it streams.
+
+    Conversation replies are synthesized here from the streamed tokens; audio_node replies
+    arrive already synthesized on the graph's "custom" stream. Chainlit 1.x has no audio
+    output stream, so each sentence is sent as its own auto-playing audio element, held back
+    until the previous one has finished playing.
+    """
+    thread_id = cl.user_session.get("thread_id")
+    # PCM chunks have a known duration, which paces playback
+    config = {"configurable": {"thread_id": thread_id, "audio_format": AudioFormat.PCM}}
+    msg = cl.Message(author="Assistant", content="")
+    await msg.send()
+    text_queue: asyncio.Queue = asyncio.Queue()
+    audio_queue: asyncio.Queue = asyncio.Queue()
+    audio_chunks = 0
+
+    def queue_audio(audio: bytes):
+        nonlocal audio_chunks
+        audio_chunks += 1
+        audio_queue.put_nowait(audio)
+
+    async def play():
+        first_audio = None
+        playing_until = 0.0
+        while (audio := await audio_queue.get()) is not None:
+            await asyncio.sleep(max(0.0, playing_until - time.perf_counter()))
+            await cl.Audio(content=pcm_to_wav(audio), mime="audio/wav", auto_play=True).send(for_id=msg.id)
+            playing_until = time.perf_counter() + len(audio) / (PCM_SAMPLE_RATE * 2)
+            if first_audio is None:
+                first_audio = time.perf_counter() - speech_end
+                cl.logger.info(f"Voice reply: first audio sent {first_audio:.2f}s after end of speech")
+
+    async def reply_tokens():
+        while (token := await text_queue.get()) is not None:
+            yield token
+
+    async def speak():
+        async for audio in text_to_speech.synthesize_stream(
+            reply_tokens(), transform=remove_asterisk_content, audio_format=AudioFormat.PCM
+        ):
+            queue_audio(audio)
+
+    player = asyncio.create_task(play())
+    speaker = asyncio.create_task(speak())
+    try:
+        async with AsyncSqliteSaver.from_conn_string(settings.SHORT_TERM_MEMORY_DB_PATH) as short_term_memory:
+            graph = graph_builder.compile(checkpointer=short_term_memory)
+            async for mode, chunk in graph.astream(
+                {"messages": [HumanMessage(content=transcription)]},
+                config,
+                stream_mode=["messages", "custom"],
+            ):
+                if mode == "custom" and "audio_chunk" in chunk:
+                    queue_audio(chunk["audio_chunk"])
+                elif mode == "messages" and isinstance(chunk[0], AIMessageChunk):
+                    node = chunk[1]["langgraph_node"]
+                    if node == "conversation_node":
+                        text_queue.put_nowait(chunk[0].content)
+                    if node in ("conversation_node", "audio_node"):
+                        await msg.stream_token(chunk[0].content)
+            text_queue.put_nowait(None)
+            await speaker
+
+            output_state = await graph.aget_state(config={"configurable": {"thread_id": thread_id}})
+
+        msg.content = output_state.values["messages"][-1].content
+        await msg.update()
+        if not audio_chunks:
+            # Nothing was streamed (e.g. the image workflow): speak the final message
+            queue_audio(await text_to_speech.synthesize(msg.content, AudioFormat.PCM))
+        audio_queue.put_nowait(None)
+        await player
+    finally:
+        speaker.cancel()
+        player.cancel()
@@ -1,6 +1,22 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from ai_companion.interfaces.whatsapp.whatsapp_response import whatsapp_router
+from ai_companion.modules.memory.long_term.consolidation import run_periodic_consolidation
+from ai_companion.settings import settings
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    consolidation = None
+    if settings.MEMORY_CONSOLIDATION_INTERVAL:
+        consolidation = asyncio.create_task(run_periodic_consolidation(settings.MEMORY_CONSOLIDATION_INTERVAL))
+    yield
+    if consolidation is not None:
+        consolidation.cancel()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.include_router(whatsapp_router)
@@ -1,7 +1,8 @@
 import logging
 import os
+from dataclasses import dataclass
 from io import BytesIO
-from typing import Dict
+from typing import Dict, Optional, Tuple
 import time
 from collections import OrderedDict
 
@@ -10,9 +11,13 @@ from fastapi import APIRouter, Request, Response
 from langchain_core.messages import HumanMessage
 from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 
+from ai_companion.core.result_cache import ResultCache
 from ai_companion.graph import graph_builder
 from ai_companion.modules.image import ImageToText
+from ai_companion.modules.image.image_processing import detect_mime_type
+from ai_companion.modules.schedules.timezones import timezone_for_phone_number
 from ai_companion.modules.speech import SpeechToText, TextToSpeech
+from ai_companion.modules.speech.text_to_speech import audio_duration, audio_mime_type
 from ai_companion.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -29,6 +34,46 @@ whatsapp_router = APIRouter()
 WHATSAPP_TOKEN = os.getenv("WHATSAPP_TOKEN")
 WHATSAPP_PHONE_NUMBER_ID = os.getenv("WHATSAPP_PHONE_NUMBER_ID")
 
+# File extensions for uploaded media, by MIME type
+MEDIA_EXTENSIONS = {
+    "audio/mpeg": "mp3",
+    "audio/ogg": "ogg",
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+}
+
+
+@dataclass
+class MediaUploadStats:
+    """Counters for outbound media uploads and media-ID reuse."""
+
+    uploads: int = 0
+    reuses: int = 0
+    bytes_uploaded: int = 0
+    bytes_saved: int = 0
+
+
+# Media IDs of recent uploads by content hash, so identical replies (cached TTS phrases,
+# regenerated images) are sent without uploading them again
+media_id_cache = (
+    ResultCache(
+        "whatsapp_media",
+        max_memory_bytes=1024 * 1024,
+        db_path=settings.RESULT_CACHE_DB_PATH,
+        max_disk_bytes=16 * 1024 * 1024,
+        ttl=settings.WHATSAPP_MEDIA_ID_TTL,
+    )
+    if settings.WHATSAPP_MEDIA_ID_CACHE
+    else None
+)
+media_upload_stats = MediaUploadStats()
+
+# Graph API error codes returned when a message's media cannot be used (e.g. an expired media ID)
+MEDIA_ERROR_CODES = {131052, 131053}
+# Generic invalid-parameter codes, which only concern media when the error names the media ID
+INVALID_PARAMETER_CODES = {100, 131009}
+
 # Simple LRU cache for message deduplication (Avoid duplicate messages being processed)
 class LRUCache:
     def __init__(self, capacity: int = 100):
@@ -85,6 +130,7 @@ async def whatsapp_handler(request: Request) -> Response:
             
             from_number = message["from"]
             session_id = from_number
+            user_timezone = settings.SCHEDULE_TIMEZONE or timezone_for_phone_number(from_number)
 
             # Get user message and handle different message types
             content = ""
@@ -95,14 +141,14 @@ async def whatsapp_handler(request: Request) -> Response:
                 content = message.get("image", {}).get("caption", "")
                 # Download and analyze image
                 image_bytes = await download_media(message["image"]["id"])
-                try:
-                    description = await image_to_text.analyze_image(
-                        image_bytes,
-                        "Please describe what you see in this image in the context of our conversation.",
-                    )
-                    content += f"\n[Image Analysis: {description}]"
-                except Exception as e:
-                    logger.warning(f"Failed to analyze image: {e}")
+                # WhatsApp delivers one image per message; analyze_images logs and skips failures
+                descriptions = await image_to_text.analyze_images(
+                    [image_bytes],
+                    "Please describe what you see in this image in the context of our conversation.",
+                )
+                for description in descriptions:
+                    if description is not None:
+                        content += f"\n[Image Analysis: {description}]"
             else:
                 content = message["text"]["body"]
 
@@ -111,7 +157,13 @@ async def whatsapp_handler(request: Request) -> Response:
                 graph = graph_builder.compile(checkpointer=short_term_memory)
                 await graph.ainvoke(
                     {"messages": [HumanMessage(content=content)]},
-                    {"configurable": {"thread_id": session_id}},
+                    {
+                        "configurable": {
+                            "thread_id": session_id,
+                            "timezone": user_timezone,
+                            "audio_format": settings.WHATSAPP_AUDIO_FORMAT,
+                        }
+                    },
                 )
 
                 # Get the workflow type and response from the state
@@ -125,10 +177,8 @@ async def whatsapp_handler(request: Request) -> Response:
                 audio_buffer = output_state.values["audio_buffer"]
                 success = await send_response(from_number, response_message, "audio", audio_buffer)
             elif workflow == "image":
-                image_path = output_state.values["image_path"]
-                with open(image_path, "rb") as f:
-                    image_data = f.read()
-                success = await send_response(from_number, response_message, "image", image_data)
+                image_buffer = output_state.values["image_buffer"]
+                success = await send_response(from_number, response_message, "image", image_buffer)
             else:
                 success = await send_response(from_number, response_message, "text")
 
@@ -224,12 +274,27 @@ async def send_response(
         "Authorization": f"Bearer {WHATSAPP_TOKEN}",
         "Content-Type": "application/json",
     }
+    media_key = None
+    text_data = {
+        "messaging_product": "whatsapp",
+        "to": from_number,
+        "type": "text",
+        "text": {"body": response_text},
+    }
 
     if message_type in ["audio", "image"]:
         try:
-            mime_type = "audio/mpeg" if message_type == "audio" else "image/png"
-            media_buffer = BytesIO(media_content)
-            media_id = await upload_media(media_buffer, mime_type)
+            if message_type == "audio":
+                mime_type = audio_mime_type(media_content)
+                duration = audio_duration(media_content)
+                if duration:
+                    logger.info(
+                        f"Uploading {mime_type} voice reply: {len(media_content)} bytes for {duration:.1f}s "
+                        f"of speech ({len(media_content) / duration:.0f} bytes/s)"
+                    )
+            else:
+                mime_type = detect_mime_type(media_content)
+            media_id, media_key = await get_media_id(media_content, mime_type)
             json_data = {
                 "messaging_product": "whatsapp",
                 "to": from_number,
@@ -245,12 +310,7 @@ async def send_response(
             message_type = "text"
 
     if message_type == "text":
-        json_data = {
-            "messaging_product": "whatsapp",
-            "to": from_number,
-            "type": "text",
-            "text": {"body": response_text},
-        }
+        json_data = text_data
 
     print(headers)
     print(json_data)
@@ -262,13 +322,69 @@ async def send_response(
             json=json_data,
         )
 
+        if response.status_code != 200 and media_key is not None and is_media_error(response):
+            # The reused media ID may have expired early; upload again and retry once
+            logger.warning(f"Sending with cached media ID failed ({response.text}), re-uploading")
+            await media_id_cache.adiscard(media_key)
+            try:
+                json_data[message_type]["id"] = (await get_media_id(media_content, mime_type))[0]
+            except Exception as e:
+                logger.error(f"Media re-upload failed, falling back to text: {e}")
+                json_data = text_data
+            response = await client.post(
+                f"https://graph.facebook.com/v22.0/{WHATSAPP_PHONE_NUMBER_ID}/messages",
+                headers=headers,
+                json=json_data,
+            )
+
     return response.status_code == 200
 
 
+def is_media_error(response: httpx.Response) -> bool:
+    """Whether a failed send was rejected because of its media, rather than e.g. rate limits or the recipient."""
+    try:
+        error = response.json().get("error", {})
+    except ValueError:
+        return False
+    code = error.get("code")
+    if code in MEDIA_ERROR_CODES:
+        return True
+    if code in INVALID_PARAMETER_CODES:
+        details = f"{error.get('message', '')} {error.get('error_data', {}).get('details', '')}".lower()
+        return "media" in details or "['id']" in details
+    return False
+
+
+async def get_media_id(media_content: bytes, mime_type: str) -> Tuple[str, Optional[str]]:
+    """Return a WhatsApp media ID for the content, uploading it only if no recent upload matches.
+
+    Returns the media ID and, when it came from the cache, its cache key.
+    """
+    key = None
+    if media_id_cache is not None:
+        key = ResultCache.key(media_content, mime_type, WHATSAPP_PHONE_NUMBER_ID)
+        media_id = await media_id_cache.aget_text(key)
+        if media_id is not None:
+            media_upload_stats.reuses += 1
+            media_upload_stats.bytes_saved += len(media_content)
+            logger.info(
+                f"Reusing media ID for identical {mime_type} ({len(media_content)} bytes; "
+                f"{media_upload_stats.bytes_saved} bytes saved over {media_upload_stats.reuses} reuses)"
+            )
+            return media_id, key
+
+    media_id = await upload_media(BytesIO(media_content), mime_type)
+    media_upload_stats.uploads += 1
+    media_upload_stats.bytes_uploaded += len(media_content)
+    if media_id_cache is not None:
+        await media_id_cache.aput_text(key, media_id)
+    return media_id, None
+
+
 async def upload_media(media_content: BytesIO, mime_type: str) -> str:
     """Upload media to WhatsApp servers."""
     headers = {"Authorization": f"Bearer {WHATSAPP_TOKEN}"}
-    files = {"file": ("response.mp3", media_content, mime_type)}
+    files = {"file": (f"response.{MEDIA_EXTENSIONS.get(mime_type, 'bin')}", media_content, mime_type)}
     data = {"messaging_product": "whatsapp", "type": mime_type}
 
     async with httpx.AsyncClient() as client:
@@ -0,0 +1,96 @@
+import io
+import logging
+from typing import Optional, Tuple
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from ai_companion.settings import ImageFormat
+
+logger = logging.getLogger(__name__)
+
+MIME_TYPES = {
+    "JPEG": "image/jpeg",
+    "PNG": "image/png",
+    "WEBP": "image/webp",
+    "GIF": "image/gif",
+}
+MIN_QUALITY = 40
+
+
+def detect_mime_type(image_bytes: bytes) -> str:
+    """Guess the MIME type of encoded image bytes from their signature."""
+    if image_bytes.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if image_bytes[:4] == b"RIFF" and image_bytes[8:12] == b"WEBP":
+        return "image/webp"
+    if image_bytes[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    return "image/jpeg"
+
+
+def _encode(image: Image.Image, image_format: ImageFormat, quality: int) -> bytes:
+    buffer = io.BytesIO()
+    # PNG ignores quality. No exif= argument, so metadata (location, camera, ...) is dropped
+    image.save(buffer, format=image_format.value.upper(), quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def _load_rgb(image_bytes: bytes, max_dimension: Optional[int]) -> Image.Image:
+    """Decode, apply the EXIF orientation, flatten to RGB and fit within `max_dimension`."""
+    image = Image.open(io.BytesIO(image_bytes))
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info:
+        # Flatten transparency onto white; JPEG has no alpha and vision models ignore it
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        rgba = image.convert("RGBA")
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        image = background
+    elif image.mode != "RGB":
+        image = image.convert("RGB")
+    if max_dimension:
+        image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+    return image
+
+
+def encode_image(
+    image_bytes: bytes, image_format: ImageFormat, quality: int, max_dimension: Optional[int] = None
+) -> Tuple[bytes, str]:
+    """Re-encode an image (e.g. a generated PNG) for delivery, returning the bytes and their MIME type.
+
+    Images Pillow cannot decode are returned unchanged.
+    """
+    try:
+        image = _load_rgb(image_bytes, max_dimension)
+    except (UnidentifiedImageError, OSError) as e:
+        logger.warning(f"Could not decode image, keeping it unchanged: {e}")
+        return image_bytes, detect_mime_type(image_bytes)
+    return _encode(image, image_format, quality), MIME_TYPES[image_format.value.upper()]
+
+
+def prepare_image(
+    image_bytes: bytes, max_dimension: int, image_format: ImageFormat, quality: int, max_bytes: int
+) -> Tuple[bytes, str]:
+    """Downscale and re-encode an image for upload, returning the bytes and their MIME type.
+
+    The EXIF orientation is applied before metadata is stripped. If the result is still
+    over `max_bytes`, quality is lowered down to MIN_QUALITY and then the image is
+    shrunk further. Images Pillow cannot decode are returned unchanged.
+    """
+    try:
+        image = _load_rgb(image_bytes, max_dimension)
+    except (UnidentifiedImageError, OSError) as e:
+        logger.warning(f"Could not decode image, sending it unchanged: {e}")
+        return image_bytes, detect_mime_type(image_bytes)
+
+    encoded = _encode(image, image_format, quality)
+    while len(encoded) > max_bytes and (quality > MIN_QUALITY or max(image.size) > 64):
+        if quality > MIN_QUALITY:
+            quality = max(MIN_QUALITY, quality - 10)
+        else:
+            image = image.resize((max(1, image.width * 3 // 4), max(1, image.height * 3 // 4)))
+        encoded = _encode(image, image_format, quality)
+
+    logger.debug(
+        f"Prepared image {len(image_bytes)} -> {len(encoded)} bytes ({image.width}x{image.height}, q={quality})"
+    )
+    return encoded, MIME_TYPES[image_format.value.upper()]
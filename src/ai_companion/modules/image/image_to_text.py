@@ -1,9 +1,12 @@
+import asyncio
 import base64
 import logging
 import os
-from typing import Optional, Union
+from typing import List, Optional, Sequence, Union
 
 from ai_companion.core.exceptions import ImageToTextError
+from ai_companion.core.result_cache import ResultCache, get_result_cache
+from ai_companion.modules.image.image_processing import detect_mime_type, prepare_image
 from ai_companion.settings import settings, ITTProvider
 from groq import Groq
 from openai import OpenAI
@@ -18,6 +21,7 @@ class ImageToText:
         """Initialize the ImageToText class and validate environment variables."""
         self._validate_env_vars()
         self._client: Optional[Union[Groq, OpenAI]] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
         self.logger = logging.getLogger(__name__)
 
     def _validate_env_vars(self) -> None:
@@ -36,6 +40,13 @@ class ImageToText:
                 self._client = OpenAI(api_key=settings.OPENAI_API_KEY)
         return self._client
 
+    @property
+    def itt_model(self) -> str:
+        """Get the vision model name based on provider."""
+        if settings.ITT_PROVIDER == ITTProvider.GROQ:
+            return settings.ITT_GROQ_MODEL_NAME
+        return settings.ITT_OPENAI_MODEL_NAME
+
     async def analyze_image(self, image_data: Union[str, bytes], prompt: str = "") -> str:
         """Analyze an image using Groq or OpenAI vision capabilities.
 
@@ -63,13 +74,46 @@ class ImageToText:
             if not image_bytes:
                 raise ValueError("Image data cannot be empty")
 
-            # Convert image to base64
-            base64_image = base64.b64encode(image_bytes).decode("utf-8")
-
             # Default prompt if none provided
             if not prompt:
                 prompt = "Please describe what you see in this image in detail."
 
+            # Forwarded images are byte-identical, so the analysis can be reused. The key covers
+            # everything that shapes the payload the model sees, not just the original bytes
+            cache = get_result_cache("itt")
+            cache_key = ResultCache.key(
+                image_bytes,
+                settings.ITT_PROVIDER.value,
+                self.itt_model,
+                prompt,
+                settings.ITT_PREPROCESS,
+                settings.ITT_MAX_DIMENSION,
+                settings.ITT_IMAGE_FORMAT.value,
+                settings.ITT_IMAGE_QUALITY,
+                settings.ITT_MAX_IMAGE_BYTES,
+            )
+            if cache is not None:
+                cached = await cache.aget_text(cache_key)
+                if cached is not None:
+                    self.logger.info(f"Image analysis cache hit (hit rate: {cache.stats.hit_rate:.2%})")
+                    return cached
+
+            # Downscale and re-encode off the event loop; decoding a phone photo takes tens of ms
+            if settings.ITT_PREPROCESS:
+                payload, mime_type = await asyncio.to_thread(
+                    prepare_image,
+                    image_bytes,
+                    settings.ITT_MAX_DIMENSION,
+                    settings.ITT_IMAGE_FORMAT,
+                    settings.ITT_IMAGE_QUALITY,
+                    settings.ITT_MAX_IMAGE_BYTES,
+                )
+            else:
+                payload, mime_type = image_bytes, detect_mime_type(image_bytes)
+
+            # Convert image to base64
+            base64_image = base64.b64encode(payload).decode("utf-8")
+
             # Create the messages for the vision API
             messages = [
                 {
@@ -78,22 +122,20 @@ class ImageToText:
                         {"type": "text", "text": prompt},
                         {
                             "type": "image_url",
-                            "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"},
+                            "image_url": {"url": f"data:{mime_type};base64,{base64_image}"},
                         },
                     ],
                 }
             ]
 
-            # Make the API call based on provider
-            if settings.ITT_PROVIDER == ITTProvider.GROQ:
-                response = self.client.chat.completions.create(
-                    model=settings.ITT_GROQ_MODEL_NAME,
-                    messages=messages,
-                    max_tokens=1000,
-                )
-            else:  # OpenAI
-                response = self.client.chat.completions.create(
-                    model=settings.ITT_OPENAI_MODEL_NAME,
+            # Make the API call based on provider; the SDKs are synchronous, so keep them off the
+            # event loop and cap how many run at once (analyze_images fans out)
+            if self._semaphore is None:
+                self._semaphore = asyncio.Semaphore(settings.ITT_MAX_CONCURRENCY)
+            async with self._semaphore:
+                response = await asyncio.to_thread(
+                    self.client.chat.completions.create,
+                    model=self.itt_model,
                     messages=messages,
                     max_tokens=1000,
                 )
@@ -103,8 +145,35 @@ class ImageToText:
 
             description = response.choices[0].message.content
             self.logger.info(f"Generated image description: {description}")
+            if cache is not None and description:
+                await cache.aput_text(cache_key, description)
 
             return description
 
         except Exception as e:
             raise ImageToTextError(f"Failed to analyze image: {str(e)}") from e
+
+    async def analyze_images(
+        self, images: Sequence[Union[str, bytes]], prompt: str = ""
+    ) -> List[Optional[str]]:
+        """Analyze several images concurrently (at most ITT_MAX_CONCURRENCY requests at a time).
+
+        Args:
+            images: File paths or binary image data
+            prompt: Optional prompt applied to every image
+
+        Returns:
+            List[Optional[str]]: One description per image, in input order; None where the
+            analysis failed (the error is logged)
+        """
+        results = await asyncio.gather(
+            *(self.analyze_image(image, prompt) for image in images), return_exceptions=True
+        )
+        descriptions: List[Optional[str]] = []
+        for index, result in enumerate(results):
+            if isinstance(result, Exception):
+                self.logger.warning(f"Failed to analyze image {index + 1} of {len(images)}: {result}")
+                descriptions.append(None)
+            else:
+                descriptions.append(result)
+        return descriptions
@@ -1,3 +1,4 @@
+import asyncio
 import base64
 import logging
 import os
@@ -5,6 +6,7 @@ from typing import Optional
 
 from ai_companion.core.exceptions import TextToImageError
 from ai_companion.core.prompts import IMAGE_ENHANCEMENT_PROMPT, IMAGE_SCENARIO_PROMPT
+from ai_companion.modules.image.image_processing import encode_image
 from ai_companion.settings import settings, LLMProvider, TTIProvider
 from langchain.prompts import PromptTemplate
 from langchain_groq import ChatGroq
@@ -87,9 +89,11 @@ class TextToImage:
         try:
             self.logger.info(f"Generating image for prompt: '{prompt}'")
 
+            # The provider SDKs are synchronous; keep them off the event loop
             if settings.TTI_PROVIDER == TTIProvider.TOGETHER:
                 # Generate image using Together AI
-                response = self.together_client.images.generate(
+                response = await asyncio.to_thread(
+                    self.together_client.images.generate,
                     prompt=prompt,
                     model=settings.TTI_MODEL_NAME,
                     width=1024,
@@ -102,7 +106,8 @@ class TextToImage:
                 image_data = base64.b64decode(response.data[0].b64_json)
             else:  # OpenAI
                 # Generate image using OpenAI (DALL-E)
-                response = self.openai_client.images.generate(
+                response = await asyncio.to_thread(
+                    self.openai_client.images.generate,
                     model=settings.OPENAI_TTI_MODEL_NAME,
                     prompt=prompt,
                     n=1,
@@ -112,6 +117,17 @@ class TextToImage:
                 
                 image_data = base64.b64decode(response.data[0].b64_json)
 
+            # Providers return PNG; re-encode once so every delivery sends the compact version
+            generated_size = len(image_data)
+            image_data, mime_type = await asyncio.to_thread(
+                encode_image,
+                image_data,
+                settings.TTI_OUTPUT_FORMAT,
+                settings.TTI_OUTPUT_QUALITY,
+                settings.TTI_OUTPUT_MAX_DIMENSION,
+            )
+            self.logger.info(f"Encoded generated image as {mime_type}: {generated_size} -> {len(image_data)} bytes")
+
             if output_path:
                 os.makedirs(os.path.dirname(output_path), exist_ok=True)
                 with open(output_path, "wb") as f:
@@ -141,7 +157,7 @@ class TextToImage:
                 | structured_llm
             )
 
-            scenario = chain.invoke({"chat_history": formatted_history})
+            scenario = await chain.ainvoke({"chat_history": formatted_history})
             self.logger.info(f"Created scenario: {scenario}")
 
             return scenario
@@ -165,7 +181,7 @@ class TextToImage:
                 | structured_llm
             )
 
-            enhanced_prompt = chain.invoke({"prompt": prompt}).content
+            enhanced_prompt = (await chain.ainvoke({"prompt": prompt})).content
             self.logger.info(f"Enhanced prompt: '{enhanced_prompt}'")
 
             return enhanced_prompt
@@ -0,0 +1,194 @@
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Generic, Optional, Type, TypeVar
+
+import numpy as np
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T", bound=BaseModel)
+
+NUMBER_PATTERN = re.compile(r"\d+")
+
+
+@dataclass
+class CacheStats:
+    """Counters for the memory analysis cache."""
+
+    lookups: int = 0
+    exact_hits: int = 0
+    semantic_hits: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.exact_hits + self.semantic_hits
+
+    @property
+    def misses(self) -> int:
+        return self.lookups - self.hits
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    @property
+    def llm_calls_avoided(self) -> int:
+        return self.hits
+
+
+@dataclass
+class _CacheEntry(Generic[T]):
+    value: T
+    embedding: Optional[np.ndarray] = None
+
+
+class MemoryAnalysisCache(Generic[T]):
+    """Bounded LRU cache for memory analysis results.
+
+    Entries are keyed by normalized message text. When an embedding function and a
+    similarity threshold are given, a miss on the exact key falls back to the most
+    similar cached message above the threshold, as long as both mention the same numbers
+    (embeddings barely separate "I'm 25" from "I'm 52"). Entries can optionally be
+    persisted to SQLite so the cache survives restarts.
+    """
+
+    TABLE_NAME = "memory_analysis_cache"
+    MAX_PENDING_EMBEDDINGS = 64  # embeddings of recent misses, reused when their analysis is stored
+
+    def __init__(
+        self,
+        model_cls: Type[T],
+        max_size: int = 1024,
+        similarity_threshold: Optional[float] = None,
+        embed: Optional[Callable[[str], np.ndarray]] = None,
+        db_path: Optional[str] = None,
+    ):
+        self.model_cls = model_cls
+        self.max_size = max_size
+        self.similarity_threshold = similarity_threshold
+        self.embed = embed if similarity_threshold is not None else None
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[str, _CacheEntry[T]]" = OrderedDict()
+        self._miss_embeddings: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.TABLE_NAME} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, embedding BLOB, last_used REAL NOT NULL)"
+            )
+            self._db.commit()
+            self._load()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Normalize a message so trivial variations share a cache key."""
+        text = re.sub(r"[^\w\s']", " ", text.lower())
+        return " ".join(text.split())
+
+    def get(self, text: str) -> Optional[T]:
+        """Return the cached analysis for a message, or None on a miss."""
+        key = self.normalize(text)
+        with self._lock:
+            self.stats.lookups += 1
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats.exact_hits += 1
+                self._touch(key)
+                return entry.value
+
+        if self.embed is None:
+            return None
+
+        embedding = self._embed(key)
+        with self._lock:
+            match = self._most_similar(embedding)
+            if match is None or NUMBER_PATTERN.findall(match) != NUMBER_PATTERN.findall(key):
+                # The caller analyzes the message next and stores it with put(); keep its embedding
+                self._miss_embeddings[key] = embedding
+                while len(self._miss_embeddings) > self.MAX_PENDING_EMBEDDINGS:
+                    self._miss_embeddings.popitem(last=False)
+                return None
+            self._entries.move_to_end(match)
+            self.stats.semantic_hits += 1
+            self._touch(match)
+            logger.debug(f"Semantic cache hit for '{key}' -> '{match}'")
+            return self._entries[match].value
+
+    def put(self, text: str, value: T) -> None:
+        """Store an analysis for a message, evicting the least recently used entry if full."""
+        key = self.normalize(text)
+        with self._lock:
+            embedding = self._miss_embeddings.pop(key, None)
+        if embedding is None and self.embed is not None:
+            embedding = self._embed(key)
+        with self._lock:
+            self._entries[key] = _CacheEntry(value=value, embedding=embedding)
+            self._entries.move_to_end(key)
+            evicted = []
+            while len(self._entries) > self.max_size:
+                evicted.append(self._entries.popitem(last=False)[0])
+            self._persist(key, value, embedding, evicted)
+
+    def clear(self) -> None:
+        """Drop every cached entry, including persisted ones."""
+        with self._lock:
+            self._entries.clear()
+            self._miss_embeddings.clear()
+            if self._db is not None:
+                self._db.execute(f"DELETE FROM {self.TABLE_NAME}")
+                self._db.commit()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _embed(self, key: str) -> np.ndarray:
+        embedding = np.asarray(self.embed(key), dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm else embedding
+
+    def _most_similar(self, embedding: np.ndarray) -> Optional[str]:
+        keys = [key for key, entry in self._entries.items() if entry.embedding is not None]
+        if not keys:
+            return None
+        matrix = np.vstack([self._entries[key].embedding for key in keys])
+        scores = matrix @ embedding
+        best = int(np.argmax(scores))
+        return keys[best] if scores[best] >= self.similarity_threshold else None
+
+    def _load(self) -> None:
+        rows = self._db.execute(
+            f"SELECT key, value, embedding FROM {self.TABLE_NAME} ORDER BY last_used DESC LIMIT ?",
+            (self.max_size,),
+        ).fetchall()
+        for key, value, blob in reversed(rows):
+            embedding = np.frombuffer(blob, dtype=np.float32) if blob is not None else None
+            self._entries[key] = _CacheEntry(value=self.model_cls.model_validate_json(value), embedding=embedding)
+        logger.info(f"Loaded {len(rows)} memory analyses from cache")
+
+    def _persist(self, key: str, value: T, embedding: Optional[np.ndarray], evicted: list) -> None:
+        if self._db is None:
+            return
+        blob = embedding.tobytes() if embedding is not None else None
+        self._db.execute(
+            f"INSERT OR REPLACE INTO {self.TABLE_NAME} (key, value, embedding, last_used) VALUES (?, ?, ?, ?)",
+            (key, value.model_dump_json(), blob, time.time()),
+        )
+        if evicted:
+            self._db.executemany(f"DELETE FROM {self.TABLE_NAME} WHERE key = ?", [(k,) for k in evicted])
+        self._db.commit()
+
+    def _touch(self, key: str) -> None:
+        if self._db is None:
+            return
+        self._db.execute(f"UPDATE {self.TABLE_NAME} SET last_used = ? WHERE key = ?", (time.time(), key))
+        self._db.commit()
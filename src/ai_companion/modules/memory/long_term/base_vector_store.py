@@ -1,7 +1,16 @@
+import asyncio
+import logging
+import threading
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ai_companion.modules.memory.long_term.lexical_index import BM25Index
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -11,6 +20,7 @@ class Memory:
     text: str
     metadata: dict
     score: Optional[float] = None
+    vector: Optional[List[float]] = None
 
     @property
     def id(self) -> Optional[str]:
@@ -19,12 +29,19 @@ class Memory:
     @property
     def timestamp(self) -> Optional[datetime]:
         ts = self.metadata.get("timestamp")
+        if isinstance(ts, datetime):
+            return ts
         return datetime.fromisoformat(ts) if ts else None
 
 
 class BaseVectorStore(ABC):
     """Abstract base class for vector store implementations."""
 
+    RRF_K = 60  # Reciprocal rank fusion constant
+
+    _lexical_index: Optional[BM25Index] = None
+    _lexical_lock = threading.Lock()
+
     @abstractmethod
     def find_similar_memory(self, text: str) -> Optional[Memory]:
         """Find if a similar memory already exists."""
@@ -35,7 +52,196 @@ class BaseVectorStore(ABC):
         """Store a new memory in the vector store."""
         pass
 
+    def store_memories(self, memories: List[Tuple[str, dict]], deduplicate: bool = True) -> None:
+        """Store several (text, metadata) memories at once.
+
+        Backends override this with a bulk write; the default stores them one by one.
+        With `deduplicate=False` (bulk loads) the bulk implementations skip the write-time
+        similarity check, so every memory keeps the ID in its metadata.
+        """
+        for text, metadata in memories:
+            self.store_memory(text, metadata)
+
+    @staticmethod
+    def batch_duplicates(
+        texts: Sequence[str], vectors: Optional[Sequence[Sequence[float]]], threshold: float
+    ) -> List[Optional[int]]:
+        """For each memory of a batch, the index of an earlier memory in the batch it duplicates.
+
+        The store is only searched for similar memories before the write, so two near-identical
+        memories in one batch would otherwise both be inserted. Memories are compared by cosine
+        similarity of their vectors, or by normalized text when the store embeds server-side.
+        """
+        duplicates: List[Optional[int]] = [None] * len(texts)
+        if vectors is None:
+            first: Dict[str, int] = {}
+            for i, text in enumerate(texts):
+                duplicates[i] = first.setdefault(" ".join(text.lower().split()), i)
+                if duplicates[i] == i:
+                    duplicates[i] = None
+            return duplicates
+
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.where(norms == 0, 1, norms)
+        similarities = matrix @ matrix.T
+        for i in range(1, len(texts)):
+            for j in range(i):
+                if duplicates[j] is None and similarities[i, j] >= threshold:
+                    duplicates[i] = j
+                    break
+        return duplicates
+
     @abstractmethod
     def search_memories(self, query: str, k: int = 5) -> List[Memory]:
         """Search for similar memories in the vector store."""
-        pass 
\ No newline at end of file
+        pass
+
+    async def asearch_memories(self, query: str, k: int = 5) -> List[Memory]:
+        """Search for similar memories without blocking the event loop.
+
+        Backends with an async client override this; the default runs the sync search in a thread.
+        """
+        return await asyncio.to_thread(self.search_memories, query, k)
+
+    @property
+    def supports_vector_search(self) -> bool:
+        """Whether the store is searchable with vectors from the local embedding model."""
+        return False
+
+    def search_memories_by_vector(self, vector: Sequence[float], k: int = 5) -> List[Memory]:
+        """Search with a precomputed vector instead of query text.
+
+        The vector must be in the collection's vector space: a local embedding when
+        `supports_vector_search` is true, otherwise a vector read back from the store.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support vector search")
+
+    async def asearch_memories_by_vector(self, vector: Sequence[float], k: int = 5) -> List[Memory]:
+        """Search with a precomputed local embedding without blocking the event loop."""
+        return await asyncio.to_thread(self.search_memories_by_vector, vector, k)
+
+    # Maintenance operations, used by consolidation and import/export rather than on the hot path
+
+    def scroll_memories(
+        self, offset: Optional[Any] = None, limit: int = 100, with_vectors: bool = False
+    ) -> Tuple[List[Memory], Optional[Any]]:
+        """Read one page of memories in storage order.
+
+        Returns the page and the offset of the next one, or None after the last page.
+        Memory IDs are in `metadata["id"]`.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support scrolling")
+
+    def oldest_memories(self, limit: int) -> List[Memory]:
+        """The `limit` memories with the oldest timestamps."""
+        raise NotImplementedError(f"{type(self).__name__} does not support ordering by timestamp")
+
+    def count_memories(self) -> int:
+        """Number of stored memories."""
+        raise NotImplementedError(f"{type(self).__name__} does not support counting")
+
+    def delete_memories(self, ids: Sequence[str]) -> None:
+        """Delete memories by ID."""
+        raise NotImplementedError(f"{type(self).__name__} does not support deletion")
+
+    # Hybrid retrieval: an in-process BM25 index fused with dense results
+
+    @property
+    def lexical_index(self) -> BM25Index:
+        """The BM25 index over stored memories, built from the store on first use.
+
+        After that it is updated incrementally as memories are stored and deleted.
+        """
+        if self._lexical_index is None:
+            with self._lexical_lock:
+                if self._lexical_index is None:
+                    index = BM25Index()
+                    cursor = None
+                    while True:
+                        memories, cursor = self.scroll_memories(offset=cursor, limit=1000)
+                        index.add_many((str(memory.id), memory.text) for memory in memories)
+                        if cursor is None:
+                            break
+                    logger.info(f"Built lexical index over {len(index)} memories")
+                    self._lexical_index = index
+        return self._lexical_index
+
+    def _index_memories(self, memories: Sequence[Tuple[Any, str]]) -> None:
+        """Add (id, text) pairs to the lexical index, if it has been built."""
+        if self._lexical_index is not None:
+            self._lexical_index.add_many((str(memory_id), text) for memory_id, text in memories)
+
+    def _unindex_memories(self, ids: Sequence[Any]) -> None:
+        if self._lexical_index is not None:
+            for memory_id in ids:
+                self._lexical_index.remove(str(memory_id))
+
+    @classmethod
+    def fuse(cls, dense: List[Memory], lexical: List[Tuple[str, float]], index: BM25Index, k: int) -> List[Memory]:
+        """Reciprocal rank fusion of dense results and BM25 (id, score) results.
+
+        Memories keep their dense similarity as `score` (None if only BM25 matched them)
+        and the fused score is in `metadata["rrf_score"]`.
+        """
+        fused: Dict[str, float] = {}
+        memories: Dict[str, Memory] = {}
+        for rank, memory in enumerate(dense):
+            key = str(memory.id) if memory.id is not None else memory.text
+            fused[key] = fused.get(key, 0.0) + 1 / (cls.RRF_K + rank + 1)
+            memories[key] = memory
+        for rank, (doc_id, _) in enumerate(lexical):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1 / (cls.RRF_K + rank + 1)
+            if doc_id not in memories:
+                memories[doc_id] = Memory(text=index.text(doc_id), metadata={"id": doc_id})
+
+        ranked = sorted(fused, key=fused.get, reverse=True)[:k]
+        for key in ranked:
+            memories[key].metadata["rrf_score"] = fused[key]
+        return [memories[key] for key in ranked]
+
+    @classmethod
+    def fuse_rankings(cls, rankings: Sequence[List[Memory]], k: int) -> List[Memory]:
+        """Reciprocal rank fusion of already ranked memory lists, matched by text.
+
+        Used to merge results whose scores are not comparable, such as fused hybrid results
+        (where BM25-only matches have no similarity) and a dense ranking of pending memories.
+        """
+        fused: Dict[str, float] = {}
+        memories: Dict[str, Memory] = {}
+        for ranking in rankings:
+            for rank, memory in enumerate(ranking):
+                fused[memory.text] = fused.get(memory.text, 0.0) + 1 / (cls.RRF_K + rank + 1)
+                memories.setdefault(memory.text, memory)
+
+        ranked = sorted(fused, key=fused.get, reverse=True)[:k]
+        for text in ranked:
+            memories[text].metadata["rrf_score"] = fused[text]
+        return [memories[text] for text in ranked]
+
+    def hybrid_search_memories(
+        self, query: str, k: int = 5, vector: Optional[Sequence[float]] = None, candidates: int = 10
+    ) -> List[Memory]:
+        """Search with both the vector index and BM25, fused by reciprocal rank.
+
+        Pass `vector` to search the dense side by a precomputed query embedding.
+        """
+        limit = max(k, candidates)
+        if vector is not None:
+            dense = self.search_memories_by_vector(vector, limit)
+        else:
+            dense = self.search_memories(query, limit)
+        index = self.lexical_index
+        return self.fuse(dense, index.search(query, limit), index, k)
+
+    async def ahybrid_search_memories(
+        self, query: str, k: int = 5, vector: Optional[Sequence[float]] = None, candidates: int = 10
+    ) -> List[Memory]:
+        """Hybrid search without blocking the event loop."""
+        limit = max(k, candidates)
+        if vector is not None:
+            dense = await self.asearch_memories_by_vector(vector, limit)
+        else:
+            dense = await self.asearch_memories(query, limit)
+        index = self._lexical_index or await asyncio.to_thread(lambda: self.lexical_index)
+        return self.fuse(dense, index.search(query, limit), index, k)
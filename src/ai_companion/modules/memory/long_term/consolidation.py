@@ -0,0 +1,237 @@
+"""Incremental long-term memory consolidation.
+
+Each run reads one page of memories from a persisted cursor, looks up each memory's
+near-duplicates in the store by vector, and merges every cluster into its most recent
+member, optionally rewriting it with one LLM call per cluster. It then evicts the oldest
+memories above MEMORY_CONSOLIDATION_MAX_MEMORIES. The cursor wraps around, so repeated
+runs sweep the whole collection without ever scanning it at once:
+
+    uv run python -m ai_companion.modules.memory.long_term.consolidation [--pages 5] [--llm]
+
+Set MEMORY_CONSOLIDATION_INTERVAL to also run it periodically inside the WhatsApp server.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, List, Optional
+
+from pydantic import BaseModel, Field
+
+from ai_companion.core.prompts import MEMORY_CONSOLIDATION_PROMPT
+from ai_companion.modules.memory.long_term.base_vector_store import BaseVectorStore, Memory
+from ai_companion.modules.memory.long_term.context_cache import get_memory_context_cache
+from ai_companion.modules.memory.long_term.memory_manager import get_memory_llm
+from ai_companion.modules.memory.long_term.vector_store import get_vector_store
+from ai_companion.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ConsolidatedMemory(BaseModel):
+    """A single memory merged from a cluster of near-duplicates."""
+
+    text: str = Field(..., description="The merged memory")
+
+
+@dataclass
+class ConsolidationReport:
+    """What one consolidation run did."""
+
+    scanned: int = 0
+    clusters: int = 0
+    merged: int = 0
+    rewritten: int = 0
+    evicted: int = 0
+    completed_pass: bool = False
+    seconds: float = 0.0
+
+
+def _recency(memory: Memory) -> datetime:
+    try:
+        ts = memory.timestamp
+    except ValueError:
+        ts = None
+    if ts is None:
+        return datetime.min.replace(tzinfo=timezone.utc)
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+class MemoryConsolidator:
+    """Merges near-duplicate memories and enforces a memory cap, one page at a time.
+
+    Long-term memories are not partitioned by user, so the cap applies to the whole
+    collection and clusters are formed across it.
+    """
+
+    CLUSTER_CANDIDATES = 10  # neighbours checked per memory
+
+    def __init__(
+        self,
+        vector_store: BaseVectorStore,
+        similarity_threshold: float = 0.92,
+        page_size: int = 200,
+        max_memories: Optional[int] = None,
+        use_llm: bool = False,
+        state_path: Optional[str] = None,
+    ):
+        self.vector_store = vector_store
+        self.similarity_threshold = similarity_threshold
+        self.page_size = page_size
+        self.max_memories = max_memories
+        self.state_path = state_path
+        self.llm = get_memory_llm().with_structured_output(ConsolidatedMemory) if use_llm else None
+        self.cursor: Optional[Any] = self._load_cursor()
+
+    def run(self, pages: int = 1) -> ConsolidationReport:
+        """Consolidate up to `pages` pages from the cursor, then enforce the cap."""
+        report = ConsolidationReport()
+        start = time.perf_counter()
+        changed = False
+
+        for _ in range(pages):
+            memories, next_cursor = self.vector_store.scroll_memories(
+                offset=self.cursor, limit=self.page_size, with_vectors=True
+            )
+            report.scanned += len(memories)
+            changed |= self._consolidate_page(memories, report)
+            self.cursor = next_cursor
+            self._save_cursor()
+            if next_cursor is None:
+                report.completed_pass = True
+                break
+
+        changed |= self._enforce_cap(report)
+        if changed:
+            get_memory_context_cache().bump_version()
+
+        report.seconds = time.perf_counter() - start
+        logger.info(f"Memory consolidation: {report}")
+        return report
+
+    def _consolidate_page(self, memories: List[Memory], report: ConsolidationReport) -> bool:
+        removed: set = set()
+        for memory in memories:
+            if memory.id in removed or memory.vector is None:
+                continue
+
+            neighbours = self.vector_store.search_memories_by_vector(memory.vector, k=self.CLUSTER_CANDIDATES)
+            cluster = [
+                n
+                for n in neighbours
+                if n.score is not None and n.score >= self.similarity_threshold and n.id not in removed
+            ]
+            if len(cluster) < 2:
+                continue
+
+            cluster.sort(key=_recency)
+            keeper, duplicates = cluster[-1], cluster[:-1]
+            duplicate_ids = [d.id for d in duplicates]
+            self.vector_store.delete_memories(duplicate_ids)
+            removed.update(duplicate_ids)
+            report.clusters += 1
+            report.merged += len(duplicates)
+            logger.debug(f"Merged {len(duplicates)} memories into '{keeper.text}'")
+
+            if self.llm is not None:
+                merged = self._merge_text(cluster)
+                if merged and merged != keeper.text:
+                    self.vector_store.store_memory(
+                        merged, {"id": keeper.id, "timestamp": _recency(keeper).isoformat()}
+                    )
+                    report.rewritten += 1
+        return bool(removed)
+
+    def _merge_text(self, cluster: List[Memory]) -> Optional[str]:
+        prompt = MEMORY_CONSOLIDATION_PROMPT.format(memories="\n".join(f"- {m.text}" for m in cluster))
+        try:
+            return self.llm.invoke(prompt).text.strip()
+        except Exception as e:
+            logger.warning(f"LLM merge failed, keeping the most recent memory: {str(e)}")
+            return None
+
+    def _enforce_cap(self, report: ConsolidationReport) -> bool:
+        if self.max_memories is None:
+            return False
+        excess = self.vector_store.count_memories() - self.max_memories
+        if excess <= 0:
+            return False
+
+        # Evict at most one page per run to keep each run bounded
+        oldest = self.vector_store.oldest_memories(min(excess, self.page_size))
+        self.vector_store.delete_memories([m.id for m in oldest])
+        report.evicted += len(oldest)
+        return bool(oldest)
+
+    def _load_cursor(self) -> Optional[Any]:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return None
+        with open(self.state_path) as f:
+            return json.load(f).get("cursor")
+
+    def _save_cursor(self) -> None:
+        if not self.state_path:
+            return
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"cursor": self.cursor}, f)
+        os.replace(tmp_path, self.state_path)
+
+
+def get_memory_consolidator() -> MemoryConsolidator:
+    """Get a MemoryConsolidator for the configured vector store and settings."""
+    return MemoryConsolidator(
+        get_vector_store(),
+        similarity_threshold=settings.MEMORY_CONSOLIDATION_SIMILARITY,
+        page_size=settings.MEMORY_CONSOLIDATION_PAGE_SIZE,
+        max_memories=settings.MEMORY_CONSOLIDATION_MAX_MEMORIES,
+        use_llm=settings.MEMORY_CONSOLIDATION_USE_LLM,
+        state_path=settings.MEMORY_CONSOLIDATION_STATE_PATH,
+    )
+
+
+async def run_periodic_consolidation(interval: float) -> None:
+    """Run one consolidation page every `interval` seconds until cancelled."""
+    consolidator = get_memory_consolidator()
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(consolidator.run)
+        except Exception as e:
+            logger.error(f"Memory consolidation failed: {str(e)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=1, help="pages to process in this run")
+    parser.add_argument("--page-size", type=int, default=settings.MEMORY_CONSOLIDATION_PAGE_SIZE)
+    parser.add_argument("--similarity", type=float, default=settings.MEMORY_CONSOLIDATION_SIMILARITY)
+    parser.add_argument("--max-memories", type=int, default=settings.MEMORY_CONSOLIDATION_MAX_MEMORIES)
+    parser.add_argument("--llm", action="store_true", default=settings.MEMORY_CONSOLIDATION_USE_LLM)
+    parser.add_argument("--state", default=settings.MEMORY_CONSOLIDATION_STATE_PATH, help="cursor file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    consolidator = MemoryConsolidator(
+        get_vector_store(),
+        similarity_threshold=args.similarity,
+        page_size=args.page_size,
+        max_memories=args.max_memories,
+        use_llm=args.llm,
+        state_path=args.state,
+    )
+    report = consolidator.run(pages=args.pages)
+    print(
+        f"Scanned {report.scanned} memories in {report.seconds:.1f}s: merged {report.merged} duplicates "
+        f"in {report.clusters} clusters ({report.rewritten} rewritten), evicted {report.evicted}"
+        + (", finished a full pass" if report.completed_pass else "")
+    )
+
+
+if __name__ == "__main__":
+    main()
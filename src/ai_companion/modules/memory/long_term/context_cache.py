@@ -0,0 +1,89 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+
+from ai_companion.settings import settings
+
+
+@dataclass
+class _CachedContext:
+    query_vector: np.ndarray
+    memory_context: str
+    version: int
+
+
+@dataclass
+class ContextCacheStats:
+    """Counters for memory context reuse."""
+
+    lookups: int = 0
+    retrievals_avoided: int = 0
+    topic_changed: int = 0
+    memories_changed: int = 0
+
+    @property
+    def reuse_rate(self) -> float:
+        return self.retrievals_avoided / self.lookups if self.lookups else 0.0
+
+
+class MemoryContextCache:
+    """Remembers the last memory context retrieved for each conversation thread.
+
+    A cached context is reused while the new query vector stays within `similarity_threshold`
+    (cosine) of the one it was retrieved for and no memory has been written since, as
+    tracked by a version counter that every memory write bumps. The counter is per process,
+    so writes from other workers or processes do not invalidate it.
+    """
+
+    def __init__(self, similarity_threshold: float = 0.95, max_threads: int = 4096):
+        self.similarity_threshold = similarity_threshold
+        self.max_threads = max_threads
+        self.stats = ContextCacheStats()
+        self._entries: "OrderedDict[str, _CachedContext]" = OrderedDict()
+        self._version = 0
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def bump_version(self) -> None:
+        """Record that the stored memories changed, so no cached context is reused."""
+        with self._lock:
+            self._version += 1
+
+    def get(self, thread_id: str, query_vector: np.ndarray) -> Optional[str]:
+        """Return the cached memory context for the thread if it is still valid, else None."""
+        with self._lock:
+            self.stats.lookups += 1
+            entry = self._entries.get(thread_id)
+            if entry is None:
+                return None
+            if entry.version != self._version:
+                self.stats.memories_changed += 1
+                return None
+            # Query vectors are normalized, so the dot product is the cosine similarity
+            if float(np.dot(entry.query_vector, query_vector)) < self.similarity_threshold:
+                self.stats.topic_changed += 1
+                return None
+            self._entries.move_to_end(thread_id)
+            self.stats.retrievals_avoided += 1
+            return entry.memory_context
+
+    def put(self, thread_id: str, query_vector: np.ndarray, memory_context: str, version: int) -> None:
+        """Cache a context retrieved while the memory version was `version`."""
+        with self._lock:
+            self._entries[thread_id] = _CachedContext(query_vector, memory_context, version)
+            self._entries.move_to_end(thread_id)
+            while len(self._entries) > self.max_threads:
+                self._entries.popitem(last=False)
+
+
+@lru_cache
+def get_memory_context_cache() -> MemoryContextCache:
+    """Get the process-wide memory context cache."""
+    return MemoryContextCache(similarity_threshold=settings.MEMORY_CONTEXT_REUSE_SIMILARITY or 1.0)
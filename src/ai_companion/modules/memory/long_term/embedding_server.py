@@ -0,0 +1,93 @@
+"""Shared embedding sidecar serving encode requests over a Unix socket.
+
+Run one per host and point every worker at it with EMBEDDING_SERVICE=socket:
+
+    uv run python -m ai_companion.modules.memory.long_term.embedding_server
+
+The model is loaded once, and concurrent requests from all workers are micro-batched
+into single forward passes. Frames are a 4-byte big-endian length followed by the
+payload: requests are JSON ({"op": "encode", "texts": [...]} or {"op": "stats"}),
+responses are a JSON header followed, for encodes, by the raw float32 vectors.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import struct
+
+from ai_companion.modules.memory.long_term.embeddings import EMBEDDING_MODEL, MicroBatcher, get_embedding_model
+from ai_companion.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+async def _write_frame(writer: asyncio.StreamWriter, payload: bytes) -> None:
+    writer.write(struct.pack(">I", len(payload)) + payload)
+    await writer.drain()
+
+
+class EmbeddingServer:
+    """Asyncio Unix-socket server in front of a MicroBatcher."""
+
+    def __init__(self, socket_path: str, model_name: str = EMBEDDING_MODEL, stats_interval: float = 60.0):
+        self.socket_path = socket_path
+        self.stats_interval = stats_interval
+        model = get_embedding_model(model_name)
+        self.batcher = MicroBatcher(
+            lambda texts: model.encode(texts, batch_size=len(texts)),
+            max_batch_size=settings.EMBEDDING_MAX_BATCH_SIZE,
+            window_ms=settings.EMBEDDING_BATCH_WINDOW_MS,
+        )
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                (length,) = struct.unpack(">I", await reader.readexactly(4))
+                request = json.loads(await reader.readexactly(length))
+                if request.get("op") == "stats":
+                    await _write_frame(writer, json.dumps({"stats": self.batcher.stats.summary()}).encode())
+                    continue
+                try:
+                    vectors = await asyncio.wrap_future(self.batcher.submit(request["texts"]))
+                except Exception as e:
+                    await _write_frame(writer, json.dumps({"error": str(e)}).encode())
+                    continue
+                await _write_frame(writer, json.dumps({"shape": list(vectors.shape)}).encode())
+                await _write_frame(writer, vectors.tobytes())
+        except asyncio.IncompleteReadError:
+            pass
+        finally:
+            writer.close()
+
+    async def _log_stats(self) -> None:
+        last_batches = 0
+        while True:
+            await asyncio.sleep(self.stats_interval)
+            stats = self.batcher.stats
+            if stats.batches != last_batches:
+                logger.info(f"Embedding stats: {stats.summary()}")
+                last_batches = stats.batches
+
+    async def serve(self) -> None:
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        server = await asyncio.start_unix_server(self.handle, path=self.socket_path)
+        logger.info(f"Embedding server listening on {self.socket_path}")
+        async with server:
+            await asyncio.gather(server.serve_forever(), self._log_stats())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--socket", default=settings.EMBEDDING_SOCKET_PATH)
+    parser.add_argument("--model", default=EMBEDDING_MODEL)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(EmbeddingServer(args.socket, args.model).serve())
+
+
+if __name__ == "__main__":
+    main()
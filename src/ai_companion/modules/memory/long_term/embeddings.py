@@ -0,0 +1,294 @@
+import asyncio
+import json
+import logging
+import os
+import queue
+import resource
+import socket
+import struct
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, List, Optional, Union
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from ai_companion.settings import settings, EmbeddingBackend, EmbeddingServiceMode
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+logger = logging.getLogger(__name__)
+
+
+def get_embedding_model(
+    model_name: str = EMBEDDING_MODEL, backend: Optional[EmbeddingBackend] = None
+) -> SentenceTransformer:
+    """Get the shared local embedding model, loaded once per process and backend."""
+    return _load_model(model_name, backend or settings.EMBEDDING_BACKEND)
+
+
+@lru_cache
+def _load_model(model_name: str, backend: EmbeddingBackend) -> SentenceTransformer:
+    """Load the model with PyTorch, ONNX Runtime, or int8-quantized ONNX Runtime.
+
+    All backends run the same weights, so their vectors are compatible with existing
+    collections; the int8 model trades a small amount of precision for speed.
+    """
+    if backend == EmbeddingBackend.ONNX:
+        model = SentenceTransformer(model_name, backend="onnx")
+    elif backend == EmbeddingBackend.ONNX_INT8:
+        model = SentenceTransformer(
+            model_name, backend="onnx", model_kwargs={"file_name": settings.EMBEDDING_ONNX_INT8_FILE}
+        )
+    else:  # PyTorch
+        model = SentenceTransformer(model_name)
+
+    if settings.EMBEDDING_MAX_SEQ_LENGTH:
+        # Memories and queries are short; a smaller bound keeps padding and attention cost down
+        model.max_seq_length = settings.EMBEDDING_MAX_SEQ_LENGTH
+    logger.info(f"Loaded embedding model {model_name} ({backend.value}, max_seq_length={model.max_seq_length})")
+    return model
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except OSError:
+        # Peak RSS is the best we can do without procfs (KB on Linux, bytes on macOS)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+@dataclass
+class EmbeddingStats:
+    """Batch size and latency counters for an embedding service."""
+
+    requests: int = 0
+    batches: int = 0
+    texts: int = 0
+    max_batch_size: int = 0
+    encode_seconds: float = 0.0
+    batch_sizes: dict = field(default_factory=dict)
+
+    def record(self, requests: int, texts: int, seconds: float) -> None:
+        self.requests += requests
+        self.batches += 1
+        self.texts += texts
+        self.max_batch_size = max(self.max_batch_size, texts)
+        self.encode_seconds += seconds
+        self.batch_sizes[texts] = self.batch_sizes.get(texts, 0) + 1
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.texts / self.batches if self.batches else 0.0
+
+    @property
+    def mean_encode_ms(self) -> float:
+        return self.encode_seconds / self.batches * 1000 if self.batches else 0.0
+
+    def summary(self) -> dict:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "texts": self.texts,
+            "mean_batch_size": round(self.mean_batch_size, 2),
+            "max_batch_size": self.max_batch_size,
+            "mean_encode_ms": round(self.mean_encode_ms, 2),
+            "rss_mb": round(current_rss_mb(), 1),
+        }
+
+
+@dataclass
+class _EncodeRequest:
+    texts: List[str]
+    future: Future
+
+
+class MicroBatcher:
+    """Coalesces concurrent encode requests into single forward passes.
+
+    A worker thread takes the first queued request, then keeps collecting requests for
+    up to `window_ms` or until `max_batch_size` texts are queued, and encodes them together.
+    """
+
+    def __init__(self, encode: Callable[[List[str]], np.ndarray], max_batch_size: int = 64, window_ms: float = 2.0):
+        self.encode = encode
+        self.max_batch_size = max_batch_size
+        self.window = window_ms / 1000
+        self.stats = EmbeddingStats()
+        self._queue: "queue.Queue[_EncodeRequest]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, texts: List[str]) -> Future:
+        """Queue texts for encoding; the future resolves to a (len(texts), dim) array."""
+        future: Future = Future()
+        self._queue.put(_EncodeRequest(texts=list(texts), future=future))
+        return future
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            count = len(batch[0].texts)
+            deadline = time.monotonic() + self.window
+            while count < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                count += len(request.texts)
+
+            texts = [text for request in batch for text in request.texts]
+            start = time.perf_counter()
+            try:
+                vectors = np.asarray(self.encode(texts), dtype=np.float32)
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+            self.stats.record(len(batch), len(texts), time.perf_counter() - start)
+
+            offset = 0
+            for request in batch:
+                request.future.set_result(vectors[offset : offset + len(request.texts)])
+                offset += len(request.texts)
+
+
+class EmbeddingService(ABC):
+    """Encodes text into vectors. Mirrors the subset of the SentenceTransformer API we use."""
+
+    @abstractmethod
+    def _submit(self, texts: List[str]) -> Future:
+        """Submit texts for encoding, returning a future of a 2D float32 array."""
+        pass
+
+    def encode(
+        self, sentences: Union[str, List[str]], batch_size: Optional[int] = None, normalize_embeddings: bool = False
+    ) -> np.ndarray:
+        """Encode one sentence (1D result) or a list of sentences (2D result)."""
+        single = isinstance(sentences, str)
+        vectors = self._submit([sentences] if single else list(sentences)).result()
+        return self._finish(vectors, single, normalize_embeddings)
+
+    async def aencode(self, sentences: Union[str, List[str]], normalize_embeddings: bool = False) -> np.ndarray:
+        """Encode without blocking the event loop."""
+        single = isinstance(sentences, str)
+        vectors = await asyncio.wrap_future(self._submit([sentences] if single else list(sentences)))
+        return self._finish(vectors, single, normalize_embeddings)
+
+    @staticmethod
+    def _finish(vectors: np.ndarray, single: bool, normalize: bool) -> np.ndarray:
+        if normalize:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.where(norms == 0, 1, norms)
+        return vectors[0] if single else vectors
+
+
+class LocalEmbeddingService(EmbeddingService):
+    """Encodes in this process, micro-batching concurrent callers on a worker thread."""
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL):
+        self.model = get_embedding_model(model_name)
+        self.batcher = MicroBatcher(
+            lambda texts: self.model.encode(texts, batch_size=len(texts)),
+            max_batch_size=settings.EMBEDDING_MAX_BATCH_SIZE,
+            window_ms=settings.EMBEDDING_BATCH_WINDOW_MS,
+        )
+
+    @property
+    def stats(self) -> EmbeddingStats:
+        return self.batcher.stats
+
+    def _submit(self, texts: List[str]) -> Future:
+        return self.batcher.submit(texts)
+
+
+def send_frame(sock: socket.socket, payload: bytes) -> None:
+    sock.sendall(struct.pack(">I", len(payload)) + payload)
+
+
+def recv_frame(sock: socket.socket) -> bytes:
+    (length,) = struct.unpack(">I", _recv_exact(sock, 4))
+    return _recv_exact(sock, length)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            raise ConnectionError("Embedding server closed the connection")
+        buffer.extend(chunk)
+    return bytes(buffer)
+
+
+class SocketEmbeddingService(EmbeddingService):
+    """Client for the shared embedding sidecar (see embedding_server) over a Unix socket.
+
+    Every uvicorn/Chainlit worker talks to one sidecar process, so the model is loaded once
+    per host and requests from all workers are micro-batched together.
+    """
+
+    def __init__(self, socket_path: str):
+        self.socket_path = socket_path
+        self._local = threading.local()
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def _request(self, payload: dict) -> tuple[dict, bytes]:
+        for attempt in range(2):
+            try:
+                sock = self._connection()
+                send_frame(sock, json.dumps(payload).encode())
+                header = json.loads(recv_frame(sock))
+                body = recv_frame(sock) if "shape" in header else b""
+                break
+            except (ConnectionError, OSError):
+                # Reconnect once if the sidecar was restarted
+                self._local.sock = None
+                if attempt:
+                    raise
+        if "error" in header:
+            raise RuntimeError(f"Embedding server error: {header['error']}")
+        return header, body
+
+    def _submit(self, texts: List[str]) -> Future:
+        future: Future = Future()
+        try:
+            header, body = self._request({"op": "encode", "texts": texts})
+            future.set_result(np.frombuffer(body, dtype=np.float32).reshape(header["shape"]))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    async def aencode(self, sentences: Union[str, List[str]], normalize_embeddings: bool = False) -> np.ndarray:
+        """Encode without blocking the event loop."""
+        return await asyncio.to_thread(self.encode, sentences, None, normalize_embeddings)
+
+    def server_stats(self) -> dict:
+        """Batch size, latency and RSS statistics reported by the sidecar."""
+        header, _ = self._request({"op": "stats"})
+        return header["stats"]
+
+
+@lru_cache
+def get_embedding_service() -> EmbeddingService:
+    """Get the configured embedding service for this process."""
+    if settings.EMBEDDING_SERVICE == EmbeddingServiceMode.SOCKET:
+        return SocketEmbeddingService(settings.EMBEDDING_SOCKET_PATH)
+    return LocalEmbeddingService()
@@ -0,0 +1,90 @@
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+TOKEN_PATTERN = re.compile(r"\w+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by do does did for from has have how i in is it its me my of on or our "
+    "so that the their them they this to was we were what when where which who why will with you your "
+    "s user".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens without stopwords."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """A small in-process BM25 inverted index over memory texts, updated incrementally.
+
+    Memories are short, so postings hold raw term frequencies and scoring walks only the
+    postings of the query terms.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._lengths: Dict[str, int] = {}
+        self._texts: Dict[str, str] = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def text(self, doc_id: str) -> str:
+        return self._texts[doc_id]
+
+    def add(self, doc_id: str, text: str) -> None:
+        """Index a memory, replacing any previous text with the same ID."""
+        with self._lock:
+            self._remove(doc_id)
+            terms = Counter(tokenize(text))
+            for term, count in terms.items():
+                self._postings[term][doc_id] = count
+            length = sum(terms.values())
+            self._lengths[doc_id] = length
+            self._texts[doc_id] = text
+            self._total_length += length
+
+    def add_many(self, documents: Iterable[Tuple[str, str]]) -> None:
+        for doc_id, text in documents:
+            self.add(doc_id, text)
+
+    def remove(self, doc_id: str) -> None:
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id: str) -> None:
+        if doc_id not in self._lengths:
+            return
+        for term in set(tokenize(self._texts[doc_id])):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._lengths.pop(doc_id)
+        del self._texts[doc_id]
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Top-k (doc_id, BM25 score) pairs for the query."""
+        with self._lock:
+            n = len(self._lengths)
+            if not n:
+                return []
+            avg_length = self._total_length / n
+            scores: Dict[str, float] = defaultdict(float)
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = tf + self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / avg_length)
+                    scores[doc_id] += idf * tf * (self.k1 + 1) / norm
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
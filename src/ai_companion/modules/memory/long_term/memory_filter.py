@@ -0,0 +1,85 @@
+import re
+from dataclasses import dataclass
+from typing import Iterable, Tuple
+
+FIRST_PERSON_PATTERN = re.compile(r"\b(i|i'm|im|i've|ive|i'd|i'll|my|mine|me|myself|we|our|us)\b")
+FACT_CUE_PATTERN = re.compile(
+    r"\b(name|called|remember|live|living|lives|moved|from|born|work|working|job|study|studied|student|"
+    r"years? old|age|birthday|love|loves|like|likes|hate|hates|enjoy|prefer|favou?rite|allergic|"
+    r"married|wife|husband|partner|girlfriend|boyfriend|son|daughter|kids?|children|mom|mum|dad|"
+    r"brother|sister|dog|cat|pet|goal|dream|plan|planning|want to|hope to)\b"
+)
+NUMBER_PATTERN = re.compile(r"\d")
+WORD_PATTERN = re.compile(r"[A-Za-z][\w'-]*")
+
+
+@dataclass
+class PreFilterReport:
+    """Evaluation of the pre-filter against LLM importance labels."""
+
+    total: int
+    important: int
+    recalled: int
+    skipped: int
+
+    @property
+    def recall(self) -> float:
+        """Fraction of important messages that the filter lets through to the LLM."""
+        return self.recalled / self.important if self.important else 1.0
+
+    @property
+    def skip_rate(self) -> float:
+        """Fraction of all messages for which the LLM call is skipped."""
+        return self.skipped / self.total if self.total else 0.0
+
+
+class MemoryPreFilter:
+    """Cheap lexical gate that decides whether a message is worth an LLM memory analysis.
+
+    Each message gets a score in [0, 1] built from its length, first-person statements,
+    personal-fact cue words, capitalized words that look like named entities and digits.
+    Messages scoring below the threshold are skipped.
+    """
+
+    MIN_WORDS = 2
+
+    def __init__(self, threshold: float = 0.3):
+        self.threshold = threshold
+
+    def score(self, text: str) -> float:
+        """Score how likely a message is to contain a personal fact."""
+        words = WORD_PATTERN.findall(text)
+        if len(words) < self.MIN_WORDS:
+            return 0.0
+
+        lowered = text.lower()
+        score = 0.0
+        if FIRST_PERSON_PATTERN.search(lowered):
+            score += 0.4
+        if FACT_CUE_PATTERN.search(lowered):
+            score += 0.3
+        if any(word[0].isupper() and word != "I" for word in words[1:]):
+            score += 0.2
+        if NUMBER_PATTERN.search(text):
+            score += 0.1
+        if len(words) >= 8:
+            score += 0.1
+        return min(score, 1.0)
+
+    def should_analyze(self, text: str) -> bool:
+        """Return True if the message should be sent to the LLM for analysis."""
+        return self.score(text) >= self.threshold
+
+    def evaluate(self, samples: Iterable[Tuple[str, bool]]) -> PreFilterReport:
+        """Evaluate the filter on (message, is_important) pairs labelled by the LLM."""
+        total = important = recalled = skipped = 0
+        for text, is_important in samples:
+            total += 1
+            passed = self.should_analyze(text)
+            if not passed:
+                skipped += 1
+            if is_important:
+                important += 1
+                if passed:
+                    recalled += 1
+        return PreFilterReport(total=total, important=important, recalled=recalled, skipped=skipped)
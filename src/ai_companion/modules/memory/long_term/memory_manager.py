@@ -1,11 +1,20 @@
+import asyncio
 import logging
 import uuid
 from datetime import datetime
-from typing import List, Optional
+from functools import lru_cache
+from typing import List, Optional, Sequence
 
 from ai_companion.core.prompts import MEMORY_ANALYSIS_PROMPT
+from ai_companion.modules.memory.long_term.analysis_cache import MemoryAnalysisCache
+from ai_companion.modules.memory.long_term.base_vector_store import Memory
+from ai_companion.modules.memory.long_term.context_cache import get_memory_context_cache
+from ai_companion.modules.memory.long_term.embeddings import get_embedding_service
+from ai_companion.modules.memory.long_term.memory_filter import MemoryPreFilter
+from ai_companion.modules.memory.long_term.memory_writer import get_memory_writer
+from ai_companion.modules.memory.long_term.query_embeddings import get_query_embedding_cache
 from ai_companion.modules.memory.long_term.vector_store import get_vector_store
-from ai_companion.settings import settings, LLMProvider
+from ai_companion.settings import settings, LLMProvider, MemoryRetrievalMode
 from langchain_core.messages import BaseMessage
 from langchain_groq import ChatGroq
 from langchain_openai import ChatOpenAI
@@ -22,46 +31,71 @@ class MemoryAnalysis(BaseModel):
     formatted_memory: Optional[str] = Field(..., description="The formatted memory to be stored")
 
 
+def get_memory_llm():
+    """Get the LLM used for memory analysis and consolidation, based on the provider."""
+    if settings.LLM_PROVIDER == LLMProvider.GROQ:
+        return ChatGroq(
+            model=settings.MEMORY_MODEL_NAME,  # Use the fixed memory model name
+            api_key=settings.GROQ_API_KEY,
+            temperature=0.1,
+            max_retries=2,
+        )
+    else:  # OpenAI
+        return ChatOpenAI(
+            model=settings.MEMORY_MODEL_NAME,  # Use the fixed memory model name
+            api_key=settings.OPENAI_API_KEY,
+            temperature=0.1,
+            max_retries=2,
+        )
+
+
 class MemoryManager:
     """Manager class for handling long-term memory operations."""
 
     def __init__(self):
         self.vector_store = get_vector_store()
+        self.analysis_cache = get_memory_analysis_cache()
+        self.prefilter = (
+            MemoryPreFilter(settings.MEMORY_PREFILTER_THRESHOLD)
+            if settings.MEMORY_PREFILTER_THRESHOLD is not None
+            else None
+        )
+        self.writer = get_memory_writer() if settings.MEMORY_WRITE_BEHIND else None
         self.logger = logging.getLogger(__name__)
-        
-        # Initialize the appropriate LLM based on provider
-        if settings.LLM_PROVIDER == LLMProvider.GROQ:
-            llm = ChatGroq(
-                model=settings.MEMORY_MODEL_NAME,  # Use the fixed memory model name
-                api_key=settings.GROQ_API_KEY,
-                temperature=0.1,
-                max_retries=2,
-            )
-        else:  # OpenAI
-            llm = ChatOpenAI(
-                model=settings.MEMORY_MODEL_NAME,  # Use the fixed memory model name
-                api_key=settings.OPENAI_API_KEY,
-                temperature=0.1,
-                max_retries=2,
-            )
-        
-        self.llm = llm.with_structured_output(MemoryAnalysis)
+        self.llm = get_memory_llm().with_structured_output(MemoryAnalysis)
 
     async def _analyze_memory(self, message: str) -> MemoryAnalysis:
         """Analyze a message to determine importance and format if needed."""
+        # A miss embeds the message (semantic lookup) and may touch SQLite; keep both off the event loop
+        cached = await asyncio.to_thread(self.analysis_cache.get, message)
+        if cached is not None:
+            stats = self.analysis_cache.stats
+            self.logger.debug(
+                f"Memory analysis cache hit (hit rate: {stats.hit_rate:.2%}, LLM calls avoided: {stats.llm_calls_avoided})"
+            )
+            return cached
+
         prompt = MEMORY_ANALYSIS_PROMPT.format(message=message)
-        return await self.llm.ainvoke(prompt)
+        analysis = await self.llm.ainvoke(prompt)
+        await asyncio.to_thread(self.analysis_cache.put, message, analysis)
+        return analysis
 
     async def extract_and_store_memories(self, message: BaseMessage) -> None:
         """Extract important information from a message and store in vector store."""
         if message.type != "human":
             return
 
+        # Skip the LLM call for messages that are unlikely to carry personal facts
+        if self.prefilter is not None and not self.prefilter.should_analyze(message.content):
+            self.logger.debug(f"Skipping memory analysis for trivial message: '{message.content[:50]}'")
+            return
+
         # Analyze the message for importance and formatting
         analysis = await self._analyze_memory(message.content)
         if analysis.is_important and analysis.formatted_memory:
-            # Check if similar memory exists
-            similar = self.vector_store.find_similar_memory(analysis.formatted_memory)
+            # Check if similar memory exists, including memories not flushed yet
+            similar = self.writer.find_pending(analysis.formatted_memory) if self.writer is not None else None
+            similar = similar or await asyncio.to_thread(self.vector_store.find_similar_memory, analysis.formatted_memory)
             if similar:
                 # Skip storage if we already have a similar memory
                 self.logger.info(f"Similar memory already exists: '{analysis.formatted_memory}'")
@@ -69,20 +103,128 @@ class MemoryManager:
 
             # Store new memory
             self.logger.info(f"Storing new memory: '{analysis.formatted_memory}'")
-            self.vector_store.store_memory(
-                text=analysis.formatted_memory,
-                metadata={
-                    "id": str(uuid.uuid4()),
-                    "timestamp": datetime.now().isoformat(),
-                },
-            )
+            metadata = {
+                "id": str(uuid.uuid4()),
+                "timestamp": datetime.now().isoformat(),
+            }
+            if self.writer is not None:
+                self.writer.enqueue(analysis.formatted_memory, metadata)
+            else:
+                await asyncio.to_thread(self.vector_store.store_memory, analysis.formatted_memory, metadata)
+            get_memory_context_cache().bump_version()
 
     def get_relevant_memories(self, context: str) -> List[str]:
         """Retrieve relevant memories based on the current context."""
-        memories = self.vector_store.search_memories(context, k=settings.MEMORY_TOP_K)
-        if memories:
-            for memory in memories:
-                self.logger.debug(f"Memory: '{memory.text}' (score: {memory.score:.2f})")
+        if settings.MEMORY_RETRIEVAL_MODE == MemoryRetrievalMode.HYBRID:
+            memories = self.vector_store.hybrid_search_memories(
+                context, k=settings.MEMORY_TOP_K, candidates=settings.MEMORY_HYBRID_CANDIDATES
+            )
+        else:
+            memories = self.vector_store.search_memories(context, k=settings.MEMORY_TOP_K)
+        return self._finalize_memories(context, memories)
+
+    async def aget_relevant_memories(self, context: str) -> List[str]:
+        """Retrieve relevant memories based on the current context, using the async search path."""
+        query_vector = None
+        if self.vector_store.supports_vector_search:
+            # Encode once for both the store search and the pending memories
+            query_vector = await get_embedding_service().aencode(context, normalize_embeddings=True)
+        memories = await self._asearch(context, query_vector)
+        return await self._afinalize_memories(context, memories, query_vector)
+
+    async def aget_relevant_memories_for_messages(self, messages: Sequence[BaseMessage]) -> List[str]:
+        """Retrieve relevant memories for the recent conversation messages.
+
+        With MEMORY_INCREMENTAL_QUERY the query vector is built from cached per-message
+        embeddings, so only new messages are encoded. Stores that cannot search with local
+        vectors (Weaviate with server-side vectorization) fall back to the joined text.
+        """
+        context = " ".join(m.content for m in messages)
+        if not settings.MEMORY_INCREMENTAL_QUERY or not self.vector_store.supports_vector_search:
+            return await self.aget_relevant_memories(context)
+
+        query_vector = await get_query_embedding_cache().aquery_vector(messages)
+        memories = await self._asearch(context, query_vector)
+        return await self._afinalize_memories(context, memories, query_vector)
+
+    async def aget_memory_context(self, messages: Sequence[BaseMessage], thread_id: Optional[str] = None) -> str:
+        """Formatted memory context for the recent messages, reusing the thread's last one when possible.
+
+        Retrieval is skipped while the conversation stays on the same topic (query vector within
+        MEMORY_CONTEXT_REUSE_SIMILARITY of the cached one) and no memory has been written since.
+        """
+        reusable = (
+            thread_id is not None
+            and settings.MEMORY_CONTEXT_REUSE_SIMILARITY is not None
+            and settings.MEMORY_INCREMENTAL_QUERY
+            and self.vector_store.supports_vector_search
+        )
+        if not reusable:
+            memories = await self.aget_relevant_memories_for_messages(messages)
+            return self.format_memories_for_prompt(memories)
+
+        context_cache = get_memory_context_cache()
+        version = context_cache.version
+        query_vector = await get_query_embedding_cache().aquery_vector(messages)
+        cached = context_cache.get(thread_id, query_vector)
+        if cached is not None:
+            stats = context_cache.stats
+            self.logger.debug(
+                f"Reusing memory context for thread {thread_id} "
+                f"(retrievals avoided: {stats.retrievals_avoided}, reuse rate: {stats.reuse_rate:.2%})"
+            )
+            return cached
+
+        context = " ".join(m.content for m in messages)
+        memories = await self._asearch(context, query_vector)
+        memory_context = self.format_memories_for_prompt(
+            await self._afinalize_memories(context, memories, query_vector)
+        )
+        context_cache.put(thread_id, query_vector, memory_context, version)
+        return memory_context
+
+    async def _asearch(self, context: str, query_vector: Optional[Sequence[float]] = None) -> List[Memory]:
+        """Search the vector store, by query vector when given, fusing in BM25 results in hybrid mode."""
+        if settings.MEMORY_RETRIEVAL_MODE == MemoryRetrievalMode.HYBRID:
+            return await self.vector_store.ahybrid_search_memories(
+                context, k=settings.MEMORY_TOP_K, vector=query_vector, candidates=settings.MEMORY_HYBRID_CANDIDATES
+            )
+        if query_vector is not None:
+            return await self.vector_store.asearch_memories_by_vector(query_vector, k=settings.MEMORY_TOP_K)
+        return await self.vector_store.asearch_memories(context, k=settings.MEMORY_TOP_K)
+
+    def _finalize_memories(
+        self, context: str, memories: List[Memory], query_vector: Optional[Sequence[float]] = None
+    ) -> List[str]:
+        """Merge in memories still queued for writing and return the top texts."""
+        pending = []
+        if self.writer is not None:
+            # Make memories that are still queued for writing visible to readers
+            pending = self.writer.search_pending(context, k=settings.MEMORY_TOP_K, query_vector=query_vector)
+        return self._merge_pending(memories, pending)
+
+    async def _afinalize_memories(
+        self, context: str, memories: List[Memory], query_vector: Optional[Sequence[float]] = None
+    ) -> List[str]:
+        """Like `_finalize_memories`, encoding pending memories without blocking the event loop."""
+        pending = []
+        if self.writer is not None:
+            pending = await self.writer.asearch_pending(context, k=settings.MEMORY_TOP_K, query_vector=query_vector)
+        return self._merge_pending(memories, pending)
+
+    def _merge_pending(self, memories: List[Memory], pending: List[Memory]) -> List[str]:
+        if pending and settings.MEMORY_RETRIEVAL_MODE == MemoryRetrievalMode.HYBRID:
+            # Stored results are in fused order and BM25-only matches have no similarity,
+            # so the pending ranking is fused in rather than everything re-sorted by score
+            memories = self.vector_store.fuse_rankings([memories, pending], k=settings.MEMORY_TOP_K)
+        elif pending:
+            seen = {memory.text for memory in memories}
+            memories += [memory for memory in pending if memory.text not in seen]
+            memories = sorted(memories, key=lambda m: m.score or 0.0, reverse=True)[: settings.MEMORY_TOP_K]
+        for memory in memories:
+            # BM25-only hybrid matches have no similarity score
+            score = f"{memory.score:.2f}" if memory.score is not None else "lexical"
+            self.logger.debug(f"Memory: '{memory.text}' (score: {score})")
         return [memory.text for memory in memories]
 
     def format_memories_for_prompt(self, memories: List[str]) -> str:
@@ -92,6 +234,22 @@ class MemoryManager:
         return "\n".join(f"- {memory}" for memory in memories)
 
 
+@lru_cache
+def get_memory_analysis_cache() -> MemoryAnalysisCache[MemoryAnalysis]:
+    """Get the process-wide cache for memory analysis results."""
+    embed = None
+    if settings.MEMORY_ANALYSIS_CACHE_SIMILARITY is not None:
+        model = get_embedding_service()
+        embed = model.encode
+    return MemoryAnalysisCache(
+        MemoryAnalysis,
+        max_size=settings.MEMORY_ANALYSIS_CACHE_SIZE,
+        similarity_threshold=settings.MEMORY_ANALYSIS_CACHE_SIMILARITY,
+        embed=embed,
+        db_path=settings.MEMORY_ANALYSIS_CACHE_DB_PATH,
+    )
+
+
 def get_memory_manager() -> MemoryManager:
     """Get a MemoryManager instance."""
     return MemoryManager()
@@ -0,0 +1,278 @@
+"""Export, import and migrate long-term memories between files and vector store backends.
+
+Memories are streamed with scroll/cursor pagination into JSONL or Parquet (needs pyarrow),
+one record per memory: {"id", "text", "metadata"}. Vectors are not exported; they are
+recomputed on load with batched embedding and written with bulk upserts, so a file can
+be loaded into either backend:
+
+    uv run python -m ai_companion.modules.memory.long_term.memory_transfer export --backend qdrant --file memories.jsonl
+    uv run python -m ai_companion.modules.memory.long_term.memory_transfer import --backend weaviate --file memories.jsonl
+    uv run python -m ai_companion.modules.memory.long_term.memory_transfer migrate --source qdrant --target weaviate
+
+Every command keeps a checkpoint (by default next to the file, or .memory_migration.checkpoint)
+and resumes from it when re-run. Delete the checkpoint to start over. Historical
+conversations can be seeded by writing them as JSONL records and importing the file.
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Iterator, List, Optional
+
+from ai_companion.modules.memory.long_term.base_vector_store import BaseVectorStore, Memory
+from ai_companion.modules.memory.long_term.qdrant_store import QdrantStore
+from ai_companion.modules.memory.long_term.weaviate_store import WeaviateStore
+from ai_companion.settings import VectorDBProvider
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_CHECKPOINT = ".memory_migration.checkpoint"
+
+
+@dataclass
+class TransferReport:
+    """Throughput of one export, import or migration."""
+
+    memories: int = 0
+    resumed_from: int = 0
+    seconds: float = 0.0
+
+    @property
+    def memories_per_second(self) -> float:
+        return self.memories / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        resumed = f" (resumed after {self.resumed_from})" if self.resumed_from else ""
+        return f"{self.memories} memories in {self.seconds:.1f}s, {self.memories_per_second:.0f} memories/s{resumed}"
+
+
+def get_store(provider: str) -> BaseVectorStore:
+    """Get a vector store by provider name, regardless of VECTOR_DB_PROVIDER."""
+    if VectorDBProvider(provider) == VectorDBProvider.QDRANT:
+        return QdrantStore()
+    return WeaviateStore()
+
+
+def to_record(memory: Memory) -> dict:
+    """Serializable record for a memory, with a UUID that both backends accept."""
+    metadata = {}
+    for key, value in memory.metadata.items():
+        if key in ("id", "uuid") or value is None:
+            continue
+        metadata[key] = value.isoformat() if isinstance(value, datetime) else value
+    try:
+        memory_id = str(uuid.UUID(str(memory.id)))
+    except ValueError:
+        # Legacy Qdrant points may have integer IDs; derive a stable UUID from them
+        memory_id = str(uuid.uuid5(uuid.NAMESPACE_URL, str(memory.id)))
+    return {"id": memory_id, "text": memory.text, "metadata": metadata}
+
+
+def _load_checkpoint(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_checkpoint(path: str, state: dict) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def _clear_checkpoint(path: str) -> None:
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _scroll(store: BaseVectorStore, cursor: Optional[Any], page_size: int) -> Iterator[tuple[List[Memory], Any]]:
+    while True:
+        memories, cursor = store.scroll_memories(offset=cursor, limit=page_size)
+        if memories:
+            yield memories, cursor
+        if cursor is None:
+            return
+
+
+def _is_parquet(path: str) -> bool:
+    return path.endswith(".parquet")
+
+
+def _parquet():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet files need pyarrow: uv pip install pyarrow") from e
+    return pa, pq
+
+
+def export_memories(
+    store: BaseVectorStore, path: str, page_size: int = 500, checkpoint: Optional[str] = None
+) -> TransferReport:
+    """Stream every memory in `store` to a JSONL or Parquet file."""
+    checkpoint = checkpoint or f"{path}.checkpoint"
+    state = _load_checkpoint(checkpoint)
+    if state and _is_parquet(path):
+        # Parquet files cannot be appended to, so an interrupted export starts over
+        state = {}
+    report = TransferReport(resumed_from=state.get("exported", 0))
+    exported = report.resumed_from
+    start = time.perf_counter()
+
+    if _is_parquet(path):
+        pa, pq = _parquet()
+        schema = pa.schema([("id", pa.string()), ("text", pa.string()), ("metadata", pa.string())])
+        with pq.ParquetWriter(path, schema) as writer:
+            for memories, cursor in _scroll(store, None, page_size):
+                records = [to_record(memory) for memory in memories]
+                writer.write_table(
+                    pa.table(
+                        {
+                            "id": [r["id"] for r in records],
+                            "text": [r["text"] for r in records],
+                            "metadata": [json.dumps(r["metadata"]) for r in records],
+                        },
+                        schema=schema,
+                    )
+                )
+                exported += len(records)
+                _save_checkpoint(checkpoint, {"cursor": cursor, "exported": exported})
+    else:
+        with open(path, "a" if state else "w") as f:
+            for memories, cursor in _scroll(store, state.get("cursor"), page_size):
+                f.writelines(json.dumps(to_record(memory)) + "\n" for memory in memories)
+                f.flush()
+                exported += len(memories)
+                _save_checkpoint(checkpoint, {"cursor": cursor, "exported": exported})
+
+    _clear_checkpoint(checkpoint)
+    report.memories = exported - report.resumed_from
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def read_records(path: str, batch_size: int = 500) -> Iterator[List[dict]]:
+    """Read records from a JSONL or Parquet export in batches."""
+    if _is_parquet(path):
+        _, pq = _parquet()
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+            yield [{**row, "metadata": json.loads(row["metadata"])} for row in batch.to_pylist()]
+        return
+
+    batch = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                batch.append(json.loads(line))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+    if batch:
+        yield batch
+
+
+def _load_batch(store: BaseVectorStore, records: List[dict]) -> None:
+    # One batched encode and one bulk upsert; IDs are kept, so re-loading a batch is idempotent.
+    # Hand-written seed records may omit the ID and metadata.
+    store.store_memories(
+        [
+            (record["text"], {**record.get("metadata", {}), "id": record.get("id") or str(uuid.uuid4())})
+            for record in records
+        ],
+        deduplicate=False,
+    )
+
+
+def import_memories(
+    store: BaseVectorStore, path: str, batch_size: int = 500, checkpoint: Optional[str] = None
+) -> TransferReport:
+    """Bulk-load a JSONL or Parquet export into `store`."""
+    checkpoint = checkpoint or f"{path}.checkpoint"
+    report = TransferReport(resumed_from=_load_checkpoint(checkpoint).get("loaded", 0))
+    loaded = 0
+    start = time.perf_counter()
+
+    for records in read_records(path, batch_size):
+        if loaded + len(records) <= report.resumed_from:
+            loaded += len(records)
+            continue
+        # Skip the part of a partially loaded batch that the checkpoint already covers
+        records = records[max(report.resumed_from - loaded, 0) :]
+        _load_batch(store, records)
+        loaded = max(loaded, report.resumed_from) + len(records)
+        _save_checkpoint(checkpoint, {"loaded": loaded})
+        logger.info(f"Loaded {loaded} memories")
+
+    _clear_checkpoint(checkpoint)
+    report.memories = loaded - report.resumed_from
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def migrate_memories(
+    source: BaseVectorStore, target: BaseVectorStore, page_size: int = 500, checkpoint: str = MIGRATION_CHECKPOINT
+) -> TransferReport:
+    """Copy every memory from `source` to `target`, re-embedding for the target backend."""
+    state = _load_checkpoint(checkpoint)
+    report = TransferReport(resumed_from=state.get("migrated", 0))
+    migrated = report.resumed_from
+    start = time.perf_counter()
+
+    for memories, cursor in _scroll(source, state.get("cursor"), page_size):
+        _load_batch(target, [to_record(memory) for memory in memories])
+        migrated += len(memories)
+        _save_checkpoint(checkpoint, {"cursor": cursor, "migrated": migrated})
+        logger.info(f"Migrated {migrated} memories")
+
+    _clear_checkpoint(checkpoint)
+    report.memories = migrated - report.resumed_from
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    backends = [provider.value for provider in VectorDBProvider]
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="write memories to a file")
+    export_parser.add_argument("--backend", choices=backends, required=True)
+    export_parser.add_argument("--file", required=True, help=".jsonl or .parquet")
+
+    import_parser = commands.add_parser("import", help="load memories from a file")
+    import_parser.add_argument("--backend", choices=backends, required=True)
+    import_parser.add_argument("--file", required=True, help=".jsonl or .parquet")
+
+    migrate_parser = commands.add_parser("migrate", help="copy memories between backends")
+    migrate_parser.add_argument("--source", choices=backends, required=True)
+    migrate_parser.add_argument("--target", choices=backends, required=True)
+
+    for command in (export_parser, import_parser, migrate_parser):
+        command.add_argument("--batch-size", type=int, default=500)
+        command.add_argument("--checkpoint", default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "export":
+        report = export_memories(get_store(args.backend), args.file, args.batch_size, args.checkpoint)
+    elif args.command == "import":
+        report = import_memories(get_store(args.backend), args.file, args.batch_size, args.checkpoint)
+    else:
+        if args.source == args.target:
+            parser.error("--source and --target must differ")
+        report = migrate_memories(
+            get_store(args.source), get_store(args.target), args.batch_size, args.checkpoint or MIGRATION_CHECKPOINT
+        )
+    print({"export": "Exported", "import": "Imported", "migrate": "Migrated"}[args.command], report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from ai_companion.modules.memory.long_term.base_vector_store import BaseVectorStore, Memory
+from ai_companion.modules.memory.long_term.embeddings import get_embedding_service
+from ai_companion.modules.memory.long_term.vector_store import get_vector_store
+from ai_companion.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PendingMemory:
+    """A memory waiting to be flushed to the vector store."""
+
+    text: str
+    metadata: dict
+    enqueued_at: float = field(default_factory=time.monotonic)
+    embedding: Optional[np.ndarray] = None
+
+
+@dataclass
+class WriterStats:
+    """Throughput counters for the write-behind queue."""
+
+    enqueued: int = 0
+    written: int = 0
+    flushes: int = 0
+    failed_flushes: int = 0
+    flush_seconds: float = 0.0
+
+    @property
+    def memories_per_second(self) -> float:
+        return self.written / self.flush_seconds if self.flush_seconds else 0.0
+
+
+class MemoryWriteBehindQueue:
+    """Accumulates new memories and writes them to the vector store in bulk.
+
+    A background thread flushes the queue once it holds `max_batch_size` memories or
+    its oldest memory is `flush_interval` seconds old. Each flush goes through
+    `BaseVectorStore.store_memories`, i.e. one batched encode and one bulk upsert.
+    Pending memories are appended to an optional JSONL journal and replayed on start,
+    and the queue is flushed at interpreter exit. Readers can look pending memories up
+    with `find_pending` and `search_pending` until they are flushed.
+    """
+
+    def __init__(
+        self,
+        vector_store: BaseVectorStore,
+        max_batch_size: int = 32,
+        flush_interval: float = 2.0,
+        journal_path: Optional[str] = None,
+    ):
+        self.vector_store = vector_store
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.journal_path = journal_path
+        self.stats = WriterStats()
+
+        self._pending: List[PendingMemory] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._closed = False
+
+        self._replay_journal()
+        self._thread = threading.Thread(target=self._run, name="memory-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def enqueue(self, text: str, metadata: dict) -> None:
+        """Queue a memory for writing."""
+        memory = PendingMemory(text=text, metadata=dict(metadata))
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Memory writer is closed")
+            self._pending.append(memory)
+            self._append_journal(memory)
+            self.stats.enqueued += 1
+            if len(self._pending) >= self.max_batch_size:
+                self._wakeup.notify()
+
+    def pending(self) -> List[PendingMemory]:
+        """Return a snapshot of the memories not yet flushed."""
+        with self._lock:
+            return list(self._pending)
+
+    def find_pending(self, text: str) -> Optional[PendingMemory]:
+        """Return a pending memory with the same text, if any."""
+        normalized = " ".join(text.lower().split())
+        for memory in self.pending():
+            if " ".join(memory.text.lower().split()) == normalized:
+                return memory
+        return None
+
+    def search_pending(self, query: str, k: int = 5, query_vector: Optional[Sequence[float]] = None) -> List[Memory]:
+        """Search pending memories by cosine similarity with the local embedding model.
+
+        Pass a normalized `query_vector` to skip encoding the query.
+        """
+        pending = self.pending()
+        if not pending:
+            return []
+
+        model = get_embedding_service()
+        missing = [memory for memory in pending if memory.embedding is None]
+        if missing:
+            embeddings = model.encode([memory.text for memory in missing], normalize_embeddings=True)
+            for memory, embedding in zip(missing, embeddings):
+                memory.embedding = embedding
+
+        if query_vector is None:
+            query_vector = model.encode(query, normalize_embeddings=True)
+        return self._rank_pending(pending, query_vector, k)
+
+    async def asearch_pending(
+        self, query: str, k: int = 5, query_vector: Optional[Sequence[float]] = None
+    ) -> List[Memory]:
+        """Like `search_pending`, encoding through the embedding service without blocking the event loop."""
+        pending = self.pending()
+        if not pending:
+            return []
+
+        model = get_embedding_service()
+        missing = [memory for memory in pending if memory.embedding is None]
+        if missing:
+            embeddings = await model.aencode([memory.text for memory in missing], normalize_embeddings=True)
+            for memory, embedding in zip(missing, embeddings):
+                memory.embedding = embedding
+
+        if query_vector is None:
+            query_vector = await model.aencode(query, normalize_embeddings=True)
+        return self._rank_pending(pending, query_vector, k)
+
+    @staticmethod
+    def _rank_pending(pending: List[PendingMemory], query_vector: Sequence[float], k: int) -> List[Memory]:
+        query_embedding = np.asarray(query_vector, dtype=np.float32)
+        scores = np.vstack([memory.embedding for memory in pending]) @ query_embedding
+        ranked = np.argsort(-scores)[:k]
+        return [
+            Memory(text=pending[i].text, metadata=dict(pending[i].metadata), score=float(scores[i])) for i in ranked
+        ]
+
+    def flush(self) -> int:
+        """Write every pending memory to the vector store. Returns the number written."""
+        with self._flush_lock:
+            batch = self.pending()
+            if not batch:
+                return 0
+
+            start = time.perf_counter()
+            try:
+                self.vector_store.store_memories([(memory.text, memory.metadata) for memory in batch])
+            except Exception as e:
+                self.stats.failed_flushes += 1
+                logger.error(f"Failed to flush {len(batch)} memories, will retry: {e}")
+                return 0
+            elapsed = time.perf_counter() - start
+
+            with self._lock:
+                flushed = {id(memory) for memory in batch}
+                self._pending = [memory for memory in self._pending if id(memory) not in flushed]
+                self._rewrite_journal()
+                self.stats.written += len(batch)
+                self.stats.flushes += 1
+                self.stats.flush_seconds += elapsed
+
+            logger.info(
+                f"Flushed {len(batch)} memories in {elapsed * 1000:.1f} ms "
+                f"({self.stats.memories_per_second:.1f} memories/sec overall)"
+            )
+            return len(batch)
+
+    def close(self) -> None:
+        """Stop the background thread and flush what is left."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._wakeup.notify()
+        self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while not self._closed and not self._is_due():
+                    timeout = self.flush_interval
+                    if self._pending:
+                        timeout = max(self.flush_interval - (time.monotonic() - self._pending[0].enqueued_at), 0.01)
+                    self._wakeup.wait(timeout)
+                if self._closed:
+                    return
+            if self.flush() == 0:
+                # Back off after a failed flush instead of retrying in a tight loop
+                time.sleep(self.flush_interval)
+
+    def _is_due(self) -> bool:
+        if not self._pending:
+            return False
+        if len(self._pending) >= self.max_batch_size:
+            return True
+        return time.monotonic() - self._pending[0].enqueued_at >= self.flush_interval
+
+    def _append_journal(self, memory: PendingMemory) -> None:
+        if not self.journal_path:
+            return
+        with open(self.journal_path, "a") as f:
+            f.write(json.dumps({"text": memory.text, "metadata": memory.metadata}) + "\n")
+
+    def _rewrite_journal(self) -> None:
+        if not self.journal_path:
+            return
+        tmp_path = f"{self.journal_path}.tmp"
+        with open(tmp_path, "w") as f:
+            for memory in self._pending:
+                f.write(json.dumps({"text": memory.text, "metadata": memory.metadata}) + "\n")
+        os.replace(tmp_path, self.journal_path)
+
+    def _replay_journal(self) -> None:
+        if not self.journal_path or not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path) as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    self._pending.append(PendingMemory(text=row["text"], metadata=row["metadata"]))
+        if self._pending:
+            logger.info(f"Replayed {len(self._pending)} unflushed memories from {self.journal_path}")
+
+
+@lru_cache
+def get_memory_writer() -> MemoryWriteBehindQueue:
+    """Get the process-wide write-behind queue for the configured vector store."""
+    return MemoryWriteBehindQueue(
+        get_vector_store(),
+        max_batch_size=settings.MEMORY_WRITE_BATCH_SIZE,
+        flush_interval=settings.MEMORY_WRITE_FLUSH_INTERVAL,
+        journal_path=settings.MEMORY_WRITE_JOURNAL_PATH,
+    )
@@ -1,11 +1,27 @@
 import os
-from typing import List, Optional
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
 
+import grpc
 from ai_companion.modules.memory.long_term.base_vector_store import BaseVectorStore, Memory
+from ai_companion.modules.memory.long_term.embeddings import get_embedding_service
 from ai_companion.settings import settings
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, PointStruct, VectorParams
-from sentence_transformers import SentenceTransformer
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.http.exceptions import UnexpectedResponse
+from qdrant_client.models import (
+    Direction,
+    Distance,
+    OrderBy,
+    PayloadSchemaType,
+    PointIdsList,
+    PointStruct,
+    QueryRequest,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    VectorParams,
+)
 
 
 class QdrantStore(BaseVectorStore):
@@ -15,6 +31,7 @@ class QdrantStore(BaseVectorStore):
     EMBEDDING_MODEL = "all-MiniLM-L6-v2"
     COLLECTION_NAME = "long_term_memory"
     SIMILARITY_THRESHOLD = 0.9  # Threshold for considering memories as similar
+    PAYLOAD_FIELDS = ["text", "timestamp"]  # Only what callers read; the point ID is returned separately
 
     _instance: Optional["QdrantStore"] = None
     _initialized: bool = False
@@ -27,8 +44,11 @@ class QdrantStore(BaseVectorStore):
     def __init__(self) -> None:
         if not self._initialized:
             self._validate_env_vars()
-            self.model = SentenceTransformer(self.EMBEDDING_MODEL)
-            self.client = QdrantClient(url=settings.QDRANT_URL, api_key=settings.QDRANT_API_KEY)
+            self.model = get_embedding_service()
+            self.client = QdrantClient(**self._client_kwargs())
+            self._async_client: Optional[AsyncQdrantClient] = None
+            self._collection_ready = False
+            self._timestamp_indexed = False
             self._initialized = True
 
     def _validate_env_vars(self) -> None:
@@ -37,21 +57,75 @@ class QdrantStore(BaseVectorStore):
         if missing_vars:
             raise ValueError(f"Missing required environment variables: {', '.join(missing_vars)}")
 
+    @staticmethod
+    def _client_kwargs() -> dict:
+        """Connection settings shared by the sync and async clients."""
+        return {
+            "url": settings.QDRANT_URL,
+            "api_key": settings.QDRANT_API_KEY,
+            "prefer_grpc": settings.QDRANT_PREFER_GRPC,
+            "grpc_port": settings.QDRANT_GRPC_PORT,
+        }
+
+    @property
+    def async_client(self) -> AsyncQdrantClient:
+        """Get or create the async client instance."""
+        if self._async_client is None:
+            self._async_client = AsyncQdrantClient(**self._client_kwargs())
+        return self._async_client
+
+    @property
+    def search_params(self) -> SearchParams:
+        """HNSW search parameters from settings."""
+        return SearchParams(hnsw_ef=settings.QDRANT_HNSW_EF, exact=settings.QDRANT_EXACT_SEARCH)
+
     def _collection_exists(self) -> bool:
         """Check if the memory collection exists."""
-        collections = self.client.get_collections().collections
-        return any(col.name == self.COLLECTION_NAME for col in collections)
+        if not self._collection_ready:
+            # Once the collection exists we stop asking the server on every call
+            self._collection_ready = self.client.collection_exists(self.COLLECTION_NAME)
+        return self._collection_ready
+
+    @staticmethod
+    def _is_not_found(error: Exception) -> bool:
+        """Whether a client error means the collection is gone (REST 404 or gRPC NOT_FOUND)."""
+        if isinstance(error, UnexpectedResponse):
+            return error.status_code == 404
+        return isinstance(error, grpc.RpcError) and error.code() == grpc.StatusCode.NOT_FOUND
+
+    @contextmanager
+    def _collection_call(self) -> Iterator[None]:
+        """Forget the cached collection state when a call finds the collection missing.
+
+        `_collection_exists` stops asking the server once the collection was seen, so a
+        collection deleted out from under us would otherwise fail every call until restart.
+        """
+        try:
+            yield
+        except Exception as e:
+            if self._is_not_found(e):
+                self._collection_ready = False
+                self._timestamp_indexed = False
+            raise
 
     def _create_collection(self) -> None:
         """Create a new collection for storing memories."""
         sample_embedding = self.model.encode("sample text")
+        quantization_config = None
+        if settings.QDRANT_QUANTIZATION:
+            quantization_config = ScalarQuantization(
+                scalar=ScalarQuantizationConfig(type=ScalarType.INT8, always_ram=True),
+            )
         self.client.create_collection(
             collection_name=self.COLLECTION_NAME,
             vectors_config=VectorParams(
                 size=len(sample_embedding),
                 distance=Distance.COSINE,
+                on_disk=settings.QDRANT_ON_DISK_VECTORS,
             ),
+            quantization_config=quantization_config,
         )
+        self._collection_ready = True
 
     def find_similar_memory(self, text: str) -> Optional[Memory]:
         """Find if a similar memory already exists."""
@@ -62,46 +136,180 @@ class QdrantStore(BaseVectorStore):
 
     def store_memory(self, text: str, metadata: dict) -> None:
         """Store a new memory in the vector store."""
+        self.store_memories([(text, metadata)])
+
+    def store_memories(self, memories: List[Tuple[str, dict]], deduplicate: bool = True) -> None:
+        """Store several memories with one batched encode and a single upsert."""
+        if not memories:
+            return
+
+        try:
+            self._store_memories(memories, deduplicate)
+        except Exception as e:
+            if not self._is_not_found(e):
+                raise
+            # The collection was deleted since we last saw it; recreate it and write again
+            self._store_memories(memories, deduplicate)
+
+    def _store_memories(self, memories: List[Tuple[str, dict]], deduplicate: bool) -> None:
         if not self._collection_exists():
             self._create_collection()
 
-        # Check if similar memory exists
-        similar_memory = self.find_similar_memory(text)
-        if similar_memory and similar_memory.id:
-            metadata["id"] = similar_memory.id  # Keep same ID for update
-
-        embedding = self.model.encode(text)
-        point = PointStruct(
-            id=metadata.get("id", hash(text)),
-            vector=embedding.tolist(),
-            payload={
-                "text": text,
-                **metadata,
-            },
-        )
+        texts = [text for text, _ in memories]
+        embeddings = self.model.encode(texts, batch_size=len(texts))
 
-        self.client.upsert(
-            collection_name=self.COLLECTION_NAME,
-            points=[point],
-        )
+        # Check if similar memories exist, in one round trip
+        similar = [None] * len(memories)
+        if deduplicate:
+            with self._collection_call():
+                similar = self.client.query_batch_points(
+                    collection_name=self.COLLECTION_NAME,
+                    requests=[
+                        QueryRequest(query=embedding.tolist(), limit=1, params=self.search_params, with_payload=False)
+                        for embedding in embeddings
+                    ],
+                )
+
+        duplicates = self.batch_duplicates(texts, embeddings, self.SIMILARITY_THRESHOLD) if deduplicate else None
+        points: List[PointStruct] = []
+        for i, ((text, metadata), embedding, response) in enumerate(zip(memories, embeddings, similar)):
+            metadata = dict(metadata)
+            hits = response.points if response is not None else []
+            if duplicates and duplicates[i] is not None:
+                metadata["id"] = points[duplicates[i]].id  # Same memory as an earlier one in this batch
+            elif hits and hits[0].score >= self.SIMILARITY_THRESHOLD:
+                metadata["id"] = hits[0].id  # Keep same ID for update
+
+            points.append(
+                PointStruct(
+                    id=metadata.get("id", hash(text)),
+                    vector=embedding.tolist(),
+                    payload={
+                        "text": text,
+                        **metadata,
+                    },
+                )
+            )
+        # One point per ID; the latest version of a memory wins
+        points = list({point.id: point for point in points}.values())
+
+        with self._collection_call():
+            self.client.upsert(
+                collection_name=self.COLLECTION_NAME,
+                points=points,
+            )
+        self._index_memories([(point.id, point.payload["text"]) for point in points])
 
     def search_memories(self, query: str, k: int = 5) -> List[Memory]:
         """Search for similar memories in the vector store."""
         if not self._collection_exists():
             return []
 
-        query_embedding = self.model.encode(query)
-        results = self.client.search(
-            collection_name=self.COLLECTION_NAME,
-            query_vector=query_embedding.tolist(),
-            limit=k,
-        )
+        return self.search_memories_by_vector(self.model.encode(query), k)
+
+    async def asearch_memories(self, query: str, k: int = 5) -> List[Memory]:
+        """Search for similar memories without blocking the event loop."""
+        if not self._collection_exists():
+            return []
+
+        return await self.asearch_memories_by_vector(await self.model.aencode(query), k)
+
+    @property
+    def supports_vector_search(self) -> bool:
+        return True
+
+    def search_memories_by_vector(self, vector: Sequence[float], k: int = 5) -> List[Memory]:
+        """Search with a precomputed query embedding."""
+        if not self._collection_exists():
+            return []
+
+        with self._collection_call():
+            response = self.client.query_points(
+                collection_name=self.COLLECTION_NAME,
+                query=list(map(float, vector)),
+                limit=k,
+                with_payload=self.PAYLOAD_FIELDS,
+                search_params=self.search_params,
+            )
+        return self._to_memories(response.points)
+
+    async def asearch_memories_by_vector(self, vector: Sequence[float], k: int = 5) -> List[Memory]:
+        """Search with a precomputed query embedding using the async client."""
+        if not self._collection_exists():
+            return []
+
+        with self._collection_call():
+            response = await self.async_client.query_points(
+                collection_name=self.COLLECTION_NAME,
+                query=list(map(float, vector)),
+                limit=k,
+                with_payload=self.PAYLOAD_FIELDS,
+                search_params=self.search_params,
+            )
+        return self._to_memories(response.points)
+
+    def scroll_memories(
+        self, offset: Optional[Any] = None, limit: int = 100, with_vectors: bool = False
+    ) -> Tuple[List[Memory], Optional[Any]]:
+        """Read one page of memories; the next offset is a point ID."""
+        if not self._collection_exists():
+            return [], None
+
+        with self._collection_call():
+            points, next_offset = self.client.scroll(
+                collection_name=self.COLLECTION_NAME,
+                offset=offset,
+                limit=limit,
+                with_payload=True,
+                with_vectors=with_vectors,
+            )
+        return self._to_memories(points), next_offset
+
+    def oldest_memories(self, limit: int) -> List[Memory]:
+        """The `limit` oldest memories, ordered through a datetime index on `timestamp`."""
+        if not self._collection_exists() or limit <= 0:
+            return []
+
+        with self._collection_call():
+            if not self._timestamp_indexed:
+                # Ordering requires a payload index; creating an existing one is a no-op
+                self.client.create_payload_index(
+                    collection_name=self.COLLECTION_NAME,
+                    field_name="timestamp",
+                    field_schema=PayloadSchemaType.DATETIME,
+                )
+                self._timestamp_indexed = True
+
+            points, _ = self.client.scroll(
+                collection_name=self.COLLECTION_NAME,
+                limit=limit,
+                with_payload=True,
+                order_by=OrderBy(key="timestamp", direction=Direction.ASC),
+            )
+        return self._to_memories(points)
+
+    def count_memories(self) -> int:
+        if not self._collection_exists():
+            return 0
+        with self._collection_call():
+            return self.client.count(collection_name=self.COLLECTION_NAME, exact=True).count
+
+    def delete_memories(self, ids: Sequence[str]) -> None:
+        if not ids or not self._collection_exists():
+            return
+        with self._collection_call():
+            self.client.delete(collection_name=self.COLLECTION_NAME, points_selector=PointIdsList(points=list(ids)))
+        self._unindex_memories(ids)
 
+    @staticmethod
+    def _to_memories(points) -> List[Memory]:
+        # Scrolled records have no score, and only carry a vector when it was requested
         return [
             Memory(
                 text=hit.payload["text"],
-                metadata={k: v for k, v in hit.payload.items() if k != "text"},
-                score=hit.score,
+                metadata={"id": hit.id, **{k: v for k, v in hit.payload.items() if k != "text"}},
+                score=getattr(hit, "score", None),
+                vector=hit.vector if isinstance(hit.vector, list) else None,
             )
-            for hit in results
-        ] 
\ No newline at end of file
+            for hit in points
+        ]
@@ -0,0 +1,129 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Sequence
+
+import numpy as np
+from langchain_core.messages import BaseMessage
+
+from ai_companion.modules.memory.long_term.embeddings import EmbeddingService, get_embedding_service
+from ai_companion.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueryEmbeddingStats:
+    """Per-turn encode counters for the query embedding cache."""
+
+    turns: int = 0
+    messages_encoded: int = 0
+    cache_hits: int = 0
+    encode_seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.messages_encoded + self.cache_hits
+        return self.cache_hits / total if total else 0.0
+
+    @property
+    def mean_encode_ms_per_turn(self) -> float:
+        return self.encode_seconds / self.turns * 1000 if self.turns else 0.0
+
+
+class QueryEmbeddingCache:
+    """Builds memory retrieval query vectors from cached per-message embeddings.
+
+    Each message is encoded once, keyed by its ID, so a turn only encodes the messages
+    that are new since the previous turn. The query vector is the recency-weighted mean
+    of the normalized message vectors: the newest message has weight 1 and each older
+    message is weighted by another factor of `decay`.
+    """
+
+    def __init__(self, model: EmbeddingService, max_size: int = 4096, decay: float = 0.5):
+        self.model = model
+        self.max_size = max_size
+        self.decay = decay
+        self.stats = QueryEmbeddingStats()
+        self._vectors: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(message: BaseMessage) -> str:
+        # LangGraph assigns IDs to messages in state; fall back to the content otherwise
+        return message.id or f"{message.type}:{message.content}"
+
+    def _lookup(self, messages: Sequence[BaseMessage]) -> List[Optional[np.ndarray]]:
+        with self._lock:
+            vectors = []
+            for message in messages:
+                vector = self._vectors.get(self._key(message))
+                if vector is not None:
+                    self._vectors.move_to_end(self._key(message))
+                vectors.append(vector)
+            return vectors
+
+    def _remember(self, messages: Sequence[BaseMessage], vectors: np.ndarray) -> None:
+        with self._lock:
+            for message, vector in zip(messages, vectors):
+                self._vectors[self._key(message)] = vector
+            while len(self._vectors) > self.max_size:
+                self._vectors.popitem(last=False)
+
+    def combine(self, vectors: Sequence[np.ndarray]) -> np.ndarray:
+        """Recency-weighted mean of normalized vectors, oldest first, renormalized."""
+        weights = self.decay ** np.arange(len(vectors) - 1, -1, -1, dtype=np.float32)
+        query = (weights[:, None] * np.vstack(vectors)).sum(axis=0)
+        norm = np.linalg.norm(query)
+        return query / norm if norm else query
+
+    def query_vector(self, messages: Sequence[BaseMessage]) -> np.ndarray:
+        """Query vector for the given messages, encoding only the ones not seen before."""
+        vectors = self._lookup(messages)
+        missing = [message for message, vector in zip(messages, vectors) if vector is None]
+        if missing:
+            start = time.perf_counter()
+            encoded = self.model.encode([m.content for m in missing], normalize_embeddings=True)
+            self._record(len(messages), len(missing), time.perf_counter() - start)
+            return self._complete(messages, vectors, missing, encoded)
+        self._record(len(messages), 0, 0.0)
+        return self.combine(vectors)
+
+    async def aquery_vector(self, messages: Sequence[BaseMessage]) -> np.ndarray:
+        """Like `query_vector`, without blocking the event loop."""
+        vectors = self._lookup(messages)
+        missing = [message for message, vector in zip(messages, vectors) if vector is None]
+        if missing:
+            start = time.perf_counter()
+            encoded = await self.model.aencode([m.content for m in missing], normalize_embeddings=True)
+            self._record(len(messages), len(missing), time.perf_counter() - start)
+            return self._complete(messages, vectors, missing, encoded)
+        self._record(len(messages), 0, 0.0)
+        return self.combine(vectors)
+
+    def _complete(
+        self,
+        messages: Sequence[BaseMessage],
+        vectors: List[Optional[np.ndarray]],
+        missing: List[BaseMessage],
+        encoded: np.ndarray,
+    ) -> np.ndarray:
+        self._remember(missing, encoded)
+        fresh = iter(encoded)
+        return self.combine([vector if vector is not None else next(fresh) for vector in vectors])
+
+    def _record(self, messages: int, encoded: int, seconds: float) -> None:
+        self.stats.turns += 1
+        self.stats.messages_encoded += encoded
+        self.stats.cache_hits += messages - encoded
+        self.stats.encode_seconds += seconds
+        logger.debug(f"Query vector: encoded {encoded}/{messages} messages in {seconds * 1000:.1f} ms")
+
+
+@lru_cache
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    """Get the process-wide per-message query embedding cache."""
+    return QueryEmbeddingCache(get_embedding_service(), decay=settings.MEMORY_QUERY_RECENCY_DECAY)
@@ -0,0 +1,83 @@
+"""Migrate a server-vectorized Weaviate memory collection to client-side (local) vectors.
+
+Existing collections are vectorized by text2vec-transformers (bge-m3, 1024 dims), while
+local mode uses all-MiniLM-L6-v2 (384 dims), so vectors cannot be converted in place.
+This copies every object into a new collection, re-embedding the text locally and
+keeping the object UUIDs:
+
+    uv run python -m ai_companion.modules.memory.long_term.weaviate_migration \\
+        --source Long_term_memory --target Long_term_memory_local
+
+Then set WEAVIATE_COLLECTION_NAME=Long_term_memory_local and WEAVIATE_VECTORIZER=local.
+The t2v-transformers container is no longer needed once nothing uses the old collection.
+"""
+
+import argparse
+import logging
+import time
+
+from ai_companion.modules.memory.long_term.embeddings import get_embedding_service
+from ai_companion.modules.memory.long_term.weaviate_store import WeaviateStore
+
+logger = logging.getLogger(__name__)
+
+
+def migrate_to_local_vectors(source: str, target: str, batch_size: int = 64) -> int:
+    """Copy `source` into a new locally-vectorized `target` collection. Returns the number of objects copied."""
+    store = WeaviateStore()
+    client = store.client
+    if not client.collections.exists(source):
+        raise ValueError(f"Source collection {source} does not exist")
+    if client.collections.exists(target):
+        raise ValueError(f"Target collection {target} already exists")
+
+    store._create_schema(target, local_vectors=True)
+    model = get_embedding_service()
+    source_collection = client.collections.get(source)
+    target_collection = client.collections.get(target)
+
+    copied = 0
+    start = time.perf_counter()
+    buffer = []
+
+    def flush() -> None:
+        nonlocal copied
+        vectors = model.encode([obj.properties["text"] for obj in buffer], batch_size=len(buffer))
+        with target_collection.batch.dynamic() as batch:
+            for obj, vector in zip(buffer, vectors):
+                batch.add_object(
+                    properties=obj.properties,
+                    uuid=obj.uuid,
+                    vector={WeaviateStore.VECTOR_NAME: vector.tolist()},
+                )
+        if target_collection.batch.failed_objects:
+            raise RuntimeError(f"Failed to copy memories: {target_collection.batch.failed_objects[0]}")
+        copied += len(buffer)
+        buffer.clear()
+
+    for obj in source_collection.iterator():
+        buffer.append(obj)
+        if len(buffer) >= batch_size:
+            flush()
+    if buffer:
+        flush()
+
+    elapsed = time.perf_counter() - start
+    logger.info(f"Copied {copied} memories from {source} to {target} in {elapsed:.1f}s")
+    return copied
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default=WeaviateStore.COLLECTION_NAME)
+    parser.add_argument("--target", required=True)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    copied = migrate_to_local_vectors(args.source, args.target, args.batch_size)
+    print(f"Migrated {copied} memories. Set WEAVIATE_COLLECTION_NAME={args.target} and WEAVIATE_VECTORIZER=local.")
+
+
+if __name__ == "__main__":
+    main()
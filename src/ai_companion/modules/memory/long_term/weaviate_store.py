@@ -1,21 +1,25 @@
+import json
 import logging
+import threading
+import time
 import traceback
-from typing import List, Optional
+import uuid
+from typing import Any, List, Optional, Sequence, Tuple
 from datetime import datetime, timezone
 from contextlib import contextmanager
 
 import weaviate
 from weaviate.classes.config import Configure, Property, DataType, VectorDistances
-from weaviate.classes.query import MetadataQuery
+from weaviate.classes.init import AdditionalConfig, Timeout
+from weaviate.classes.query import Filter, MetadataQuery, Sort
+from weaviate.config import ConnectionConfig
 
 from ai_companion.modules.memory.long_term.base_vector_store import BaseVectorStore, Memory
-from ai_companion.settings import settings
+from ai_companion.modules.memory.long_term.embeddings import get_embedding_service
+from ai_companion.settings import settings, WeaviateVectorizer
 
 
-# Configure root logger to ensure logs are visible
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger("weaviate_store")
-logger.setLevel(logging.DEBUG)
+logger = logging.getLogger(__name__)
 
 
 class WeaviateStore(BaseVectorStore):
@@ -23,21 +27,21 @@ class WeaviateStore(BaseVectorStore):
 
     REQUIRED_ENV_VARS = ["WEAVIATE_HOST", "WEAVIATE_PORT"]
     DISTANCE_THRESHOLD = 0.3  # Maximum distance for considering memories as similar (lower = more similar)
+    LOCAL_DISTANCE_THRESHOLD = 0.1  # Same as QdrantStore's 0.9 similarity, for local all-MiniLM-L6-v2 vectors
     # IMPORTANT: Using uppercase first letter as that's what Weaviate seems to expect
-    COLLECTION_NAME = "Long_term_memory"
+    COLLECTION_NAME = settings.WEAVIATE_COLLECTION_NAME
+    VECTOR_NAME = "text_vector"
 
     _instance: Optional["WeaviateStore"] = None
     _initialized: bool = False
 
     def __new__(cls) -> "WeaviateStore":
-        logger.info("WeaviateStore.__new__ called")
         if cls._instance is None:
-            logger.info("Creating new WeaviateStore instance")
+            logger.debug("Creating new WeaviateStore instance")
             cls._instance = super().__new__(cls)
         return cls._instance
 
     def __init__(self) -> None:
-        logger.info("WeaviateStore.__init__ called, initialized=%s", self._initialized)
         if not self._initialized:
             # Setup logging
             self.logger = logger
@@ -45,32 +49,21 @@ class WeaviateStore(BaseVectorStore):
             # Validate environment variables
             self._validate_env_vars()
 
+            # With local vectors we embed on the client, like QdrantStore, instead of
+            # relying on the server-side text2vec-transformers module
+            self.local_vectors = settings.WEAVIATE_VECTORIZER == WeaviateVectorizer.LOCAL
+            self.model = get_embedding_service() if self.local_vectors else None
+
+            # Cached collection handle, dropped whenever the schema may have changed
+            self._collection = None
+            self._collection_checked = False
+            self._last_health_check = 0.0
+            self._connection_lock = threading.Lock()
+
             # Connect to Weaviate
             try:
                 self.logger.info(f"Connecting to Weaviate at {settings.WEAVIATE_HOST}:{settings.WEAVIATE_PORT}")
-                
-                # Connect to Weaviate using the correct method
-                self.client = weaviate.connect_to_custom(
-                    http_host=settings.WEAVIATE_HOST,
-                    http_port=settings.WEAVIATE_PORT,
-                    http_secure=False,
-                    grpc_host=settings.WEAVIATE_HOST,
-                    grpc_port=50051,
-                    grpc_secure=False,
-                )
-                
-                # Connect to Weaviate
-                self.client.connect()
-                self.logger.info("Successfully connected to Weaviate")
-                
-                # Just log existing collections for debugging
-                try:
-                    # Using collections.list_all()
-                    collections = self.client.collections.list_all()
-                    self.logger.info(f"Existing collections: {collections}")
-                except Exception as e:
-                    self.logger.error(f"Error listing collections: {str(e)}")
-                
+                self.client = self._connect()
                 self._initialized = True
                 self.logger.info("WeaviateStore fully initialized")
             except Exception as e:
@@ -81,7 +74,7 @@ class WeaviateStore(BaseVectorStore):
     def __del__(self):
         """Cleanup when the instance is destroyed."""
         if hasattr(self, 'client'):
-            self.logger.info("Closing Weaviate connection")
+            self.logger.debug("Closing Weaviate connection")
             try:
                 self.client.close()
             except Exception as e:
@@ -96,31 +89,59 @@ class WeaviateStore(BaseVectorStore):
             except Exception as e:
                 self.logger.error(f"Error closing Weaviate connection: {str(e)}")
 
+    def _connect(self) -> weaviate.WeaviateClient:
+        """Open a connection to Weaviate with a pooled HTTP session and bounded timeouts."""
+        client = weaviate.connect_to_custom(
+            http_host=settings.WEAVIATE_HOST,
+            http_port=settings.WEAVIATE_PORT,
+            http_secure=False,
+            grpc_host=settings.WEAVIATE_HOST,
+            grpc_port=50051,
+            grpc_secure=False,
+            additional_config=AdditionalConfig(
+                connection=ConnectionConfig(
+                    session_pool_connections=settings.WEAVIATE_POOL_CONNECTIONS,
+                    session_pool_maxsize=settings.WEAVIATE_POOL_CONNECTIONS,
+                ),
+                timeout=Timeout(init=10, query=settings.WEAVIATE_QUERY_TIMEOUT, insert=60),
+            ),
+        )
+        client.connect()
+        self._last_health_check = time.monotonic()
+        return client
+
+    def _ensure_connected(self) -> None:
+        """Keep the persistent connection alive, reconnecting if a periodic liveness probe fails.
+
+        The probe only runs once every WEAVIATE_HEALTH_CHECK_INTERVAL seconds, so the hot path
+        normally costs nothing. It also keeps idle connections from being dropped silently.
+        """
+        if time.monotonic() - self._last_health_check < settings.WEAVIATE_HEALTH_CHECK_INTERVAL:
+            return
+
+        with self._connection_lock:
+            if time.monotonic() - self._last_health_check < settings.WEAVIATE_HEALTH_CHECK_INTERVAL:
+                return
+            try:
+                if self.client.is_live():
+                    self._last_health_check = time.monotonic()
+                    return
+            except Exception as e:
+                self.logger.warning(f"Weaviate liveness check failed: {str(e)}")
+
+            self.logger.warning("Weaviate connection is not live, reconnecting")
+            try:
+                self.client.close()
+            except Exception:
+                pass
+            self.client = self._connect()
+            self.invalidate_collection()
+
     @contextmanager
     def get_client(self):
-        """Context manager for getting a fresh connection to Weaviate."""
-        client = None
-        try:
-            # Create a new connection
-            client = weaviate.connect_to_custom(
-                http_host=settings.WEAVIATE_HOST,
-                http_port=settings.WEAVIATE_PORT,
-                http_secure=False,
-                grpc_host=settings.WEAVIATE_HOST,
-                grpc_port=50051,
-                grpc_secure=False,
-            )
-            client.connect()
-            yield client
-        except Exception as e:
-            self.logger.error(f"Error in get_client: {str(e)}")
-            raise
-        finally:
-            if client:
-                try:
-                    client.close()
-                except Exception as e:
-                    self.logger.error(f"Error closing client in context manager: {str(e)}")
+        """Context manager yielding the shared, health-checked Weaviate connection."""
+        self._ensure_connected()
+        yield self.client
 
     def _validate_env_vars(self) -> None:
         """Validate that all required environment variables are set."""
@@ -131,23 +152,35 @@ class WeaviateStore(BaseVectorStore):
                 missing_vars.append(var)
                 self.logger.error(f"Missing required environment variable: {var}")
             else:
-                self.logger.info(f"Environment variable {var} is set to: {value}")
+                self.logger.debug(f"Environment variable {var} is set to: {value}")
         
         if missing_vars:
             raise ValueError(f"Missing required environment variables: {', '.join(missing_vars)}")
     
+    def invalidate_collection(self) -> None:
+        """Drop the cached collection handle so the next call re-checks the schema."""
+        self._collection = None
+        self._collection_checked = False
+
+    def _get_collection(self):
+        """Return the cached collection handle, or None if the collection does not exist."""
+        self._ensure_connected()
+        if not self._collection_checked:
+            if self.client.collections.exists(self.COLLECTION_NAME):
+                self._collection = self.client.collections.get(self.COLLECTION_NAME)
+            else:
+                self._collection = None
+            self._collection_checked = True
+            self.logger.debug(f"Collection {self.COLLECTION_NAME} exists: {self._collection is not None}")
+        return self._collection
+
     def _collection_exists(self) -> bool:
         """Check if the memory collection exists."""
         try:
-            # Get all collections and check if our collection exists
-            collections = self.client.collections.list_all()
-            collection_names = [collection for collection in collections]
-            self.logger.info(f"Available collections: {collection_names}")
-            exists = self.COLLECTION_NAME in collection_names
-            self.logger.info(f"Collection {self.COLLECTION_NAME} exists: {exists}")
-            return exists
+            return self._get_collection() is not None
         except Exception as e:
             self.logger.error(f"Error checking if collection exists: {str(e)}")
+            self.invalidate_collection()
             return False
 
     def _create_collection(self) -> None:
@@ -159,24 +192,9 @@ class WeaviateStore(BaseVectorStore):
         try:
             # Create the collection with the exact configuration from the notebook
             self.logger.info(f"Creating collection {self.COLLECTION_NAME}")
-            self.client.collections.create(
-                self.COLLECTION_NAME,
-                vectorizer_config=[
-                    Configure.NamedVectors.text2vec_transformers(
-                        name="text_vector",
-                        source_properties=["text"],
-                        vector_index_config=Configure.VectorIndex.hnsw(
-                            distance_metric=VectorDistances.COSINE
-                        )
-                    )
-                ],
-                properties=[
-                    Property(name="text", data_type=DataType.TEXT),
-                    Property(name="timestamp", data_type=DataType.DATE),
-                    Property(name="uuid", data_type=DataType.UUID)
-                ]
-            )
-            
+            self._create_schema(self.COLLECTION_NAME, self.local_vectors)
+            self.invalidate_collection()
+
             # Verify the collection was created
             if self._collection_exists():
                 self.logger.info(f"Successfully created collection {self.COLLECTION_NAME}")
@@ -188,152 +206,316 @@ class WeaviateStore(BaseVectorStore):
             self.logger.error(traceback.format_exc())
             raise
 
-    def find_similar_memory(self, text: str) -> Optional[Memory]:
+    def _create_schema(self, name: str, local_vectors: bool) -> None:
+        """Create a memory collection, vectorized by the server or by the client."""
+        vector_index_config = Configure.VectorIndex.hnsw(distance_metric=VectorDistances.COSINE)
+        if local_vectors:
+            vectorizer = Configure.NamedVectors.none(
+                name=self.VECTOR_NAME,
+                vector_index_config=vector_index_config,
+            )
+        else:
+            vectorizer = Configure.NamedVectors.text2vec_transformers(
+                name=self.VECTOR_NAME,
+                source_properties=["text"],
+                vector_index_config=vector_index_config,
+            )
+        self.client.collections.create(
+            name,
+            vectorizer_config=[vectorizer],
+            properties=[
+                Property(name="text", data_type=DataType.TEXT),
+                Property(name="timestamp", data_type=DataType.DATE),
+                Property(name="uuid", data_type=DataType.UUID)
+            ]
+        )
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts locally with the shared embedding model."""
+        return self.model.encode(texts, batch_size=len(texts)).tolist()
+
+    def _query(self, collection, text: str, limit: int, distance: Optional[float] = None, vector: Optional[List[float]] = None):
+        """Run a similarity query, with a client-side vector in local mode or when one is given."""
+        if self.local_vectors or vector is not None:
+            return collection.query.near_vector(
+                near_vector=vector if vector is not None else self._embed([text])[0],
+                target_vector=self.VECTOR_NAME,
+                limit=limit,
+                distance=distance,
+                return_metadata=MetadataQuery(distance=True)
+            )
+        return collection.query.near_text(
+            query=text,
+            limit=limit,
+            distance=distance,
+            return_metadata=MetadataQuery(distance=True)
+        )
+
+    def find_similar_memory(self, text: str, vector: Optional[List[float]] = None) -> Optional[Memory]:
         """Find if a similar memory already exists."""
         try:
-            if not self._collection_exists():
-                self.logger.info("Collection does not exist, returning None")
+            collection = self._get_collection()
+            if collection is None:
+                self.logger.debug("Collection does not exist, returning None")
                 return None
-                
-            self.logger.info(f"Finding similar memory for text: {text[:50]}...")
-            collection = self.client.collections.get(self.COLLECTION_NAME)
-            response = collection.query.near_text(
-                query=text,
+
+            self.logger.debug(f"Finding similar memory for text: {text[:50]}...")
+            response = self._query(
+                collection,
+                text,
                 limit=1,
-                distance=self.DISTANCE_THRESHOLD,  # Maximum distance threshold
-                return_metadata=MetadataQuery(distance=True)
+                # Maximum distance threshold
+                distance=self.LOCAL_DISTANCE_THRESHOLD if self.local_vectors else self.DISTANCE_THRESHOLD,
+                vector=vector,
             )
 
             if response.objects:
                 obj = response.objects[0]
                 # Convert distance to similarity score (1 - distance)
                 similarity_score = 1 - obj.metadata.distance
-                self.logger.info(f"Found similar memory with score: {similarity_score}")
+                self.logger.debug(f"Found similar memory with score: {similarity_score}")
                 return Memory(
                     text=obj.properties["text"],
                     metadata={k: v for k, v in obj.properties.items() if k != "text"},
                     score=similarity_score
                 )
-            self.logger.info("No similar memory found")
+            self.logger.debug("No similar memory found")
             return None
         except Exception as e:
+            self.invalidate_collection()
             self.logger.error(f"Error in find_similar_memory: {str(e)}")
             self.logger.error(traceback.format_exc())
             return None
 
+    def _find_similar_ids(self, texts: List[str], vectors: List[Optional[List[float]]]) -> List[Optional[str]]:
+        """UUID of the most similar stored memory for each text, or None, in one request.
+
+        The v4 collection API runs one search per call, so the lookups are sent as a
+        single GraphQL query with one aliased near-vector/near-text search per memory.
+        """
+        distance = self.LOCAL_DISTANCE_THRESHOLD if self.local_vectors else self.DISTANCE_THRESHOLD
+        searches = []
+        for i, (text, vector) in enumerate(zip(texts, vectors)):
+            if vector is not None:
+                near = f"nearVector: {{vector: {json.dumps(vector)}, distance: {distance}, targetVectors: [\"{self.VECTOR_NAME}\"]}}"
+            else:
+                near = f"nearText: {{concepts: [{json.dumps(text)}], distance: {distance}, targetVectors: [\"{self.VECTOR_NAME}\"]}}"
+            searches.append(f"m{i}: {self.COLLECTION_NAME}({near}, limit: 1) {{ _additional {{ id distance }} }}")
+
+        response = self.client.graphql_raw_query("{ Get { " + " ".join(searches) + " } }")
+        if response.errors:
+            # Like find_similar_memory, a failed lookup stores the memories as new
+            self.logger.error(f"Error in _find_similar_ids: {response.errors}")
+            return [None] * len(texts)
+
+        similar: List[Optional[str]] = []
+        for i in range(len(texts)):
+            hits = response.get.get(f"m{i}") or []
+            similar.append(hits[0]["_additional"]["id"] if hits else None)
+        self.logger.debug(f"Found {sum(s is not None for s in similar)} similar memories for {len(texts)} texts")
+        return similar
+
     def store_memory(self, text: str, metadata: dict) -> None:
         """Store a new memory in the vector store."""
+        self.store_memories([(text, metadata)])
+
+    def store_memories(self, memories: List[Tuple[str, dict]], deduplicate: bool = True) -> None:
+        """Store several memories inside a single batch context."""
+        if not memories:
+            return
+
         try:
             # Create collection if it doesn't exist
-            if not self._collection_exists():
+            collection = self._get_collection()
+            existed = collection is not None
+            if not existed:
                 self._create_collection()
-                
-            self.logger.info(f"Storing memory: {text[:50]}...")
-            collection = self.client.collections.get(self.COLLECTION_NAME)
-            
-            # Check if similar memory exists
-            similar_memory = self.find_similar_memory(text)
-            if similar_memory and similar_memory.id:
-                self.logger.info(f"Updating existing memory with ID: {similar_memory.id}")
-                # For updates we'll use the existing UUID
-                uuid_value = similar_memory.id
-            else:
-                # For new entries, get UUID from metadata if available
-                uuid_value = metadata.get("uuid") or metadata.get("id")
-            
-            # Create properties dictionary WITHOUT id/uuid
-            properties = {
-                "text": text,
-            }
-            
-            # Format timestamp for Weaviate (RFC3339 with timezone)
-            if "timestamp" in metadata:
-                # If timestamp is a string, try to parse it
-                if isinstance(metadata["timestamp"], str):
-                    try:
-                        # Try to parse the timestamp string
-                        dt = datetime.fromisoformat(metadata["timestamp"].replace('Z', '+00:00'))
-                        # Convert to local timezone and format as RFC3339
-                        local_time = dt.astimezone()
-                        properties["timestamp"] = local_time.isoformat()
-                    except ValueError:
-                        # If parsing fails, use current time
-                        local_time = datetime.now(timezone.utc).astimezone()
-                        properties["timestamp"] = local_time.isoformat()
+                collection = self._get_collection()
+
+            self.logger.debug(f"Storing {len(memories)} memories")
+
+            texts = [text for text, _ in memories]
+            vectors = self._embed(texts) if self.local_vectors else [None] * len(texts)
+
+            duplicates = None
+            similar: List[Optional[str]] = [None] * len(texts)
+            if deduplicate:
+                threshold = 1 - self.LOCAL_DISTANCE_THRESHOLD
+                duplicates = self.batch_duplicates(texts, vectors if self.local_vectors else None, threshold)
+                # Check if similar memories exist, in one round trip
+                if existed:
+                    similar = self._find_similar_ids(texts, vectors)
+            objects = []
+            for i, ((text, metadata), vector) in enumerate(zip(memories, vectors)):
+                if duplicates and duplicates[i] is not None:
+                    # Same memory as an earlier one in this batch
+                    objects.append((self._build_properties(text, metadata), objects[duplicates[i]][1], vector))
+                    continue
+                if similar[i]:
+                    self.logger.debug(f"Updating existing memory with ID: {similar[i]}")
+                    # For updates we'll use the existing UUID
+                    uuid_value = similar[i]
                 else:
-                    # If timestamp is already a datetime object, use it directly
-                    dt = metadata["timestamp"]
-                    if dt.tzinfo is None:
-                        # If no timezone info, assume UTC
-                        dt = dt.replace(tzinfo=timezone.utc)
-                    local_time = dt.astimezone()
-                    properties["timestamp"] = local_time.isoformat()
-            else:
-                # If no timestamp provided, use current time
-                local_time = datetime.now(timezone.utc).astimezone()
-                properties["timestamp"] = local_time.isoformat()
-            
-            # Add any other metadata EXCEPT id/uuid
-            for key, value in metadata.items():
-                if key not in ["id", "uuid", "timestamp"]:  # Skip id, uuid, and timestamp as we've handled them
-                    properties[key] = value
+                    # For new entries, get UUID from metadata if available
+                    uuid_value = metadata.get("uuid") or metadata.get("id") or str(uuid.uuid4())
+                objects.append((self._build_properties(text, metadata), uuid_value, vector))
+            # One object per UUID; the latest version of a memory wins
+            objects = list({obj[1]: obj for obj in objects}.values())
 
-            self.logger.info(f"Storing with properties: {properties}")
-            
             # Use batch approach instead of direct insert
             with collection.batch.dynamic() as batch:
-                if uuid_value:
-                    # If we have a UUID, use it explicitly
+                for properties, uuid_value, vector in objects:
+                    # In local mode the vector is supplied by us, otherwise Weaviate vectorizes the text
                     batch.add_object(
                         properties=properties,
-                        uuid=uuid_value
-                    )
-                else:
-                    # Let Weaviate generate a UUID
-                    batch.add_object(
-                        properties=properties
+                        uuid=uuid_value,
+                        vector={self.VECTOR_NAME: vector} if vector is not None else None,
                     )
-                
+
                 # Check for errors
                 if batch.number_errors > 0:
                     failed_objects = collection.batch.failed_objects
                     if failed_objects:
                         self.logger.error(f"Failed to store memory: {failed_objects[0]}")
                         raise Exception(f"Failed to store memory: {failed_objects[0]}")
-            
-            self.logger.info("Memory stored successfully")
+
+            self._index_memories([(uuid_value, properties["text"]) for properties, uuid_value, _ in objects])
+            self.logger.debug("Memories stored successfully")
         except Exception as e:
-            self.logger.error(f"Error in store_memory: {str(e)}")
+            self.invalidate_collection()
+            self.logger.error(f"Error in store_memories: {str(e)}")
             self.logger.error(traceback.format_exc())
             raise
 
+    def _build_properties(self, text: str, metadata: dict) -> dict:
+        """Build the Weaviate properties for a memory, without id/uuid."""
+        properties = {
+            "text": text,
+        }
+
+        # Format timestamp for Weaviate (RFC3339 with timezone)
+        if "timestamp" in metadata:
+            # If timestamp is a string, try to parse it
+            if isinstance(metadata["timestamp"], str):
+                try:
+                    # Try to parse the timestamp string
+                    dt = datetime.fromisoformat(metadata["timestamp"].replace('Z', '+00:00'))
+                    # Convert to local timezone and format as RFC3339
+                    local_time = dt.astimezone()
+                    properties["timestamp"] = local_time.isoformat()
+                except ValueError:
+                    # If parsing fails, use current time
+                    local_time = datetime.now(timezone.utc).astimezone()
+                    properties["timestamp"] = local_time.isoformat()
+            else:
+                # If timestamp is already a datetime object, use it directly
+                dt = metadata["timestamp"]
+                if dt.tzinfo is None:
+                    # If no timezone info, assume UTC
+                    dt = dt.replace(tzinfo=timezone.utc)
+                local_time = dt.astimezone()
+                properties["timestamp"] = local_time.isoformat()
+        else:
+            # If no timestamp provided, use current time
+            local_time = datetime.now(timezone.utc).astimezone()
+            properties["timestamp"] = local_time.isoformat()
+
+        # Add any other metadata EXCEPT id/uuid
+        for key, value in metadata.items():
+            if key not in ["id", "uuid", "timestamp"]:  # Skip id, uuid, and timestamp as we've handled them
+                properties[key] = value
+
+        return properties
+
     def search_memories(self, query: str, k: int = 5) -> List[Memory]:
         """Search for similar memories in the vector store."""
         try:
-            if not self._collection_exists():
-                self.logger.info("Collection does not exist, returning empty list")
+            collection = self._get_collection()
+            if collection is None:
+                self.logger.debug("Collection does not exist, returning empty list")
                 return []
-                
-            self.logger.info(f"Searching memories for query: {query[:50]}... (k={k})")
-            collection = self.client.collections.get(self.COLLECTION_NAME)
-            response = collection.query.near_text(
-                query=query,
-                limit=k,
-                return_metadata=MetadataQuery(distance=True)
-            )
 
-            results = [
-                Memory(
-                    text=obj.properties["text"],
-                    metadata={k: v for k, v in obj.properties.items() if k != "text"},
-                    score=1 - obj.metadata.distance  # Convert distance to similarity score
-                )
-                for obj in response.objects
-            ]
-            
-            self.logger.info(f"Found {len(results)} memories")
-            return results
+            self.logger.debug(f"Searching memories for query: {query[:50]}... (k={k})")
+            response = self._query(collection, query, limit=k)
+            return self._to_memories(response)
         except Exception as e:
+            self.invalidate_collection()
             self.logger.error(f"Error in search_memories: {str(e)}")
             self.logger.error(traceback.format_exc())
-            return [] 
\ No newline at end of file
+            return []
+
+    @property
+    def supports_vector_search(self) -> bool:
+        # Server-vectorized collections use a different embedding model than ours
+        return self.local_vectors
+
+    def search_memories_by_vector(self, vector: Sequence[float], k: int = 5) -> List[Memory]:
+        """Search with a precomputed vector in the collection's vector space."""
+        try:
+            collection = self._get_collection()
+            if collection is None:
+                return []
+            response = self._query(collection, "", limit=k, vector=list(map(float, vector)))
+            return self._to_memories(response)
+        except Exception as e:
+            self.invalidate_collection()
+            self.logger.error(f"Error in search_memories_by_vector: {str(e)}")
+            self.logger.error(traceback.format_exc())
+            return []
+
+    def _to_memories(self, response) -> List[Memory]:
+        results = [
+            Memory(
+                text=obj.properties["text"],
+                metadata={"id": str(obj.uuid), **{k: v for k, v in obj.properties.items() if k != "text"}},
+                score=1 - obj.metadata.distance  # Convert distance to similarity score
+            )
+            for obj in response.objects
+        ]
+        self.logger.debug(f"Found {len(results)} memories")
+        return results
+
+    def _to_plain_memories(self, objects) -> List[Memory]:
+        """Memories for objects fetched without a similarity query."""
+        return [
+            Memory(
+                text=obj.properties["text"],
+                metadata={"id": str(obj.uuid), **{k: v for k, v in obj.properties.items() if k != "text"}},
+                vector=obj.vector.get(self.VECTOR_NAME) if obj.vector else None,
+            )
+            for obj in objects
+        ]
+
+    def scroll_memories(
+        self, offset: Optional[Any] = None, limit: int = 100, with_vectors: bool = False
+    ) -> Tuple[List[Memory], Optional[Any]]:
+        """Read one page of memories with the cursor API; the next offset is the last UUID."""
+        collection = self._get_collection()
+        if collection is None:
+            return [], None
+
+        response = collection.query.fetch_objects(limit=limit, after=offset, include_vector=with_vectors)
+        memories = self._to_plain_memories(response.objects)
+        next_offset = memories[-1].id if len(memories) == limit else None
+        return memories, next_offset
+
+    def oldest_memories(self, limit: int) -> List[Memory]:
+        collection = self._get_collection()
+        if collection is None or limit <= 0:
+            return []
+
+        response = collection.query.fetch_objects(limit=limit, sort=Sort.by_property("timestamp", ascending=True))
+        return self._to_plain_memories(response.objects)
+
+    def count_memories(self) -> int:
+        collection = self._get_collection()
+        if collection is None:
+            return 0
+        return collection.aggregate.over_all(total_count=True).total_count
+
+    def delete_memories(self, ids: Sequence[str]) -> None:
+        collection = self._get_collection()
+        if not ids or collection is None:
+            return
+        collection.data.delete_many(where=Filter.by_id().contains_any(list(ids)))
+        self._unindex_memories(ids) 
\ No newline at end of file
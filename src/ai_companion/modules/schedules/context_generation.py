@@ -1,5 +1,7 @@
-from datetime import datetime
-from typing import Dict, Optional
+import logging
+from datetime import datetime, time
+from typing import Dict, List, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from ai_companion.core.schedules import (
     FRIDAY_SCHEDULE,
@@ -11,6 +13,10 @@ from ai_companion.core.schedules import (
     WEDNESDAY_SCHEDULE,
 )
 
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+
 
 class ScheduleContextGenerator:
     """Class to generate context about Ava's current activity based on schedules."""
@@ -26,7 +32,7 @@ class ScheduleContextGenerator:
     }
 
     @staticmethod
-    def _parse_time_range(time_range: str) -> tuple[datetime.time, datetime.time]:
+    def _parse_time_range(time_range: str) -> tuple[time, time]:
         """Parse a time range string (e.g., '06:00-07:00') into start and end times."""
         start_str, end_str = time_range.split("-")
         start_time = datetime.strptime(start_str, "%H:%M").time()
@@ -34,33 +40,50 @@ class ScheduleContextGenerator:
         return start_time, end_time
 
     @classmethod
-    def get_current_activity(cls) -> Optional[str]:
-        """Get Ava's current activity based on the current time and day of the week.
+    def _compile(cls) -> List[Optional[str]]:
+        """Precompute the activity for every minute of the week (index = day * 1440 + minute).
 
-        Returns:
-            str: Description of current activity, or None if no matching time slot is found
+        Each minute gets the first time slot of its day's schedule that contains it, with
+        overnight slots (e.g. 23:00-06:00) covering both ends of the same day.
         """
-        # Get current time and day of week (0 = Monday, 6 = Sunday)
-        current_datetime = datetime.now()
-        current_time = current_datetime.time()
-        current_day = current_datetime.weekday()
+        activities: List[Optional[str]] = [None] * (7 * MINUTES_PER_DAY)
+        for day, schedule in cls.SCHEDULES.items():
+            for time_range, activity in reversed(list(schedule.items())):
+                # Reversed, so earlier slots overwrite later ones where they overlap
+                start_time, end_time = cls._parse_time_range(time_range)
+                start = start_time.hour * 60 + start_time.minute
+                end = end_time.hour * 60 + end_time.minute
+                if start > end:
+                    minutes = [*range(start, MINUTES_PER_DAY), *range(0, end)]
+                else:
+                    minutes = range(start, end)
+                for minute in minutes:
+                    activities[day * MINUTES_PER_DAY + minute] = activity
+        return activities
 
-        # Get schedule for current day
-        schedule = cls.SCHEDULES.get(current_day, {})
+    @staticmethod
+    def now(timezone: Optional[str] = None) -> datetime:
+        """Current time in the given IANA timezone, or the server's local time."""
+        if timezone:
+            try:
+                return datetime.now(ZoneInfo(timezone))
+            except (ZoneInfoNotFoundError, ValueError):
+                logger.warning(f"Unknown timezone {timezone!r}, using server local time")
+        return datetime.now()
 
-        # Find matching time slot
-        for time_range, activity in schedule.items():
-            start_time, end_time = cls._parse_time_range(time_range)
+    @classmethod
+    def get_current_activity(cls, timezone: Optional[str] = None, now: Optional[datetime] = None) -> Optional[str]:
+        """Get Ava's current activity based on the current time and day of the week.
 
-            # Handle overnight activities (e.g., 23:00-06:00)
-            if start_time > end_time:
-                if current_time >= start_time or current_time <= end_time:
-                    return activity
-            else:
-                if start_time <= current_time <= end_time:
-                    return activity
+        Args:
+            timezone: IANA timezone of the user (e.g. "Europe/Madrid"); server local time if None
+            now: Time to look up instead of the current time
 
-        return None
+        Returns:
+            str: Description of current activity, or None if no matching time slot is found
+        """
+        now = now or cls.now(timezone)
+        return WEEKLY_ACTIVITIES[now.weekday() * MINUTES_PER_DAY + now.hour * 60 + now.minute]
 
     @classmethod
     def get_schedule_for_day(cls, day: int) -> Dict[str, str]:
@@ -73,3 +96,7 @@ class ScheduleContextGenerator:
             Dict[str, str]: Schedule for the specified day
         """
         return cls.SCHEDULES.get(day, {})
+
+
+# Built once at import so each lookup is a single index
+WEEKLY_ACTIVITIES = tuple(ScheduleContextGenerator._compile())
@@ -0,0 +1,70 @@
+from typing import Optional
+
+# Country calling code -> IANA timezone. Countries spanning several zones map to the
+# zone of their largest population centre; set SCHEDULE_TIMEZONE to override.
+COUNTRY_CODE_TIMEZONES = {
+    "1": "America/New_York",
+    "7": "Europe/Moscow",
+    "20": "Africa/Cairo",
+    "27": "Africa/Johannesburg",
+    "30": "Europe/Athens",
+    "31": "Europe/Amsterdam",
+    "32": "Europe/Brussels",
+    "33": "Europe/Paris",
+    "34": "Europe/Madrid",
+    "36": "Europe/Budapest",
+    "39": "Europe/Rome",
+    "40": "Europe/Bucharest",
+    "41": "Europe/Zurich",
+    "43": "Europe/Vienna",
+    "44": "Europe/London",
+    "45": "Europe/Copenhagen",
+    "46": "Europe/Stockholm",
+    "47": "Europe/Oslo",
+    "48": "Europe/Warsaw",
+    "49": "Europe/Berlin",
+    "51": "America/Lima",
+    "52": "America/Mexico_City",
+    "54": "America/Argentina/Buenos_Aires",
+    "55": "America/Sao_Paulo",
+    "56": "America/Santiago",
+    "57": "America/Bogota",
+    "58": "America/Caracas",
+    "60": "Asia/Kuala_Lumpur",
+    "61": "Australia/Sydney",
+    "62": "Asia/Jakarta",
+    "63": "Asia/Manila",
+    "64": "Pacific/Auckland",
+    "65": "Asia/Singapore",
+    "66": "Asia/Bangkok",
+    "81": "Asia/Tokyo",
+    "82": "Asia/Seoul",
+    "84": "Asia/Ho_Chi_Minh",
+    "86": "Asia/Shanghai",
+    "90": "Europe/Istanbul",
+    "91": "Asia/Kolkata",
+    "92": "Asia/Karachi",
+    "234": "Africa/Lagos",
+    "254": "Africa/Nairobi",
+    "351": "Europe/Lisbon",
+    "353": "Europe/Dublin",
+    "358": "Europe/Helsinki",
+    "380": "Europe/Kyiv",
+    "420": "Europe/Prague",
+    "852": "Asia/Hong_Kong",
+    "886": "Asia/Taipei",
+    "966": "Asia/Riyadh",
+    "971": "Asia/Dubai",
+    "972": "Asia/Jerusalem",
+}
+
+
+def timezone_for_phone_number(phone_number: str) -> Optional[str]:
+    """Guess the IANA timezone of an international phone number (e.g. WhatsApp's "34612345678")."""
+    digits = phone_number.lstrip("+").lstrip("0")
+    # Calling codes are prefix-free, so at most one of the 1-3 digit prefixes matches
+    for length in (3, 2, 1):
+        timezone = COUNTRY_CODE_TIMEZONES.get(digits[:length])
+        if timezone:
+            return timezone
+    return None
@@ -0,0 +1,224 @@
+import asyncio
+import logging
+import re
+import shutil
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from ai_companion.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Whisper resamples everything to 16 kHz mono, so anything above that is wasted upload
+STT_SAMPLE_RATE = 16000
+PCM_BYTES_PER_SECOND = STT_SAMPLE_RATE * 2  # 16-bit mono
+
+
+class AudioProcessingError(Exception):
+    """Raised when ffmpeg is missing or cannot process the input."""
+
+
+def ffmpeg_available() -> bool:
+    return shutil.which(settings.FFMPEG_PATH) is not None
+
+
+async def run_ffmpeg(args: List[str], audio: bytes, input_args: Optional[List[str]] = None) -> bytes:
+    """Run ffmpeg reading `audio` from stdin and return what it writes to stdout.
+
+    `input_args` describe the input (e.g. for raw PCM, which has no container to probe).
+    """
+    if not ffmpeg_available():
+        raise AudioProcessingError(f"ffmpeg not found at {settings.FFMPEG_PATH!r}")
+    process = await asyncio.create_subprocess_exec(
+        settings.FFMPEG_PATH,
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        *(input_args or []),
+        "-i",
+        "pipe:0",
+        *args,
+        "pipe:1",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await process.communicate(audio)
+    if process.returncode != 0:
+        raise AudioProcessingError(f"ffmpeg failed: {stderr.decode(errors='replace').strip()}")
+    return stdout
+
+
+def silence_trim_filter(threshold_db: float, min_silence: float = 0.3) -> str:
+    """ffmpeg filter trimming leading and trailing audio quieter than `threshold_db`.
+
+    silenceremove only trims the start reliably, so the audio is reversed, trimmed again
+    and reversed back to also drop trailing silence.
+    """
+    trim = f"silenceremove=start_periods=1:start_threshold={threshold_db}dB:start_silence={min_silence}"
+    return f"{trim},areverse,{trim},areverse"
+
+
+async def preprocess_for_stt(audio: bytes) -> Optional[bytes]:
+    """Trim silence, downmix to 16 kHz mono and re-encode as low-bitrate Ogg/Opus.
+
+    Returns None (so callers upload the original bytes) when ffmpeg is unavailable,
+    fails, or would not make the upload smaller.
+    """
+    start = time.perf_counter()
+    try:
+        processed = await run_ffmpeg(
+            [
+                "-vn",
+                "-af",
+                silence_trim_filter(settings.STT_SILENCE_THRESHOLD_DB),
+                "-ac",
+                "1",
+                "-ar",
+                str(STT_SAMPLE_RATE),
+                "-c:a",
+                "libopus",
+                "-b:a",
+                settings.STT_OPUS_BITRATE,
+                "-application",
+                "voip",
+                "-f",
+                "ogg",
+            ],
+            audio,
+        )
+    except AudioProcessingError as e:
+        logger.warning(f"Audio preprocessing skipped: {e}")
+        return None
+
+    if not processed or len(processed) >= len(audio):
+        return None
+    logger.debug(
+        f"Preprocessed audio {len(audio)} -> {len(processed)} bytes in {(time.perf_counter() - start) * 1000:.0f} ms"
+    )
+    return processed
+
+
+async def decode_pcm(audio: bytes) -> bytes:
+    """Decode any audio to 16 kHz mono 16-bit little-endian PCM."""
+    return await run_ffmpeg(["-vn", "-ac", "1", "-ar", str(STT_SAMPLE_RATE), "-f", "s16le"], audio)
+
+
+async def encode_opus(audio: bytes, bitrate: str, input_args: Optional[List[str]] = None) -> bytes:
+    """Encode audio as mono Ogg/Opus tuned for speech."""
+    return await run_ffmpeg(
+        ["-vn", "-ac", "1", "-c:a", "libopus", "-b:a", bitrate, "-application", "voip", "-f", "ogg"],
+        audio,
+        input_args=input_args,
+    )
+
+
+async def encode_pcm_opus(pcm: bytes, sample_rate: int = STT_SAMPLE_RATE, bitrate: Optional[str] = None) -> bytes:
+    """Encode mono 16-bit PCM as Ogg/Opus."""
+    return await encode_opus(
+        pcm, bitrate or settings.STT_OPUS_BITRATE, input_args=["-f", "s16le", "-ar", str(sample_rate), "-ac", "1"]
+    )
+
+
+def plan_segments(
+    pcm: bytes, segment_seconds: float, overlap_seconds: float, search_seconds: float = 5.0, frame_ms: int = 30
+) -> List[Tuple[int, int]]:
+    """Split PCM into overlapping (start, end) byte ranges cut at the quietest moments.
+
+    Each cut is placed at the lowest-energy frame within `search_seconds` before the
+    nominal segment boundary, so words are rarely split; segments then extend
+    `overlap_seconds` past the cut on both sides so the stitcher can line them up.
+    """
+    samples = np.frombuffer(pcm[: len(pcm) - len(pcm) % 2], dtype=np.int16)
+    frame = STT_SAMPLE_RATE * frame_ms // 1000
+    n_frames = len(samples) // frame
+    if n_frames == 0:
+        return [(0, len(pcm))]
+    energy = np.square(samples[: n_frames * frame].astype(np.float32)).reshape(n_frames, frame).mean(axis=1)
+
+    frames_per_segment = max(1, int(segment_seconds * 1000 / frame_ms))
+    search = max(1, int(search_seconds * 1000 / frame_ms))
+    cuts = [0]
+    while n_frames - cuts[-1] > frames_per_segment + search:
+        nominal = cuts[-1] + frames_per_segment
+        window = energy[max(cuts[-1] + 1, nominal - search) : nominal + 1]
+        cuts.append(nominal - len(window) + 1 + int(np.argmin(window)))
+    cuts.append(n_frames)
+
+    overlap = int(overlap_seconds * PCM_BYTES_PER_SECOND) // 2 * 2
+    frame_bytes = frame * 2
+    segments = [
+        (max(0, start * frame_bytes - overlap), min(len(pcm), end * frame_bytes + overlap))
+        for start, end in zip(cuts, cuts[1:])
+    ]
+    # The last segment also takes any trailing partial frame
+    segments[-1] = (segments[-1][0], len(pcm))
+    return segments
+
+
+def _normalize_word(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def _longest_common_run(tail: List[str], head: List[str]) -> Tuple[int, int, int]:
+    """Longest run of words found in both lists, as (end in tail, end in head, length)."""
+    best = (0, 0, 0)
+    lengths = [[0] * (len(head) + 1) for _ in range(len(tail) + 1)]
+    for i in range(1, len(tail) + 1):
+        for j in range(1, len(head) + 1):
+            if tail[i - 1] and tail[i - 1] == head[j - 1]:
+                lengths[i][j] = lengths[i - 1][j - 1] + 1
+                if lengths[i][j] > best[2]:
+                    best = (i, j, lengths[i][j])
+    return best
+
+
+def _is_fragment(word: str, others: List[str], standalone: List[str], min_length: int) -> bool:
+    """Whether `word` looks like a cut-off piece of one of `others` rather than a word of its own."""
+    if len(word) < min_length or word in standalone:
+        return False
+    return any(other != word and (other.startswith(word) or other.endswith(word)) for other in others)
+
+
+def merge_transcripts(texts: List[str], max_overlap_words: int = 12, min_fragment_length: int = 3) -> str:
+    """Join consecutive segment transcripts, keeping the words of their shared overlap once.
+
+    The overlap is located as the longest run of (case- and punctuation-insensitive) words
+    shared by the end of one transcript and the start of the next, wherever it sits: words
+    after the run in the earlier transcript and before it in the later one come from audio
+    cut mid-word at the segment edges, so they are dropped.
+
+    Without a shared run of two or more words, only the two words at the seam are candidates
+    for cut-off pieces: the last word of the earlier transcript is dropped if it begins a word
+    of the later one's overlap window, and the first word of the later transcript if it ends
+    a word of the earlier one's window ("bou" / "ore" of "store and bought").
+    Pieces shorter than `min_fragment_length` and words that also occur as standalone tokens
+    are kept. After that, one word repeated exactly across the seam is kept once.
+    """
+    merged: List[str] = []
+    for text in texts:
+        words = text.split()
+        if not words:
+            continue
+        tail = [_normalize_word(w) for w in merged[-max_overlap_words:]]
+        head = [_normalize_word(w) for w in words[:max_overlap_words]]
+        tail_end, head_end, length = _longest_common_run(tail, head)
+        if length >= 2:
+            del merged[len(merged) - len(tail) + tail_end :]
+            merged.extend(words[head_end:])
+            continue
+
+        # The complete form of a cut word lies a few words into the other transcript, never
+        # right across the seam, since segments overlap by a second or more of audio
+        start = 0
+        if tail and _is_fragment(tail[-1], head[1:], tail[:-1] + head, min_fragment_length):
+            merged.pop()
+            tail.pop()
+        if len(head) > 1 and _is_fragment(head[0], tail[:-1], tail + head[1:], min_fragment_length):
+            start = 1
+        if tail and start < len(head) and tail[-1] and tail[-1] == head[start]:
+            start += 1
+        merged.extend(words[start:])
+    return " ".join(merged)
@@ -1,13 +1,29 @@
+import asyncio
+import logging
 import os
 import tempfile
+import time
 from typing import Optional, Union
 from io import BytesIO
 
 from ai_companion.core.exceptions import SpeechToTextError
+from ai_companion.core.result_cache import ResultCache, get_result_cache
+from ai_companion.modules.speech.audio_processing import (
+    PCM_BYTES_PER_SECOND,
+    AudioProcessingError,
+    decode_pcm,
+    encode_pcm_opus,
+    ffmpeg_available,
+    merge_transcripts,
+    plan_segments,
+    preprocess_for_stt,
+)
 from ai_companion.settings import settings, STTProvider
 from groq import Groq
 from openai import OpenAI
 
+logger = logging.getLogger(__name__)
+
 
 class SpeechToText:
     """A class to handle speech-to-text conversion using Groq's Whisper model or OpenAI"""
@@ -19,6 +35,7 @@ class SpeechToText:
         """Initialize the SpeechToText class and validate environment variables."""
         self._validate_env_vars()
         self._client: Optional[Union[Groq, OpenAI]] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
 
     def _validate_env_vars(self) -> None:
         """Validate that all required environment variables are set."""
@@ -74,7 +91,39 @@ class SpeechToText:
             # Handle raw bytes from WhatsApp
             raw_bytes = audio_data
             file_obj = None
-            
+
+        # Forwarded voice notes are byte-identical, so the transcript can be reused
+        cache = get_result_cache("stt")
+        cache_key = ResultCache.key(raw_bytes, settings.STT_PROVIDER.value, *self.stt_model, settings.STT_PREPROCESS)
+        if cache is not None:
+            cached = await cache.aget_text(cache_key)
+            if cached is not None:
+                logger.info(f"Transcription cache hit (hit rate: {cache.stats.hit_rate:.2%})")
+                return cached
+
+        transcription = await self._transcribe(raw_bytes, file_obj)
+        if cache is not None:
+            await cache.aput_text(cache_key, str(transcription))
+        return transcription
+
+    async def _transcribe(self, raw_bytes: bytes, file_obj: Optional[BytesIO]) -> str:
+        """Transcribe audio that was not found in the result cache."""
+        if settings.STT_LONG_AUDIO_SECONDS is not None and ffmpeg_available():
+            try:
+                pcm = await decode_pcm(raw_bytes)
+            except AudioProcessingError as e:
+                logger.warning(f"Could not decode audio to check its length: {e}")
+            else:
+                if len(pcm) / PCM_BYTES_PER_SECOND > settings.STT_LONG_AUDIO_SECONDS:
+                    return await self.transcribe_long(pcm)
+
+        if settings.STT_PREPROCESS:
+            processed = await preprocess_for_stt(raw_bytes)
+            if processed is not None:
+                raw_bytes = processed
+                file_obj = BytesIO(processed)
+                file_obj.name = "audio.ogg"
+
         try:
             # Create a temporary file with appropriate extension based on provider
             if settings.STT_PROVIDER == STTProvider.OPENAI:
@@ -142,3 +191,43 @@ class SpeechToText:
 
         except Exception as e:
             raise SpeechToTextError(f"Speech-to-text conversion failed: {str(e)}") from e
+
+    async def transcribe_long(self, pcm: bytes) -> str:
+        """Transcribe long 16 kHz mono PCM as overlapping segments in parallel.
+
+        Segments are cut at the quietest moment near every STT_SEGMENT_SECONDS, sent
+        concurrently (at most STT_MAX_CONCURRENCY at a time) and stitched back together,
+        dropping the words repeated in each overlap.
+        """
+        start = time.perf_counter()
+        segments = plan_segments(pcm, settings.STT_SEGMENT_SECONDS, settings.STT_SEGMENT_OVERLAP_SECONDS)
+        try:
+            texts = await asyncio.gather(*(self._transcribe_segment(pcm[a:b]) for a, b in segments))
+        except Exception as e:
+            raise SpeechToTextError(f"Speech-to-text conversion failed: {str(e)}") from e
+
+        transcription = merge_transcripts([str(text) for text in texts])
+        if not transcription:
+            raise SpeechToTextError("Transcription result is empty")
+        logger.info(
+            f"Transcribed {len(pcm) / PCM_BYTES_PER_SECOND:.0f}s of audio as {len(segments)} segments "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
+        return transcription
+
+    async def _transcribe_segment(self, pcm: bytes) -> str:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(settings.STT_MAX_CONCURRENCY)
+        audio = await encode_pcm_opus(pcm)
+        file_obj = BytesIO(audio)
+        file_obj.name = "audio.ogg"
+        model, language = self.stt_model
+        async with self._semaphore:
+            # The provider SDKs are synchronous; keep them off the event loop
+            return await asyncio.to_thread(
+                self.client.audio.transcriptions.create,
+                file=file_obj,
+                model=model,
+                language=language,
+                response_format="text",
+            )
@@ -1,11 +1,135 @@
+import asyncio
+import io
+import logging
 import os
-from typing import Optional, Union
+import re
+import wave
+from typing import AsyncIterator, Callable, List, Optional, Union
 
 from ai_companion.core.exceptions import TextToSpeechError
-from ai_companion.settings import settings, TTSProvider
+from ai_companion.core.result_cache import ResultCache, get_result_cache
+from ai_companion.modules.speech.audio_processing import (
+    AudioProcessingError,
+    encode_opus,
+    encode_pcm_opus,
+    ffmpeg_available,
+)
+from ai_companion.settings import settings, AudioFormat, TTSProvider
 from elevenlabs import ElevenLabs, Voice, VoiceSettings
 from openai import OpenAI
 
+logger = logging.getLogger(__name__)
+
+MAX_TEXT_LENGTH = 5000  # ElevenLabs typical limit per request
+
+PCM_SAMPLE_RATE = 24000  # AudioFormat.PCM, as returned by both providers
+OPUS_GRANULE_RATE = 48000  # Ogg/Opus granule positions always count 48 kHz samples
+
+
+def pcm_to_wav(pcm: bytes, sample_rate: int = PCM_SAMPLE_RATE) -> bytes:
+    """Wrap raw 16-bit mono PCM in a WAV container."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def audio_mime_type(audio: bytes) -> str:
+    """MIME type of synthesized audio, from its signature."""
+    if audio.startswith(b"OggS"):
+        return "audio/ogg"
+    if audio.startswith(b"RIFF"):
+        return "audio/wav"
+    return "audio/mpeg"
+
+
+def audio_duration(audio: bytes) -> Optional[float]:
+    """Duration in seconds of WAV or Ogg/Opus audio, or None for other formats."""
+    if audio.startswith(b"RIFF"):
+        with wave.open(io.BytesIO(audio)) as wav:
+            return wav.getnframes() / wav.getframerate()
+    if audio.startswith(b"OggS"):
+        # The granule position of the last page is the stream's length in 48 kHz samples
+        last_page = audio.rfind(b"OggS")
+        return int.from_bytes(audio[last_page + 6 : last_page + 14], "little") / OPUS_GRANULE_RATE
+    return None
+
+
+SENTENCE_BOUNDARY = re.compile(r"(?:(?<=[.!?…])|(?<=[.!?…][\"')\]]))\s+")
+
+
+def _split_long(text: str, max_length: int) -> List[str]:
+    """Split text with no usable sentence boundary at word boundaries."""
+    chunks = []
+    while len(text) > max_length:
+        cut = text.rfind(" ", 0, max_length)
+        cut = cut if cut > 0 else max_length
+        chunks.append(text[:cut].strip())
+        text = text[cut:].strip()
+    if text:
+        chunks.append(text)
+    return chunks
+
+
+def chunk_text(text: str, max_length: int = MAX_TEXT_LENGTH) -> List[str]:
+    """Pack whole sentences into chunks of at most `max_length` characters."""
+    chunks: List[str] = []
+    current = ""
+    for sentence in SENTENCE_BOUNDARY.split(text.strip()):
+        if not sentence:
+            continue
+        if len(sentence) > max_length:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.extend(_split_long(sentence, max_length))
+        elif current and len(current) + 1 + len(sentence) > max_length:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class SentenceChunker:
+    """Accumulates streamed text and releases it in sentence-sized pieces.
+
+    A piece is released at the last sentence boundary once it has at least `min_length`
+    characters, so the first audio request is small but tiny sentences are grouped.
+    Boundaries inside an unclosed *action* are ignored, so asterisk content can still be
+    stripped per piece.
+    """
+
+    def __init__(self, min_length: int = 40, max_length: int = MAX_TEXT_LENGTH):
+        self.min_length = min_length
+        self.max_length = max_length
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        self._buffer += text
+        cut = None
+        for match in SENTENCE_BOUNDARY.finditer(self._buffer):
+            head = self._buffer[: match.start()]
+            if len(head) >= self.min_length and head.count("*") % 2 == 0:
+                cut = match
+        if cut is not None:
+            piece, self._buffer = self._buffer[: cut.start()].strip(), self._buffer[cut.end() :]
+            return _split_long(piece, self.max_length)
+        if len(self._buffer) > self.max_length:
+            pieces = _split_long(self._buffer, self.max_length)
+            self._buffer = pieces.pop()
+            return pieces
+        return []
+
+    def flush(self) -> List[str]:
+        pieces, self._buffer = _split_long(self._buffer.strip(), self.max_length), ""
+        return pieces
+
 
 class TextToSpeech:
     """A class to handle text-to-speech conversion using ElevenLabs or OpenAI."""
@@ -17,6 +141,7 @@ class TextToSpeech:
         """Initialize the TextToSpeech class and validate environment variables."""
         self._validate_env_vars()
         self._client: Optional[Union[ElevenLabs, OpenAI]] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
 
     def _validate_env_vars(self) -> None:
         """Validate that all required environment variables are set."""
@@ -34,25 +159,163 @@ class TextToSpeech:
                 self._client = OpenAI(api_key=settings.OPENAI_API_KEY)
         return self._client
 
-    async def synthesize(self, text: str) -> bytes:
+    @property
+    def tts_voice(self) -> tuple[str, str]:
+        """Get the TTS model and voice based on provider."""
+        if settings.TTS_PROVIDER == TTSProvider.ELEVENLABS:
+            return settings.TTS_ELEVENLAB_MODEL_NAME, settings.ELEVENLABS_VOICE_ID
+        return settings.TTS_OPENAI_MODEL_NAME, settings.OPENAI_VOICE_ID
+
+    @property
+    def native_opus(self) -> bool:
+        """Whether the provider can return Ogg/Opus itself (otherwise MP3 is transcoded with ffmpeg)."""
+        if settings.TTS_PROVIDER == TTSProvider.ELEVENLABS:
+            return settings.TTS_ELEVENLABS_OPUS_FORMAT is not None
+        return True
+
+    @staticmethod
+    def _elevenlabs_output_format(audio_format: AudioFormat) -> str:
+        if audio_format == AudioFormat.PCM:
+            return f"pcm_{PCM_SAMPLE_RATE}"
+        if audio_format == AudioFormat.OPUS:
+            return settings.TTS_ELEVENLABS_OPUS_FORMAT
+        return "mp3_44100_128"
+
+    async def synthesize(self, text: str, audio_format: AudioFormat = AudioFormat.MP3) -> bytes:
         """Convert text to speech using the selected provider.
 
+        Texts over the provider limit are split at sentence boundaries, synthesized
+        concurrently and joined (see join_audio).
+
         Args:
             text: Text to convert to speech
+            audio_format: MP3, OPUS (Ogg/Opus), or PCM for raw 24 kHz 16-bit mono samples
 
         Returns:
             bytes: Audio data
 
         Raises:
-            ValueError: If the input text is empty or too long
+            ValueError: If the input text is empty
             TextToSpeechError: If the text-to-speech conversion fails
         """
         if not text.strip():
             raise ValueError("Input text cannot be empty")
 
-        if len(text) > 5000:  # ElevenLabs typical limit
-            raise ValueError("Input text exceeds maximum length of 5000 characters")
+        chunks = chunk_text(text)
+        if len(chunks) == 1:
+            return await self._synthesize_limited(chunks[0], audio_format)
+        chunk_format = self.chunk_format(audio_format)
+        audio = await asyncio.gather(*(self._synthesize_limited(chunk, chunk_format) for chunk in chunks))
+        return await self.join_audio(audio, audio_format)
+
+    @staticmethod
+    def can_join(audio_format: AudioFormat) -> bool:
+        """Whether separately synthesized chunks can be joined into one audio_format stream.
+
+        Opus needs ffmpeg; callers that can synthesize the whole text at once should do so
+        instead of joining sentence chunks.
+        """
+        return audio_format != AudioFormat.OPUS or ffmpeg_available()
+
+    @staticmethod
+    def chunk_format(audio_format: AudioFormat) -> AudioFormat:
+        """Format to synthesize the chunks of a multi-chunk reply in, so join_audio can combine them.
+
+        MP3 and PCM chunks concatenate cleanly. Concatenated Ogg files form a chained
+        stream that many players stop after the first link, so Opus replies are
+        synthesized as PCM and encoded once, or as MP3 when ffmpeg is unavailable.
+        """
+        if audio_format == AudioFormat.OPUS:
+            return AudioFormat.PCM if ffmpeg_available() else AudioFormat.MP3
+        return audio_format
+
+    async def join_audio(self, chunks: List[bytes], audio_format: AudioFormat) -> bytes:
+        """Join chunks synthesized in chunk_format(audio_format) into one stream.
+
+        The result is in audio_format, except for Opus without ffmpeg, which comes back as MP3.
+        """
+        audio = b"".join(chunks)
+        if audio_format == AudioFormat.OPUS and ffmpeg_available():
+            return await encode_pcm_opus(audio, PCM_SAMPLE_RATE, settings.TTS_OPUS_BITRATE)
+        return audio
+
+    async def synthesize_stream(
+        self,
+        text_stream: AsyncIterator[str],
+        transform: Optional[Callable[[str], str]] = None,
+        audio_format: AudioFormat = AudioFormat.MP3,
+    ) -> AsyncIterator[bytes]:
+        """Synthesize streamed text sentence by sentence, yielding audio in order.
+
+        Each sentence is sent to the provider as soon as it is complete, while the rest of
+        the text is still streaming, and up to TTS_MAX_CONCURRENCY requests run at once.
+        `transform` is applied to each sentence before synthesis; empty results are skipped.
+        """
+        tasks: asyncio.Queue = asyncio.Queue()
+
+        async def produce() -> None:
+            chunker = SentenceChunker()
+
+            def schedule(pieces: List[str]) -> None:
+                for piece in pieces:
+                    piece = transform(piece) if transform else piece
+                    if piece.strip():
+                        tasks.put_nowait(asyncio.create_task(self._synthesize_limited(piece, audio_format)))
+
+            try:
+                async for text in text_stream:
+                    schedule(chunker.feed(text))
+                schedule(chunker.flush())
+            finally:
+                tasks.put_nowait(None)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while (task := await tasks.get()) is not None:
+                yield await task
+            await producer  # Surface errors from the text stream
+        finally:
+            producer.cancel()
+            while not tasks.empty():
+                task = tasks.get_nowait()
+                if task is not None:
+                    task.cancel()
+
+    async def _synthesize_limited(self, text: str, audio_format: AudioFormat = AudioFormat.MP3) -> bytes:
+        # Cached per chunk, so short replies and recurring sentences of streamed replies both hit
+        cache = get_result_cache("tts")
+        cache_key = ResultCache.key(
+            text,
+            settings.TTS_PROVIDER.value,
+            *self.tts_voice,
+            audio_format,
+            settings.TTS_ELEVENLABS_OPUS_FORMAT,
+            settings.TTS_OPUS_BITRATE,
+        )
+        if cache is not None:
+            cached = await cache.aget(cache_key)
+            if cached is not None:
+                logger.debug(f"Speech cache hit (hit rate: {cache.stats.hit_rate:.2%})")
+                return cached
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(settings.TTS_MAX_CONCURRENCY)
+        async with self._semaphore:
+            # The provider SDKs are synchronous; keep them off the event loop
+            if audio_format == AudioFormat.OPUS and not self.native_opus:
+                mp3 = await asyncio.to_thread(self._synthesize_chunk, text, AudioFormat.MP3)
+                try:
+                    audio = await encode_opus(mp3, settings.TTS_OPUS_BITRATE)
+                except AudioProcessingError as e:
+                    raise TextToSpeechError(f"Opus transcoding failed: {str(e)}") from e
+            else:
+                audio = await asyncio.to_thread(self._synthesize_chunk, text, audio_format)
+        if cache is not None:
+            await cache.aput(cache_key, audio)
+        return audio
 
+    def _synthesize_chunk(self, text: str, audio_format: AudioFormat = AudioFormat.MP3) -> bytes:
+        """Synthesize one chunk of at most MAX_TEXT_LENGTH characters."""
         try:
             if settings.TTS_PROVIDER == TTSProvider.ELEVENLABS:
                 audio_generator = self.client.generate(
@@ -62,6 +325,7 @@ class TextToSpeech:
                         settings=VoiceSettings(stability=0.5, similarity_boost=0.5),
                     ),
                     model=settings.TTS_ELEVENLAB_MODEL_NAME,
+                    output_format=self._elevenlabs_output_format(audio_format),
                 )
                 # Convert generator to bytes
                 audio_bytes = b"".join(audio_generator)
@@ -72,7 +336,8 @@ class TextToSpeech:
                 response = self.client.audio.speech.create(
                     model=settings.TTS_OPENAI_MODEL_NAME,
                     voice=settings.OPENAI_VOICE_ID,
-                    input=text
+                    input=text,
+                    response_format=audio_format.value,  # OpenAI PCM is 24 kHz 16-bit mono too; opus is Ogg
                 )
                 # OpenAI returns a file-like object that we can read directly
                 return response.read()
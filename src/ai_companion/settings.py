@@ -1,3 +1,4 @@
+from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from enum import Enum
 
@@ -11,6 +12,23 @@ class VectorDBProvider(str, Enum):
     QDRANT = "qdrant"
     WEAVIATE = "weaviate"
 
+class WeaviateVectorizer(str, Enum):
+    TRANSFORMERS = "transformers"
+    LOCAL = "local"
+
+class EmbeddingServiceMode(str, Enum):
+    LOCAL = "local"
+    SOCKET = "socket"
+
+class EmbeddingBackend(str, Enum):
+    TORCH = "torch"
+    ONNX = "onnx"
+    ONNX_INT8 = "onnx_int8"
+
+class MemoryRetrievalMode(str, Enum):
+    DENSE = "dense"
+    HYBRID = "hybrid"
+
 class STTProvider(str, Enum):
     GROQ = "groq"
     OPENAI = "openai"
@@ -27,6 +45,16 @@ class TTIProvider(str, Enum):
     TOGETHER = "together"
     OPENAI = "openai"
 
+class AudioFormat(str, Enum):
+    MP3 = "mp3"
+    OPUS = "opus"  # Ogg/Opus, WhatsApp's native voice-note format
+    PCM = "pcm"  # raw 24 kHz 16-bit mono, for progressive playback
+
+class ImageFormat(str, Enum):
+    JPEG = "jpeg"
+    WEBP = "webp"
+    PNG = "png"
+
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", extra="ignore", env_file_encoding="utf-8")
@@ -41,11 +69,29 @@ class Settings(BaseSettings):
     STT_LANGUAGE: str = "en"
     STT_GROQ_MODEL_NAME: str = "whisper-large-v3-turbo"
     STT_OPENAI_MODEL_NAME: str = "gpt-4o-transcribe"
-
+    # Trim silence, downmix to 16 kHz mono and re-encode to Opus with ffmpeg before uploading
+    STT_PREPROCESS: bool = False
+    STT_SILENCE_THRESHOLD_DB: float = -45.0
+    STT_OPUS_BITRATE: str = "24k"
+    FFMPEG_PATH: str = "ffmpeg"
+    # Clips longer than this are split on silence and transcribed in parallel; None disables it (needs ffmpeg)
+    STT_LONG_AUDIO_SECONDS: float | None = None
+    STT_SEGMENT_SECONDS: float = 60.0
+    STT_SEGMENT_OVERLAP_SECONDS: float = 1.5
+    STT_MAX_CONCURRENCY: int = 4  # concurrent segment requests, keep under the provider rate limit
 
     TTS_PROVIDER: TTSProvider = TTSProvider.ELEVENLABS
     TTS_ELEVENLAB_MODEL_NAME: str = "eleven_flash_v2_5"
     TTS_OPENAI_MODEL_NAME: str = "gpt-4o-mini-tts"
+    TTS_PIPELINED: bool = True  # synthesize audio responses sentence by sentence while the LLM streams
+    TTS_MAX_CONCURRENCY: int = 3  # concurrent TTS requests per process
+    # ElevenLabs output format used for Opus; None synthesizes MP3 and transcodes it with ffmpeg
+    TTS_ELEVENLABS_OPUS_FORMAT: str | None = "opus_48000_32"
+    TTS_OPUS_BITRATE: str = "32k"  # for local transcoding
+    # Audio format of voice replies per interface. Chainlit plays replies to voice input sentence
+    # by sentence as PCM/WAV; its format applies to audio replies to typed messages
+    WHATSAPP_AUDIO_FORMAT: AudioFormat = AudioFormat.OPUS
+    CHAINLIT_AUDIO_FORMAT: AudioFormat = AudioFormat.MP3
 
     ELEVENLABS_API_KEY: str
     ELEVENLABS_VOICE_ID: str
@@ -60,10 +106,23 @@ class Settings(BaseSettings):
     QDRANT_URL: str
     QDRANT_PORT: str = "6333"
     QDRANT_HOST: str | None = None
+    QDRANT_PREFER_GRPC: bool = False
+    QDRANT_GRPC_PORT: int = 6334
+    QDRANT_HNSW_EF: int | None = None  # None uses the collection default
+    QDRANT_EXACT_SEARCH: bool = False
+    # Only applied when the collection is created
+    QDRANT_ON_DISK_VECTORS: bool = False
+    QDRANT_QUANTIZATION: bool = False  # int8 scalar quantization
     
     # Weaviate Settings
     WEAVIATE_HOST: str
     WEAVIATE_PORT: int
+    WEAVIATE_COLLECTION_NAME: str = "Long_term_memory"
+    # "transformers" uses the server-side t2v-transformers container, "local" embeds on the client
+    WEAVIATE_VECTORIZER: WeaviateVectorizer = WeaviateVectorizer.TRANSFORMERS
+    WEAVIATE_POOL_CONNECTIONS: int = 10
+    WEAVIATE_QUERY_TIMEOUT: int = 30  # seconds
+    WEAVIATE_HEALTH_CHECK_INTERVAL: float = 30.0  # seconds between liveness probes of the shared connection
 
     # Ollama settings
     OLLAMA_BASE_URL: str
@@ -105,12 +164,96 @@ class Settings(BaseSettings):
         else:
             return "gpt-4o-mini"   # Fixed OpenAI model
 
+    @field_validator("WHATSAPP_AUDIO_FORMAT")
+    @classmethod
+    def _whatsapp_accepts_audio_format(cls, value: AudioFormat) -> AudioFormat:
+        # WhatsApp only takes compressed audio (AAC, AMR, MP3, MP4, Ogg/Opus), not WAV
+        if value == AudioFormat.PCM:
+            raise ValueError("WhatsApp cannot play PCM/WAV audio; use 'opus' or 'mp3'")
+        return value
+
     TTI_MODEL_NAME: str = "black-forest-labs/FLUX.1-schnell-Free"
     ITT_GROQ_MODEL_NAME: str = "llama-3.2-90b-vision-preview"
     ITT_OPENAI_MODEL_NAME: str = "gpt-4o"
     OPENAI_TTI_MODEL_NAME: str = "dall-e-3"
+    # Generated images are re-encoded once before delivery (WhatsApp only accepts JPEG and PNG images)
+    TTI_OUTPUT_FORMAT: ImageFormat = ImageFormat.JPEG
+    TTI_OUTPUT_QUALITY: int = 85
+    TTI_OUTPUT_MAX_DIMENSION: int | None = None  # longest side in pixels; None keeps the generated size
+
+    # Images are downscaled and re-encoded (EXIF stripped) before vision analysis
+    ITT_PREPROCESS: bool = True
+    ITT_MAX_DIMENSION: int = 1024  # longest side in pixels; vision models downsample larger images anyway
+    ITT_IMAGE_FORMAT: ImageFormat = ImageFormat.JPEG
+    ITT_IMAGE_QUALITY: int = 85
+    ITT_MAX_IMAGE_BYTES: int = 1_000_000  # quality, then size, is reduced until the payload fits
+    ITT_MAX_CONCURRENCY: int = 4  # concurrent vision requests per process
 
     MEMORY_TOP_K: int = 3
+    MEMORY_CONTEXT_MESSAGES: int = 3  # recent messages used as the retrieval query
+    # "hybrid" fuses vector search with an in-process BM25 index (reciprocal rank fusion)
+    MEMORY_RETRIEVAL_MODE: MemoryRetrievalMode = MemoryRetrievalMode.DENSE
+    MEMORY_HYBRID_CANDIDATES: int = 10  # results taken from each side before fusion
+
+    # Build the retrieval query from cached per-message vectors instead of re-encoding the joined context
+    MEMORY_INCREMENTAL_QUERY: bool = True
+    MEMORY_QUERY_RECENCY_DECAY: float = 0.5  # weight of each older message relative to the next one
+    # Reuse a thread's last memory context while the query vector stays this similar (e.g. 0.95); None
+    # disables it. Invalidation only sees writes made by this process, so enable it only with a single
+    # worker and no external writers (transfer CLI, consolidation in another process)
+    MEMORY_CONTEXT_REUSE_SIMILARITY: float | None = None
+
+    # Embedding service: "local" loads the model in each process, "socket" uses the shared sidecar
+    EMBEDDING_SERVICE: EmbeddingServiceMode = EmbeddingServiceMode.LOCAL
+    EMBEDDING_SOCKET_PATH: str = "/tmp/ai_companion_embeddings.sock"
+    EMBEDDING_BATCH_WINDOW_MS: float = 2.0  # how long to wait for concurrent requests to batch together
+    EMBEDDING_MAX_BATCH_SIZE: int = 64
+    EMBEDDING_BACKEND: EmbeddingBackend = EmbeddingBackend.TORCH  # "onnx"/"onnx_int8" need sentence-transformers[onnx]
+    EMBEDDING_ONNX_INT8_FILE: str = "onnx/model_quint8_avx2.onnx"
+    EMBEDDING_MAX_SEQ_LENGTH: int | None = None  # e.g. 128; None keeps the model default (256)
+
+    # Local pre-filter score (0-1) a message needs before memory analysis runs; None disables it.
+    # The lexical scorer is English-only and skips short replies ("Lisbon", "yes, two kids"), so
+    # only opt in (e.g. 0.3) after MemoryPreFilter.evaluate() shows acceptable recall on your traffic
+    MEMORY_PREFILTER_THRESHOLD: float | None = None
+
+    # Memory analysis cache (skips the LLM call for repeated messages)
+    MEMORY_ANALYSIS_CACHE_SIZE: int = 1024
+    # e.g. 0.97 to also match near-identical messages. Embeddings barely separate messages that differ
+    # only in a name or place ("my sister is Ana" / "my sister is Eva"), which would then share one
+    # analysis; differing numbers are always treated as a miss
+    MEMORY_ANALYSIS_CACHE_SIMILARITY: float | None = None
+    MEMORY_ANALYSIS_CACHE_DB_PATH: str | None = None  # SQLite file to persist the cache across restarts
+
+    # Write-behind memory writer (batches new memories into bulk upserts)
+    MEMORY_WRITE_BEHIND: bool = False
+    MEMORY_WRITE_BATCH_SIZE: int = 32
+    MEMORY_WRITE_FLUSH_INTERVAL: float = 2.0  # seconds
+    MEMORY_WRITE_JOURNAL_PATH: str | None = None  # JSONL journal replayed on restart
+
+    # Background consolidation (merges near-duplicate memories, caps the collection size)
+    MEMORY_CONSOLIDATION_INTERVAL: float | None = None  # seconds between runs in the server; None disables it
+    MEMORY_CONSOLIDATION_SIMILARITY: float = 0.92
+    MEMORY_CONSOLIDATION_PAGE_SIZE: int = 200
+    MEMORY_CONSOLIDATION_MAX_MEMORIES: int | None = None
+    MEMORY_CONSOLIDATION_USE_LLM: bool = False  # rewrite each merged cluster with one LLM call
+    MEMORY_CONSOLIDATION_STATE_PATH: str | None = None  # file keeping the cursor between runs
+
+    # IANA timezone for Ava's schedule (e.g. "Europe/Madrid"). When unset, WhatsApp users get the
+    # timezone of their number's country code and other interfaces use the server's local time.
+    SCHEDULE_TIMEZONE: str | None = None
+
+    # Content-hash cache for transcriptions, image analyses and synthesized speech
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_MEMORY_MB: float = 64.0  # per module
+    RESULT_CACHE_DB_PATH: str | None = None  # SQLite file for the on-disk tier; None keeps it in memory only
+    RESULT_CACHE_DISK_MB: float = 512.0  # per module
+    RESULT_CACHE_TTL: float | None = 7 * 24 * 3600  # seconds
+
+    # Reuse WhatsApp media IDs for identical outbound media; WhatsApp keeps uploads for 30 days
+    WHATSAPP_MEDIA_ID_CACHE: bool = True
+    WHATSAPP_MEDIA_ID_TTL: float = 29 * 24 * 3600  # seconds, a day short of WhatsApp's retention
+
     ROUTER_MESSAGES_TO_ANALYZE: int = 3
     TOTAL_MESSAGES_SUMMARY_TRIGGER: int = 20
     TOTAL_MESSAGES_AFTER_SUMMARY: int = 5
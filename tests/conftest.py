@@ -0,0 +1,18 @@
+import os
+
+# Settings requires these at import time; tests never reach the real services
+for name in (
+    "GROQ_API_KEY",
+    "OPENAI_API_KEY",
+    "ELEVENLABS_API_KEY",
+    "ELEVENLABS_VOICE_ID",
+    "OPENAI_VOICE_ID",
+    "TOGETHER_API_KEY",
+    "QDRANT_API_KEY",
+    "QDRANT_URL",
+    "WEAVIATE_HOST",
+    "OLLAMA_BASE_URL",
+    "OLLAMA_MODEL_NAME",
+):
+    os.environ.setdefault(name, "test")
+os.environ.setdefault("WEAVIATE_PORT", "8080")
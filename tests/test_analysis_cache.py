@@ -0,0 +1,32 @@
+import numpy as np
+from pydantic import BaseModel
+
+from ai_companion.modules.memory.long_term.analysis_cache import MemoryAnalysisCache
+
+
+class Analysis(BaseModel):
+    is_important: bool
+
+
+def make_cache(calls):
+    def embed(text):
+        calls.append(text)
+        # Every message maps to the same vector, so only the number guard can tell them apart
+        return np.ones(4, dtype=np.float32)
+
+    return MemoryAnalysisCache(Analysis, similarity_threshold=0.9, embed=embed)
+
+
+def test_semantic_hit_requires_the_same_numbers():
+    cache = make_cache([])
+    cache.put("I am 25 years old", Analysis(is_important=True))
+    assert cache.get("i'm 25 years old!") is not None
+    assert cache.get("I am 52 years old") is None
+
+
+def test_put_reuses_the_embedding_computed_by_a_miss():
+    calls = []
+    cache = make_cache(calls)
+    assert cache.get("I live in Lisbon") is None
+    cache.put("I live in Lisbon", Analysis(is_important=True))
+    assert calls == ["i live in lisbon"]
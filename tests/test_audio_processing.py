@@ -0,0 +1,48 @@
+import pytest
+
+from ai_companion.modules.speech.audio_processing import merge_transcripts
+
+
+def test_merge_transcripts_drops_exact_overlap():
+    assert merge_transcripts(["we talked for a while and then", "and then we went home"]) == (
+        "we talked for a while and then we went home"
+    )
+
+
+def test_merge_transcripts_drops_partial_words_around_shared_run():
+    texts = ["I went to the store and bou", "nd to the store and bought some milk today"]
+    assert merge_transcripts(texts) == "I went to the store and bought some milk today"
+
+
+def test_merge_transcripts_drops_fragments_without_shared_run():
+    texts = ["I went to the store and bou", "ore and bought some milk today"]
+    assert merge_transcripts(texts) == "I went to the store and bought some milk today"
+
+
+@pytest.mark.parametrize(
+    "texts, expected",
+    [
+        (["she said hi", "I waved back at her"], "she said hi I waved back at her"),
+        (["we ate a banana", "a dog ran past us"], "we ate a banana a dog ran past us"),
+        (["we went to the", "there was nobody"], "we went to the there was nobody"),
+    ],
+)
+def test_merge_transcripts_keeps_complete_words_at_the_seam(texts, expected):
+    assert merge_transcripts(texts) == expected
+
+
+def test_merge_transcripts_ignores_case_and_punctuation():
+    assert merge_transcripts(["It was late. The end", "the end, then we left"]) == "It was late. The end then we left"
+
+
+def test_merge_transcripts_keeps_unrelated_segments():
+    assert merge_transcripts(["one two three", "four five six"]) == "one two three four five six"
+
+
+def test_merge_transcripts_does_not_align_on_a_single_common_word():
+    texts = ["the cat sat on the mat and", "purred at the dog all day"]
+    assert merge_transcripts(texts) == "the cat sat on the mat and purred at the dog all day"
+
+
+def test_merge_transcripts_skips_empty_segments():
+    assert merge_transcripts(["", "hello there", "  ", "there friend"]) == "hello there friend"
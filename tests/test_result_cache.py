@@ -0,0 +1,41 @@
+import asyncio
+
+from ai_companion.core.result_cache import ResultCache
+
+
+def test_result_cache_serves_disk_hits_after_memory_eviction(tmp_path):
+    cache = ResultCache("test", max_memory_bytes=4, db_path=str(tmp_path / "cache.db"), max_disk_bytes=1024)
+
+    async def roundtrip():
+        await cache.aput("a", b"aaaa")
+        await cache.aput("b", b"bbbb")  # evicts "a" from memory
+        return await cache.aget("a"), await cache.aget("missing")
+
+    assert asyncio.run(roundtrip()) == (b"aaaa", None)
+    assert cache.stats.disk_hits == 1
+    assert cache.stats.misses == 1
+
+
+def test_result_cache_discard_removes_both_tiers(tmp_path):
+    cache = ResultCache("test", max_memory_bytes=1024, db_path=str(tmp_path / "cache.db"), max_disk_bytes=1024)
+    cache.put_text("a", "value")
+    asyncio.run(cache.adiscard("a"))
+    assert cache.get_text("a") is None
+
+
+def test_result_cache_key_depends_on_every_param():
+    assert ResultCache.key(b"image", "groq", 1024) != ResultCache.key(b"image", "groq", 512)
+    assert ResultCache.key(b"image", "groq", 1024) == ResultCache.key(b"image", "groq", 1024)
+
+
+def test_result_cache_evicts_least_recently_used_disk_entries(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+    cache = ResultCache("test", max_memory_bytes=0, db_path=db_path, max_disk_bytes=8)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    assert cache.get("a") == b"aaaa"  # "b" is now the least recently used
+    cache.put("c", b"cccc")
+    cache.put("a", b"aaaa")  # replacing an entry does not count its old size twice
+
+    assert [cache.get(key) for key in "abc"] == [b"aaaa", None, b"cccc"]
+    assert ResultCache("test", max_memory_bytes=0, db_path=db_path, max_disk_bytes=8)._disk_bytes == 8
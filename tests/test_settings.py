@@ -0,0 +1,13 @@
+import pytest
+from pydantic import ValidationError
+
+from ai_companion.settings import AudioFormat, Settings
+
+
+def test_whatsapp_audio_format_rejects_pcm():
+    with pytest.raises(ValidationError):
+        Settings(WHATSAPP_AUDIO_FORMAT=AudioFormat.PCM)
+
+
+def test_whatsapp_audio_format_accepts_compressed_audio():
+    assert Settings(WHATSAPP_AUDIO_FORMAT="mp3").WHATSAPP_AUDIO_FORMAT == AudioFormat.MP3
@@ -0,0 +1,9 @@
+from ai_companion.modules.speech.text_to_speech import TextToSpeech
+from ai_companion.settings import AudioFormat, settings
+
+
+def test_opus_chunks_fall_back_to_mp3_without_ffmpeg(monkeypatch):
+    monkeypatch.setattr(settings, "FFMPEG_PATH", "/nonexistent/ffmpeg")
+    assert not TextToSpeech.can_join(AudioFormat.OPUS)
+    assert TextToSpeech.chunk_format(AudioFormat.OPUS) == AudioFormat.MP3
+    assert TextToSpeech.can_join(AudioFormat.MP3)
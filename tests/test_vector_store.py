@@ -0,0 +1,21 @@
+from ai_companion.modules.memory.long_term.base_vector_store import BaseVectorStore, Memory
+
+
+def test_batch_duplicates_matches_similar_vectors_to_the_first_occurrence():
+    vectors = [[1.0, 0.0], [0.0, 1.0], [0.99, 0.05], [0.98, 0.1]]
+    assert BaseVectorStore.batch_duplicates(["a", "b", "c", "d"], vectors, 0.9) == [None, None, 0, 0]
+
+
+def test_batch_duplicates_compares_normalized_text_without_vectors():
+    texts = ["User likes tea", "user likes  TEA", "User lives in Lisbon"]
+    assert BaseVectorStore.batch_duplicates(texts, None, 0.9) == [None, 0, None]
+
+
+def test_fuse_rankings_does_not_sink_lexical_only_matches():
+    fused = [
+        Memory(text="User's dog is called Rex", metadata={}, score=None),
+        Memory(text="User has a dog", metadata={}, score=0.7),
+    ]
+    pending = [Memory(text="User adopted a cat", metadata={}, score=0.4)]
+    ranked = BaseVectorStore.fuse_rankings([fused, pending], k=2)
+    assert [memory.text for memory in ranked] == ["User's dog is called Rex", "User adopted a cat"]